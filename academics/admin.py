@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import AcademicYear, Unit, Result, GPACalculation
+from .models import AcademicYear, CurriculumUnit, Unit, Result, GPACalculation
+from .pagination import EstimatedCountPaginator
 
 
 @admin.register(AcademicYear)
@@ -15,6 +16,7 @@ class UnitAdmin(admin.ModelAdmin):
     list_display = ['code', 'name', 'credit_units', 'academic_year']
     search_fields = ['code', 'name']
     list_filter = ['academic_year', 'credit_units']
+    list_select_related = ['academic_year']
     ordering = ['code']
     fieldsets = (
         ('Unit Information', {
@@ -26,12 +28,32 @@ class UnitAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(CurriculumUnit)
+class CurriculumUnitAdmin(admin.ModelAdmin):
+    list_display = ['course', 'year_of_study', 'unit', 'credit_units']
+    search_fields = ['course', 'unit__code', 'unit__name']
+    list_filter = ['course', 'year_of_study']
+    list_select_related = ['unit']
+    autocomplete_fields = ['unit']
+    ordering = ['course', 'year_of_study', 'unit__code']
+    
+    @admin.display(description='Credit units', ordering='unit__credit_units')
+    def credit_units(self, obj):
+        return obj.unit.credit_units
+
+
 @admin.register(Result)
 class ResultAdmin(admin.ModelAdmin):
     list_display = ['student', 'unit', 'score', 'grade', 'points']
     search_fields = ['student__user__username', 'student__registration_number', 'unit__code']
-    list_filter = ['grade', 'unit__academic_year', 'created_at']
+    list_filter = ['grade', 'academic_year', 'created_at']
+    # student.__str__ reads user names and unit is shown per row
+    list_select_related = ['student__user', 'unit']
+    autocomplete_fields = ['student', 'unit']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ['grade', 'points', 'created_at', 'updated_at']
+    actions = ['recalculate_grades']
     fieldsets = (
         ('Student & Unit', {
             'fields': ('student', 'unit')
@@ -44,6 +66,16 @@ class ResultAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    @admin.action(description='Recalculate grade and points for selected results')
+    def recalculate_grades(self, request, queryset):
+        """Re-record the selected results so grade/points match current unit credits."""
+        rows = [
+            Result(student_id=student_id, unit_id=unit_id, score=score)
+            for student_id, unit_id, score in queryset.values_list('student_id', 'unit_id', 'score')
+        ]
+        recorded = Result.objects.bulk_record(rows)
+        self.message_user(request, f'Recalculated {len(recorded)} result(s).')
 
 
 @admin.register(GPACalculation)
@@ -51,6 +83,10 @@ class GPACalculationAdmin(admin.ModelAdmin):
     list_display = ['student', 'academic_year', 'gpa', 'total_credit_units', 'calculated_at']
     search_fields = ['student__user__username', 'student__registration_number']
     list_filter = ['academic_year', 'calculated_at']
+    list_select_related = ['student__user', 'academic_year']
+    autocomplete_fields = ['student']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ['calculated_at', 'gpa', 'total_points', 'total_credit_units']
     fieldsets = (
         ('Student & Academic Year', {
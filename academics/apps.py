@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AcademicsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'academics'
+    
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from jkuat_gpa.sqlite import configure_sqlite_connection
+        
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='jkuat_gpa.sqlite')
+        
+        from . import signals  # noqa: F401
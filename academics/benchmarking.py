@@ -0,0 +1,61 @@
+"""
+Shared helpers for the benchmark and load-test management commands.
+"""
+
+import time
+from typing import Callable, Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Return the pct-th percentile of samples using nearest-rank.
+    
+    Args:
+        samples: Measured values
+        pct: Percentile between 0 and 100
+        
+    Returns:
+        The percentile value, or 0.0 for no samples
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples_ms: List[float]) -> Dict:
+    """
+    Summarize latency samples in milliseconds.
+    
+    Returns:
+        Dictionary with count, mean, p50, p95, p99 and max
+    """
+    count = len(samples_ms)
+    return {
+        'count': count,
+        'mean': sum(samples_ms) / count if count else 0.0,
+        'p50': percentile(samples_ms, 50),
+        'p95': percentile(samples_ms, 95),
+        'p99': percentile(samples_ms, 99),
+        'max': max(samples_ms) if count else 0.0,
+    }
+
+
+def time_calls(func: Callable, repeat: int) -> List[float]:
+    """Call func repeat times and return each duration in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def format_summary(label: str, stats: Dict) -> str:
+    """Format a summarize() result as a single report line."""
+    return (
+        f"{label:<32} n={stats['count']:<6} mean={stats['mean']:8.2f}ms "
+        f"p50={stats['p50']:8.2f}ms p95={stats['p95']:8.2f}ms "
+        f"p99={stats['p99']:8.2f}ms max={stats['max']:8.2f}ms"
+    )
@@ -65,6 +65,7 @@ class ProjectionForm(forms.Form):
     
     target_honors = forms.ChoiceField(
         choices=HONORS_CHOICES,
+        required=False,
         widget=forms.RadioSelect(attrs={
             'class': 'form-check-input'
         }),
@@ -0,0 +1,129 @@
+import asyncio
+import random
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from accounts.models import Student
+from academics.benchmarking import format_summary, summarize
+from academics.models import AcademicYear, Unit, Result
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the sync dashboard/analytics views (WSGI, one thread per request) '
+        'with their async variants (ASGI, concurrent requests on one event loop) in process. '
+        'For real servers, run this project under '
+        '"gunicorn jkuat_gpa.wsgi -w N" and "gunicorn jkuat_gpa.asgi -k uvicorn.workers.UvicornWorker -w N" '
+        '(pip install uvicorn) and drive both with the same HTTP load.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20, help='Synthetic students to create')
+        parser.add_argument('--units', type=int, default=40, help='Results per student')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=25, help='Requests per client per view')
+
+    def handle(self, *args, **options):
+        # Lets the test clients run outside the test runner
+        setup_test_environment()
+        try:
+            # Inside the try, so a seed that fails partway is cleaned up too
+            users = self.seed(options)
+            pairs = [
+                ('dashboard', 'academics:dashboard', 'academics:dashboard_async'),
+                ('analytics', 'academics:analytics', 'academics:analytics_async'),
+            ]
+            for label, sync_name, async_name in pairs:
+                sync_samples, sync_errors = self.run_sync(reverse(sync_name), users, options)
+                async_samples, async_errors = asyncio.run(self.run_async(reverse(async_name), users, options))
+                self.stdout.write(self.style.SUCCESS(f'✓ {label}'))
+                self.stdout.write(format_summary('  sync (threads)', summarize(sync_samples)) + f'  errors={sync_errors}')
+                self.stdout.write(format_summary('  async (event loop)', summarize(async_samples)) + f'  errors={async_errors}')
+        finally:
+            self.cleanup()
+            teardown_test_environment()
+
+    def seed(self, options):
+        """Create committed synthetic students visible to every worker connection."""
+        year = AcademicYear.objects.create(year=3200, semester=1)
+        Unit.objects.bulk_create([
+            Unit(code=f'ASYB{i:04d}', name=f'Async Bench {i}', credit_units=random.randint(2, 4), academic_year=year)
+            for i in range(options['units'])
+        ])
+        units = list(Unit.objects.filter(academic_year=year))
+        users = []
+        for i in range(options['students']):
+            user = User.objects.create_user(username=f'asyncbench{i}')
+            student = Student.objects.create(user=user, registration_number=f'ASYB-{i:05d}')
+            Result.objects.bulk_record(
+                Result(student=student, unit=unit, score=random.randint(20, 100)) for unit in units
+            )
+            users.append(user)
+        return users
+
+    def cleanup(self):
+        """Remove the synthetic data."""
+        User.objects.filter(username__startswith='asyncbench').delete()
+        AcademicYear.objects.filter(year=3200, semester=1).delete()
+
+    def logged_in_client(self, users, index):
+        client = Client()
+        client.force_login(users[index % len(users)])
+        return client
+
+    def run_sync(self, path, users, options):
+        """One thread per client, like a threaded sync worker pool."""
+        lock = threading.Lock()
+        samples, errors = [], [0]
+        clients = [self.logged_in_client(users, i) for i in range(options['concurrency'])]
+
+        def worker(client):
+            local, failed = [], 0
+            try:
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    response = client.get(path)
+                    local.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 200 or 'error' in (response.context or {}):
+                        failed += 1
+            finally:
+                connections.close_all()
+            with lock:
+                samples.extend(local)
+                errors[0] += failed
+
+        threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, errors[0]
+
+    async def run_async(self, path, users, options):
+        """Concurrent requests on one event loop, like a single ASGI worker."""
+        samples, errors = [], 0
+        clients = []
+        for i in range(options['concurrency']):
+            client = AsyncClient()
+            # Sessions are created synchronously, off the event loop
+            client.cookies = (await asyncio.to_thread(self.logged_in_client, users, i)).cookies
+            clients.append(client)
+
+        async def worker(client):
+            nonlocal errors
+            for _ in range(options['requests']):
+                start = time.perf_counter()
+                response = await client.get(path)
+                samples.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200 or 'error' in (response.context or {}):
+                    errors += 1
+
+        await asyncio.gather(*(worker(client) for client in clients))
+        return samples, errors
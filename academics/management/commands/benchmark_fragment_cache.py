@@ -0,0 +1,77 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from accounts.models import Student
+from academics.benchmarking import format_summary, summarize, time_calls
+from academics.models import AcademicYear, Unit, Result, ResultSummary
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure dashboard and transcript response times for a student with many units, '
+        'with template fragment caching disabled and warm (rolled back afterwards)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--units', type=int, default=300, help='Results for the synthetic student')
+        parser.add_argument('--repeat', type=int, default=50, help='Requests timed per page and mode')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                client, student = self.seed(options)
+                version = ResultSummary.version_for(student)
+                # Only the benchmark's own fragments; clear() would also wipe
+                # whatever else shares the cache server
+                fragment_keys = [
+                    make_template_fragment_key(fragment, [student.pk, version])
+                    for fragment in ('grade_distribution', 'transcript_table')
+                ]
+                no_fragments = {
+                    **settings.CACHES,
+                    'template_fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+                }
+                for name in ('academics:dashboard', 'academics:transcript'):
+                    url = reverse(name)
+                    with override_settings(CACHES=no_fragments):
+                        uncached = time_calls(lambda: client.get(url), options['repeat'])
+                    caches['template_fragments'].delete_many(fragment_keys)
+                    client.get(url)  # warm the fragment
+                    cached = time_calls(lambda: client.get(url), options['repeat'])
+
+                    self.stdout.write(self.style.SUCCESS(f'✓ {name} with {options["units"]} units'))
+                    self.stdout.write(format_summary('  no fragment cache', summarize(uncached)))
+                    self.stdout.write(format_summary('  warm fragment cache', summarize(cached)))
+
+                # Leave the database and the cache exactly as they were
+                caches['template_fragments'].delete_many(fragment_keys)
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+
+    def seed(self, options):
+        """Create one student with many results; return a logged-in client and the student."""
+        year = AcademicYear.objects.create(year=3300, semester=1)
+        Unit.objects.bulk_create([
+            Unit(code=f'FRAG{i:04d}', name=f'Fragment Bench Unit {i}', credit_units=random.randint(2, 4), academic_year=year)
+            for i in range(options['units'])
+        ])
+        user = User.objects.create_user(username='fragbench', first_name='Fragment')
+        student = Student.objects.create(user=user, registration_number='FRAG-00001')
+        Result.objects.bulk_record(
+            Result(student=student, unit=unit, score=random.randint(20, 100))
+            for unit in Unit.objects.filter(academic_year=year)
+        )
+        client = Client()
+        client.force_login(user)
+        return client, student
@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from accounts.models import Student
+from academics.benchmarking import format_summary, summarize
+from academics.models import AcademicYear, Unit, Result
+from academics.utils import GradeCalculator
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark concurrent dashboard reads alongside result writes on SQLite. '
+        'Run once with SQLITE_TUNING=False and once with SQLITE_TUNING=True to compare.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help='Synthetic students to create')
+        parser.add_argument('--units', type=int, default=40, help='Units (results per student)')
+        parser.add_argument('--readers', type=int, default=8, help='Concurrent dashboard reader threads')
+        parser.add_argument('--writers', type=int, default=2, help='Concurrent result writer threads')
+        parser.add_argument('--duration', type=float, default=15.0, help='Seconds to run')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark targets SQLite databases only.')
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ SQLITE_TUNING={settings.SQLITE_TUNING} journal_mode={journal_mode}'
+        ))
+
+        student_ids, unit_ids = self.seed(options)
+        try:
+            self.run(student_ids, unit_ids, options)
+        finally:
+            self.cleanup()
+
+    def seed(self, options):
+        """Create committed synthetic data visible to every worker connection."""
+        year = AcademicYear.objects.create(year=3100, semester=1)
+        Unit.objects.bulk_create([
+            Unit(code=f'SQLB{i:04d}', name=f'SQLite Bench {i}', credit_units=3, academic_year=year)
+            for i in range(options['units'])
+        ])
+        units = list(Unit.objects.filter(academic_year=year))
+        User.objects.bulk_create([User(username=f'sqlbench{i}') for i in range(options['students'])])
+        Student.objects.bulk_create([
+            Student(user=user, registration_number=f'SQLB-{user.pk}')
+            for user in User.objects.filter(username__startswith='sqlbench')
+        ])
+        students = list(Student.objects.filter(registration_number__startswith='SQLB-'))
+        Result.objects.bulk_record(
+            Result(student=student, unit=unit, score=random.randint(20, 100))
+            for student in students
+            for unit in units
+        )
+        return [s.pk for s in students], [u.pk for u in units]
+
+    def cleanup(self):
+        """Remove the synthetic data."""
+        User.objects.filter(username__startswith='sqlbench').delete()
+        AcademicYear.objects.filter(year=3100, semester=1).delete()
+
+    def run(self, student_ids, unit_ids, options):
+        """Run reader and writer threads for the configured duration."""
+        deadline = time.monotonic() + options['duration']
+        lock = threading.Lock()
+        latencies = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+
+        def worker(kind):
+            samples, failed = [], 0
+            try:
+                while time.monotonic() < deadline:
+                    student = Student(pk=random.choice(student_ids))
+                    start = time.perf_counter()
+                    try:
+                        if kind == 'read':
+                            GradeCalculator.calculate_wma(student)
+                            GradeCalculator.get_grade_distribution(student)
+                            GradeCalculator.get_transcript(student)
+                        else:
+                            Result.objects.bulk_record([Result(
+                                student_id=student.pk,
+                                unit_id=random.choice(unit_ids),
+                                score=random.randint(20, 100)
+                            )])
+                    except OperationalError:
+                        # "database is locked"
+                        failed += 1
+                        continue
+                    samples.append((time.perf_counter() - start) * 1000)
+            finally:
+                connections.close_all()
+            with lock:
+                latencies[kind].extend(samples)
+                errors[kind] += failed
+
+        threads = [threading.Thread(target=worker, args=('read',)) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=('write',)) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for kind in ('read', 'write'):
+            stats = summarize(latencies[kind])
+            self.stdout.write(format_summary(f'dashboard {kind}s', stats))
+            self.stdout.write(
+                f'  throughput={stats["count"] / options["duration"]:.1f}/s  '
+                f'locked errors={errors[kind]}'
+            )
@@ -0,0 +1,120 @@
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import Student
+from academics.benchmarking import format_summary, summarize, time_calls
+from academics.models import AcademicYear, Unit, Result
+from academics.utils import GradeCalculator
+
+
+def joined_wma(student, academic_year=None):
+    """
+    WMA computed the way it was before credit_units/academic_year were
+    copied onto Result: filter through unit__academic_year and read
+    credit_units from the joined Unit row.
+    """
+    if academic_year:
+        results = Result.objects.filter(
+            student=student,
+            unit__academic_year=academic_year
+        ).select_related('unit')
+    else:
+        results = Result.objects.filter(student=student).select_related('unit')
+
+    if not results.exists():
+        return 0.0
+
+    total_points = Decimal('0.00')
+    total_credit_units = 0
+    for result in results:
+        total_points += Decimal(str(result.score)) * Decimal(result.unit.credit_units)
+        total_credit_units += result.unit.credit_units
+    results.exclude(grade='E').count()
+    return float(round(total_points / Decimal(total_credit_units), 2))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark calculate_wma on a large synthetic results table (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--results', type=int, default=1000000, help='Total result rows to create')
+        parser.add_argument('--units-per-student', type=int, default=40, help='Results per student')
+        parser.add_argument('--semesters', type=int, default=8, help='Academic years to spread units over')
+        parser.add_argument('--samples', type=int, default=200, help='Students sampled for timing')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Insert batch size')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            students, years = self.seed(options)
+            sample = random.sample(students, min(options['samples'], len(students)))
+
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Timing {len(sample)} students over {Result.objects.count()} results'
+            ))
+            cases = [
+                ('joined (all years)', lambda s: joined_wma(s)),
+                ('denormalized (all years)', lambda s: GradeCalculator.calculate_wma(s)),
+                ('joined (one semester)', lambda s: joined_wma(s, years[0])),
+                ('denormalized (one semester)', lambda s: GradeCalculator.calculate_wma(s, years[0])),
+            ]
+            for label, func in cases:
+                samples = []
+                for student in sample:
+                    samples.extend(time_calls(lambda: func(student), 1))
+                self.stdout.write(format_summary(label, summarize(samples)))
+
+            # Leave the database exactly as it was
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        """Create units, students and results for the benchmark."""
+        start = time.perf_counter()
+        per_student = options['units_per_student']
+        semesters = max(1, options['semesters'])
+        student_count = max(1, options['results'] // per_student)
+        batch_size = options['batch_size']
+
+        years = [
+            AcademicYear.objects.create(year=3000 + i // 2, semester=i % 2 + 1)
+            for i in range(semesters)
+        ]
+        Unit.objects.bulk_create([
+            Unit(
+                code=f'BENCH{i:04d}',
+                name=f'Benchmark Unit {i}',
+                credit_units=random.randint(2, 4),
+                academic_year=years[i % semesters]
+            )
+            for i in range(per_student)
+        ], batch_size=batch_size)
+        units = list(Unit.objects.filter(code__startswith='BENCH'))
+
+        User.objects.bulk_create([
+            User(username=f'bench{i}') for i in range(student_count)
+        ], batch_size=batch_size)
+        users = User.objects.filter(username__startswith='bench').order_by('pk')
+        Student.objects.bulk_create([
+            Student(user=user, registration_number=f'BENCH-{user.pk}')
+            for user in users.iterator()
+        ], batch_size=batch_size)
+        students = list(Student.objects.filter(registration_number__startswith='BENCH-'))
+
+        batch = []
+        for student in students:
+            for unit in units:
+                batch.append(Result(student=student, unit=unit, score=random.randint(20, 100)))
+                if len(batch) >= batch_size:
+                    Result.objects.bulk_record(batch, batch_size=batch_size)
+                    batch = []
+        if batch:
+            Result.objects.bulk_record(batch, batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Seeded {len(students)} students x {len(units)} units in {time.perf_counter() - start:.1f}s'
+        ))
+        return students, years
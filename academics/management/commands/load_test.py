@@ -0,0 +1,305 @@
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from accounts.models import Student
+from academics.benchmarking import format_summary, summarize
+from academics.models import AcademicYear, GradeAlert, Result, ResultSummary, Unit
+
+PREFIX = 'LOADT'
+PASSWORD = 'load-test-password'
+# Reserved for the seeded units; no real intake uses year 3400
+YEAR = 3400
+
+# Requests a logged-in student makes on results day, by relative weight
+TRAFFIC_MIX = [
+    ('academics:dashboard', 40),
+    ('academics:transcript', 25),
+    ('academics:analytics', 15),
+    ('academics:mark_alert_read', 12),
+    ('academics:transcript_export', 8),
+]
+
+
+class TestClientTransport:
+    """Requests through Django's test client, in this process."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None):
+        response = getattr(self.client, method)(path, data or {})
+        return response.status_code
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPTransport:
+    """Requests over HTTP to a running server, with cookies and CSRF token."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect
+        )
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, method, path, data=None):
+        url = self.base_url + path
+        headers = {'Referer': url}
+        body = None
+        if method == 'post':
+            if not self.csrf_token():
+                # Sets the CSRF cookie
+                self.request('get', reverse('accounts:login'))
+            data = dict(data or {}, csrfmiddlewaretoken=self.csrf_token())
+            body = urllib.parse.urlencode(data).encode()
+            headers['X-CSRFToken'] = self.csrf_token()
+        try:
+            with self.opener.open(urllib.request.Request(url, data=body, headers=headers), timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay results-release traffic (login, dashboard, transcript, analytics, '
+        'PDF export, mark alert read) from concurrent scripted sessions and report '
+        'throughput and latency percentiles per endpoint. Runs in process by default; '
+        'with --base-url it drives a running server, which must use this database. '
+        'Every session then logs in from this machine\'s IP, so raise LOGIN_RATE_PER_IP '
+        '(and LOGIN_MAX_CONCURRENT_HASHES if logins get 429s) on the target first; '
+        'sessions whose login is refused are skipped and reported as a warning.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50, help='Synthetic students to seed')
+        parser.add_argument('--units', type=int, default=40, help='Results per student')
+        parser.add_argument('--alerts', type=int, default=20, help='Unread alerts per student')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent sessions')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+        parser.add_argument('--actions', type=int, default=10, help='Requests per session after login')
+        parser.add_argument('--base-url', default='', help='e.g. http://127.0.0.1:8000 to load a running server')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the session scripts')
+        parser.add_argument('--keep', action='store_true', help='Leave the seeded data in place')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Delete data left by an earlier --keep or interrupted run instead of refusing to start'
+        )
+
+    def handle(self, *args, **options):
+        if options['students'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--students and --concurrency must be at least 1')
+
+        if self.seeded_users().exists() or AcademicYear.objects.filter(year=YEAR).exists():
+            if not options['force']:
+                raise CommandError(
+                    f'Load test data from an earlier run exists (academic year {YEAR}, '
+                    f'{PREFIX}- students); rerun with --force to delete it'
+                )
+            self.cleanup()
+        taken = list(User.objects.filter(username__in=self.usernames(options)).values_list('username', flat=True))
+        if taken:
+            raise CommandError(f'Usernames reserved for load test students are taken: {", ".join(taken[:5])}')
+
+        try:
+            students = self.seed(options)
+            if options['base_url']:
+                samples, statuses, elapsed = self.run(students, options)
+            else:
+                # The test client needs 'testserver' allowed; one client IP
+                # would otherwise trip the per-IP login limit immediately
+                setup_test_environment()
+                try:
+                    with override_settings(LOGIN_RATE_PER_IP=10 ** 6, LOGIN_RATE_PER_ACCOUNT=10 ** 6):
+                        samples, statuses, elapsed = self.run(students, options)
+                finally:
+                    teardown_test_environment()
+            self.report(samples, statuses, elapsed)
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def seed(self, options):
+        """
+        Create committed students with results and unread alerts.
+
+        Returns:
+            List of (registration_number, [alert ids]) per student
+        """
+        start = time.perf_counter()
+        year = AcademicYear.objects.create(year=YEAR, semester=1)
+        Unit.objects.bulk_create([
+            Unit(code=f'{PREFIX}{i:04d}', name=f'Load Test Unit {i}', credit_units=random.randint(2, 4), academic_year=year)
+            for i in range(options['units'])
+        ])
+        units = list(Unit.objects.filter(academic_year=year))
+
+        # One hash shared by every account; logins still pay the full check
+        password = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(username=username, password=password, first_name='Load', last_name=str(i))
+            for i, username in enumerate(self.usernames(options))
+        ])
+        Student.objects.bulk_create([
+            Student(user=user, registration_number=f'{PREFIX}-{user.pk:06d}', course='Load Testing')
+            for user in User.objects.filter(username__in=self.usernames(options))
+        ])
+        students = list(Student.objects.filter(registration_number__startswith=f'{PREFIX}-'))
+        # bulk_create skips the signal that creates these
+        ResultSummary.objects.bulk_create([ResultSummary(student=student) for student in students])
+
+        Result.objects.bulk_record(
+            Result(student=student, unit=unit, score=random.randint(20, 100))
+            for student in students for unit in units
+        )
+        GradeAlert.objects.bulk_create([
+            GradeAlert(student=student, alert_type='low_grade', title=f'Alert {i}', message='Load test alert')
+            for student in students for i in range(options['alerts'])
+        ])
+        alert_ids = {}
+        for student_id, alert_id in GradeAlert.objects.filter(student__in=students).values_list('student_id', 'pk'):
+            alert_ids.setdefault(student_id, []).append(alert_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Seeded {len(students)} students x {len(units)} results in {time.perf_counter() - start:.1f}s'
+        ))
+        return [(student.registration_number, alert_ids.get(student.pk, [])) for student in students]
+
+    def usernames(self, options):
+        return [f'loadtest-{PREFIX.lower()}{i}' for i in range(options['students'])]
+
+    def seeded_users(self):
+        """Users this command created: load test names with a LOADT- student profile."""
+        return User.objects.filter(
+            username__startswith=f'loadtest-{PREFIX.lower()}',
+            student__registration_number__startswith=f'{PREFIX}-'
+        )
+
+    def cleanup(self):
+        """Remove the synthetic data, and nothing that merely looks like it."""
+        self.seeded_users().delete()
+        AcademicYear.objects.filter(year=YEAR).delete()
+
+    def run(self, students, options):
+        """
+        Run options['concurrency'] workers, each replaying sessions until the duration ends.
+
+        Returns:
+            Tuple of ({endpoint: [ms]}, {endpoint: {status: count}}, elapsed seconds)
+        """
+        lock = threading.Lock()
+        samples, statuses = {}, {}
+        deadline = time.perf_counter() + options['duration']
+        endpoints = [name for name, _ in TRAFFIC_MIX]
+        weights = [weight for _, weight in TRAFFIC_MIX]
+
+        def new_transport():
+            if options['base_url']:
+                return HTTPTransport(options['base_url'])
+            return TestClientTransport()
+
+        def worker(index):
+            rng = random.Random(options['seed'] * 1000 + index)
+            local_samples, local_statuses = {}, {}
+
+            def timed(name, method, path, data=None):
+                start = time.perf_counter()
+                try:
+                    status = transport.request(method, path, data)
+                except Exception:
+                    status = 'error'
+                local_samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+                counts = local_statuses.setdefault(name, {})
+                counts[status] = counts.get(status, 0) + 1
+                return status
+
+            try:
+                while time.perf_counter() < deadline:
+                    registration_number, alert_ids = rng.choice(students)
+                    transport = new_transport()
+                    status = timed('accounts:login', 'post', reverse('accounts:login'), {
+                        'registration_number': registration_number,
+                        'password': PASSWORD,
+                    })
+                    if status != 302:
+                        continue
+                    for name in rng.choices(endpoints, weights, k=options['actions']):
+                        if time.perf_counter() >= deadline:
+                            break
+                        if name == 'academics:mark_alert_read':
+                            if not alert_ids:
+                                continue
+                            timed(name, 'post', reverse(name, kwargs={'alert_id': rng.choice(alert_ids)}))
+                        else:
+                            timed(name, 'get', reverse(name))
+            finally:
+                connections.close_all()
+
+            with lock:
+                for name, values in local_samples.items():
+                    samples.setdefault(name, []).extend(values)
+                for name, counts in local_statuses.items():
+                    totals = statuses.setdefault(name, {})
+                    for status, count in counts.items():
+                        totals[status] = totals.get(status, 0) + count
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, statuses, time.perf_counter() - start
+
+    def report(self, samples, statuses, elapsed):
+        """Print throughput, latency percentiles and status codes per endpoint."""
+        total = sum(len(values) for values in samples.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {total} requests in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} req/s)'
+        ))
+        for name in ['accounts:login'] + [name for name, _ in TRAFFIC_MIX]:
+            if name not in samples:
+                continue
+            codes = ' '.join(f'{status}:{count}' for status, count in sorted(statuses[name].items(), key=str))
+            self.stdout.write(
+                format_summary(f'  {name}', summarize(samples[name]))
+                + f'  {len(samples[name]) / elapsed:7.1f} req/s  [{codes}]'
+            )
+        all_samples = [value for values in samples.values() for value in values]
+        self.stdout.write(format_summary('  all', summarize(all_samples)))
+
+        logins = statuses.get('accounts:login', {})
+        refused = sum(count for status, count in logins.items() if status != 302)
+        if refused:
+            # Those sessions never reached the app, so the figures above partly
+            # measure the login throttle
+            codes = ' '.join(f'{status}:{count}' for status, count in sorted(logins.items(), key=str) if status != 302)
+            self.stdout.write(self.style.WARNING(
+                f'! {refused} of {sum(logins.values())} logins failed [{codes}] and their sessions were skipped; '
+                'against a server, raise LOGIN_RATE_PER_IP and LOGIN_MAX_CONCURRENT_HASHES there'
+            ))
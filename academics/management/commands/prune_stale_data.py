@@ -0,0 +1,101 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import OutgoingEmail
+from academics.models import GradeAlert
+from monitoring.models import ProfileCapture
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete read grade alerts past the retention age, expired sessions and '
+        'sent emails and request profiles past their retention ages '
+        'in small batches. Safe to run while the site is live.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--alert-days', type=int, default=settings.GRADE_ALERT_RETENTION_DAYS,
+            help='Delete read alerts older than this many days'
+        )
+        parser.add_argument(
+            '--email-days', type=int, default=settings.EMAIL_OUTBOX_RETENTION_DAYS,
+            help='Delete sent emails older than this many days'
+        )
+        parser.add_argument(
+            '--profile-days', type=int, default=settings.PROFILE_RETENTION_DAYS,
+            help='Delete request profiles older than this many days'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['alert_days'])
+        targets = [
+            (
+                f'read alerts older than {options["alert_days"]} days',
+                GradeAlert.objects.filter(is_read=True, created_at__lt=cutoff).order_by('pk')
+            ),
+            (
+                'expired sessions',
+                Session.objects.filter(expire_date__lt=timezone.now()).order_by('expire_date')
+            ),
+            (
+                f'sent emails older than {options["email_days"]} days',
+                OutgoingEmail.objects.filter(
+                    status=OutgoingEmail.STATUS_SENT,
+                    sent_at__lt=timezone.now() - timedelta(days=options['email_days'])
+                ).order_by('pk')
+            ),
+            (
+                f'request profiles older than {options["profile_days"]} days',
+                ProfileCapture.objects.filter(
+                    created_at__lt=timezone.now() - timedelta(days=options['profile_days'])
+                ).order_by('pk')
+            ),
+        ]
+
+        for label, queryset in targets:
+            if options['dry_run']:
+                self.stdout.write(f'Would delete {queryset.count()} {label}')
+                continue
+            start = time.perf_counter()
+            deleted, batches = self.delete_in_batches(queryset, options['batch_size'], options['pause'])
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Deleted {deleted} {label} in {time.perf_counter() - start:.2f}s ({batches} batches)'
+            ))
+
+    def delete_in_batches(self, queryset, batch_size, pause):
+        """
+        Delete a queryset's rows in its order, one short transaction per batch.
+
+        Args:
+            queryset: Ordered rows to delete
+            batch_size: Maximum rows per transaction
+            pause: Seconds to sleep between batches so other writers get the lock
+
+        Returns:
+            (rows deleted, batches run)
+        """
+        model = queryset.model
+        deleted = batches = 0
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                count, _ = model.objects.filter(pk__in=pks).delete()
+            deleted += count
+            batches += 1
+            if len(pks) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        return deleted, batches
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_notificationpreference_gradeanalytics_gradealert'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gradealert',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['student', 'created_at'], name='alert_student_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gradealert',
+            index=models.Index(fields=['student', 'created_at', 'id'], name='alert_student_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['student', 'score'], name='result_student_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['student', 'created_at'], name='result_student_created_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='academic_year',
+            field=models.ForeignKey(editable=False, help_text="Copy of the unit's academic year", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='results', to='academics.academicyear'),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='credit_units',
+            field=models.IntegerField(default=3, editable=False, help_text="Copy of the unit's credit units"),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['student', 'academic_year'], name='result_student_year_idx'),
+        ),
+    ]
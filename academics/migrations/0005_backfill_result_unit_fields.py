@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_result_unit_fields(apps, schema_editor):
+    """Copy credit_units and academic_year from each result's unit."""
+    Result = apps.get_model('academics', 'Result')
+    Unit = apps.get_model('academics', 'Unit')
+
+    unit = Unit.objects.filter(pk=OuterRef('unit_id'))
+    Result.objects.update(
+        credit_units=Subquery(unit.values('credit_units')[:1]),
+        academic_year_id=Subquery(unit.values('academic_year_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_result_denormalized_unit_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_result_unit_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_result_summaries(apps, schema_editor):
+    """Give every existing student a ResultSummary."""
+    Student = apps.get_model('accounts', 'Student')
+    ResultSummary = apps.get_model('academics', 'ResultSummary')
+    ResultSummary.objects.bulk_create(
+        (ResultSummary(student_id=pk) for pk in Student.objects.values_list('pk', flat=True).iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('academics', '0005_backfill_result_unit_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result_summary', to='accounts.student')),
+            ],
+            options={
+                'verbose_name_plural': 'Result summaries',
+            },
+        ),
+        migrations.RunPython(create_result_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:50
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    """Compute every summary's running totals from its student's results."""
+    Result = apps.get_model('academics', 'Result')
+    ResultSummary = apps.get_model('academics', 'ResultSummary')
+    results = Result.objects.filter(
+        student_id=OuterRef('student_id'),
+        score__gte=0,
+        score__lte=100
+    ).order_by().values('student_id')
+    aggregates = {
+        'total_points': Sum(F('score') * F('credit_units')),
+        'total_credit_units': Sum('credit_units'),
+        'units_recorded': Count('id'),
+        'units_completed': Count('id', filter=~Q(grade='E')),
+        'failed_units': Count('id', filter=Q(grade='E')),
+    }
+    ResultSummary.objects.update(**{
+        field: Coalesce(Subquery(results.annotate(total=aggregate).values('total')), 0)
+        for field, aggregate in aggregates.items()
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_result_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultsummary',
+            name='failed_units',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='total_credit_units',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='total_points',
+            field=models.PositiveBigIntegerField(default=0, help_text='Sum of score × credit units over all results'),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='units_completed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='units_recorded',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
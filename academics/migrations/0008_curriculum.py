@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_result_summary_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultsummary',
+            name='curriculum_units',
+            field=models.PositiveIntegerField(default=0, help_text="Units the student's course requires"),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='remaining_credit_units',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resultsummary',
+            name='remaining_units',
+            field=models.PositiveIntegerField(default=0, help_text='Required units without a result yet'),
+        ),
+        migrations.CreateModel(
+            name='CurriculumUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course', models.CharField(help_text="Exactly as on the students' profiles, e.g. Bachelor of Science in Computer Science", max_length=100)),
+                ('year_of_study', models.IntegerField(choices=[(1, 'Year 1'), (2, 'Year 2'), (3, 'Year 3'), (4, 'Year 4')])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='curriculum_entries', to='academics.unit')),
+            ],
+            options={
+                'verbose_name_plural': 'Curriculum units',
+                'ordering': ['course', 'year_of_study', 'unit'],
+                'unique_together': {('course', 'unit')},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def recount_remaining(apps, schema_editor):
+    """Recount remaining units so failed (E) results no longer count as done."""
+    CurriculumUnit = apps.get_model('academics', 'CurriculumUnit')
+    Result = apps.get_model('academics', 'Result')
+    ResultSummary = apps.get_model('academics', 'ResultSummary')
+    Student = apps.get_model('accounts', 'Student')
+    course = Student.objects.filter(pk=OuterRef(OuterRef('student_id'))).values('course')
+    curriculum = CurriculumUnit.objects.filter(course=Subquery(course)).order_by().values('course')
+    remaining = curriculum.filter(~Exists(Result.objects.filter(
+        student_id=OuterRef(OuterRef('student_id')),
+        unit_id=OuterRef('unit_id')
+    ).exclude(grade='E')))
+    ResultSummary.objects.update(**{
+        field: Coalesce(Subquery(queryset.annotate(total=aggregate).values('total')), 0)
+        for field, queryset, aggregate in (
+            ('remaining_units', remaining, Count('id')),
+            ('remaining_credit_units', remaining, Sum('unit__credit_units')),
+        )
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_curriculum'),
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resultsummary',
+            name='remaining_units',
+            field=models.PositiveIntegerField(default=0, help_text='Required units without a passing result yet'),
+        ),
+        migrations.RunPython(recount_remaining, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from accounts.models import Student
+from jkuat_gpa.db_router import pin_students
 
 
 class AcademicYear(models.Model):
@@ -55,6 +58,178 @@ class Unit(models.Model):
     
     def __str__(self):
         return f"{self.code} - {self.name}"
+    
+    def save(self, *args, **kwargs):
+        """Override save to keep the copies stored on Result in sync."""
+        super().save(*args, **kwargs)
+        
+        # Result stores credit_units/academic_year (and points derived from
+        # them) so GPA aggregates never need to join back to Unit
+        self.results.exclude(
+            credit_units=self.credit_units,
+            academic_year_id=self.academic_year_id
+        ).update(
+            credit_units=self.credit_units,
+            academic_year_id=self.academic_year_id,
+            points=F('score') * self.credit_units
+        )
+        
+        # Code, name and credit units all show up in students' results
+        results_changed(self.results.values_list('student_id', flat=True))
+        
+        # Students yet to take it count its credit units as remaining
+        curriculum_changed(ResultSummary.objects.filter(
+            student__course__in=self.curriculum_entries.values('course')
+        ))
+
+
+class CurriculumUnit(models.Model):
+    """
+    A unit that a course requires in a given year of study.
+    
+    `course` matches Student.course. A student's remaining units are the
+    curriculum units of their course they have not passed; their totals
+    are counted onto ResultSummary so projections don't re-derive them,
+    and remaining_by_year() breaks them down by year of study.
+    """
+    course = models.CharField(
+        max_length=100,
+        help_text="Exactly as on the students' profiles, e.g. Bachelor of Science in Computer Science"
+    )
+    year_of_study = models.IntegerField(choices=Student.YEAR_CHOICES)
+    unit = models.ForeignKey(
+        Unit,
+        on_delete=models.CASCADE,
+        related_name='curriculum_entries'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['course', 'year_of_study', 'unit']
+        unique_together = ['course', 'unit']
+        verbose_name_plural = "Curriculum units"
+    
+    def __str__(self):
+        return f"{self.course} (Year {self.year_of_study}): {self.unit.code}"
+    
+    @classmethod
+    def remaining_by_year(cls, student):
+        """
+        The student's remaining curriculum grouped by year of study.
+        
+        Same rule as ResultSummary.remaining_expressions(): a unit is done
+        once it has a passing result. Earlier years are included, since a
+        unit left over from year 1 still has to be taken in year 3.
+        
+        Returns:
+            List of {'year_of_study', 'units', 'credit_units'} dicts, by year
+        """
+        passed = Result.objects.filter(student=student, unit_id=OuterRef('unit_id')).exclude(grade='E')
+        return list(
+            cls.objects.filter(course=student.course)
+            .filter(~Exists(passed))
+            .order_by('year_of_study')
+            .values('year_of_study')
+            .annotate(units=Count('id'), credit_units=Sum('unit__credit_units'))
+        )
+
+
+def results_changed(student_ids):
+    """
+    Record that these students' results changed.
+    
+    Bumps each student's ResultSummary version (which invalidates ETags
+    and cached fragments), recomputes their running totals and pins their
+    reads to the primary database.
+    """
+    student_ids = set(student_ids)
+    if not student_ids:
+        return
+    ResultSummary.objects.filter(student_id__in=student_ids).update(
+        version=F('version') + 1,
+        updated_at=timezone.now(),
+        **ResultSummary.total_expressions(),
+        **ResultSummary.remaining_expressions()
+    )
+    pin_students(student_ids)
+
+
+def curriculum_changed(summaries):
+    """
+    Recompute the remaining-curriculum counts on these ResultSummary rows.
+    
+    For changes that don't touch results: a course's curriculum, a
+    student's course or a required unit's credit units. Bumps the
+    version since projections change with them.
+    """
+    summaries.update(
+        version=F('version') + 1,
+        updated_at=timezone.now(),
+        **ResultSummary.remaining_expressions()
+    )
+
+
+class ResultQuerySet(models.QuerySet):
+    """
+    QuerySet for Result with bulk write and weighted points helpers.
+    """
+    
+    # Fields rewritten when bulk_record hits an existing (student, unit) row
+    UPSERT_FIELDS = ['score', 'grade', 'points', 'credit_units', 'academic_year', 'updated_at']
+    
+    def with_points(self):
+        """Annotate weighted_points (score × credit_units) computed in the database."""
+        return self.annotate(
+            weighted_points=models.ExpressionWrapper(
+                F('score') * F('credit_units'),
+                output_field=models.DecimalField(max_digits=5, decimal_places=2)
+            )
+        )
+    
+    def bulk_record(self, rows, batch_size=1000):
+        """
+        Insert or update many results in one pass.
+        
+        Grade, points and the copied unit fields are computed exactly as
+        Result.save does, using one query to preload every unit involved
+        instead of a lazy unit fetch per row. Existing (student, unit)
+        rows are updated in place.
+        
+        Args:
+            rows: Iterable of unsaved Result instances with student, unit and score set
+            batch_size: Rows per INSERT statement
+            
+        Returns:
+            List of the recorded Result instances
+        """
+        # Last row wins when the same (student, unit) appears more than once
+        latest = {}
+        for row in rows:
+            latest[(row.student_id, row.unit_id)] = row
+        rows = list(latest.values())
+        if not rows:
+            return []
+        
+        unit_fields = {
+            pk: (credit_units, academic_year_id)
+            for pk, credit_units, academic_year_id in Unit.objects.filter(
+                pk__in={row.unit_id for row in rows}
+            ).values_list('pk', 'credit_units', 'academic_year_id')
+        }
+        for row in rows:
+            row.set_computed_fields(*unit_fields[row.unit_id])
+        
+        recorded = self.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['student', 'unit'],
+            update_fields=self.UPSERT_FIELDS
+        )
+        
+        # bulk_create sends no post_save, so do what academics.signals would
+        results_changed({row.student_id for row in rows})
+        return recorded
 
 
 class Result(models.Model):
@@ -84,6 +259,21 @@ class Result(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(100)],
         help_text="Score out of 100"
     )
+    # Denormalized from unit so per-student and per-semester aggregates
+    # read a single table; kept in sync by Result.save and Unit.save
+    credit_units = models.IntegerField(
+        default=3,
+        editable=False,
+        help_text="Copy of the unit's credit units"
+    )
+    academic_year = models.ForeignKey(
+        AcademicYear,
+        on_delete=models.CASCADE,
+        related_name='results',
+        null=True,
+        editable=False,
+        help_text="Copy of the unit's academic year"
+    )
     grade = models.CharField(
         max_length=1, 
         choices=GRADE_CHOICES,
@@ -101,36 +291,59 @@ class Result(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ResultQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         unique_together = ['student', 'unit']
         verbose_name_plural = "Results"
+        indexes = [
+            # Per-student and per-semester GPA aggregates
+            models.Index(fields=['student', 'academic_year'], name='result_student_year_idx'),
+            # Analytics: best/worst unit and "score below X" filters per student
+            models.Index(fields=['student', 'score'], name='result_student_score_idx'),
+            # Default ordering and the trend calculation per student
+            models.Index(fields=['student', 'created_at'], name='result_student_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student} - {self.unit.code}: {self.score}%"
     
+    @staticmethod
+    def grade_for_score(score):
+        """Return the letter grade for a score out of 100."""
+        if score >= 70:
+            return 'A'
+        elif score >= 60:
+            return 'B'
+        elif score >= 50:
+            return 'C'
+        elif score >= 40:
+            return 'D'
+        return 'E'
+    
+    def set_computed_fields(self, credit_units, academic_year_id):
+        """Set grade, points and the copied unit fields from the score."""
+        self.grade = Result.grade_for_score(self.score)
+        
+        # Copy unit fields used by aggregates
+        self.credit_units = credit_units
+        self.academic_year_id = academic_year_id
+        
+        # Calculate weighted points (score * credit_units)
+        self.points = self.score * credit_units
+    
     def save(self, *args, **kwargs):
         """Override save to auto-calculate grade and points."""
-        # Auto-calculate grade based on score
         if self.score is not None:
-            if self.score >= 70:
-                self.grade = 'A'
-            elif self.score >= 60:
-                self.grade = 'B'
-            elif self.score >= 50:
-                self.grade = 'C'
-            elif self.score >= 40:
-                self.grade = 'D'
-            else:
-                self.grade = 'E'
-            
-            # Calculate weighted points (score * credit_units)
-            self.points = self.score * self.unit.credit_units
+            self.set_computed_fields(self.unit.credit_units, self.unit.academic_year_id)
         else:
             self.grade = None
             self.points = 0
         
         super().save(*args, **kwargs)
+
+
 class GPACalculation(models.Model):
     """
     Stores calculated GPA/WMA for a student in a specific academic year.
@@ -224,6 +437,17 @@ class GradeAlert(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Unread count and unread listing per student; partial so it stays
+            # small as read alerts accumulate
+            models.Index(
+                fields=['student', 'created_at'],
+                name='alert_student_unread_idx',
+                condition=models.Q(is_read=False)
+            ),
+            # Alert listing per student, newest first
+            models.Index(fields=['student', 'created_at', 'id'], name='alert_student_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student} - {self.alert_type}"
@@ -255,3 +479,121 @@ class GradeAnalytics(models.Model):
         return f"{self.student} - Analytics"
 
 
+class ResultSummary(models.Model):
+    """
+    Per-student summary of recorded results.
+    
+    `version` increases every time any of the student's results change,
+    so it can key HTTP ETags and caches without re-reading the results.
+    The running totals are the student's GradeCalculator.wma_aggregates(),
+    so GPA and what-if figures are plain arithmetic on this one row.
+    Created with the student (academics.signals); bumped and recomputed
+    by results_changed().
+    """
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='result_summary'
+    )
+    version = models.PositiveIntegerField(default=0)
+    total_points = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Sum of score × credit units over all results"
+    )
+    total_credit_units = models.PositiveIntegerField(default=0)
+    units_recorded = models.PositiveIntegerField(default=0)
+    units_completed = models.PositiveIntegerField(default=0)
+    failed_units = models.PositiveIntegerField(default=0)
+    # Remaining-curriculum index; all zero when the course has no curriculum
+    curriculum_units = models.PositiveIntegerField(
+        default=0,
+        help_text="Units the student's course requires"
+    )
+    remaining_units = models.PositiveIntegerField(
+        default=0,
+        help_text="Required units without a passing result yet"
+    )
+    remaining_credit_units = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    TOTAL_FIELDS = ['total_points', 'total_credit_units', 'units_recorded', 'units_completed', 'failed_units']
+    REMAINING_FIELDS = ['curriculum_units', 'remaining_units', 'remaining_credit_units']
+    
+    class Meta:
+        verbose_name_plural = "Result summaries"
+    
+    def __str__(self):
+        return f"{self.student} - v{self.version}"
+    
+    @classmethod
+    def version_for(cls, student):
+        """Return the student's results version, creating the summary if missing."""
+        version = cls.objects.filter(student=student).values_list('version', flat=True).first()
+        if version is None:
+            version = cls.objects.get_or_create(student=student)[0].version
+        return version
+    
+    @classmethod
+    def for_student(cls, student):
+        """Return the student's summary, creating (and totalling) it if missing."""
+        summary, created = cls.objects.get_or_create(student=student)
+        if created:
+            cls.objects.filter(pk=summary.pk).update(**cls.total_expressions(), **cls.remaining_expressions())
+            summary.refresh_from_db(fields=cls.TOTAL_FIELDS + cls.REMAINING_FIELDS)
+        return summary
+    
+    @staticmethod
+    def total_expressions():
+        """
+        Update expressions recomputing every running total from Result.
+        
+        Each total is a correlated subquery on the row's own student, so
+        one UPDATE statement refreshes any number of summaries and always
+        reflects the results committed alongside it.
+        """
+        # utils imports this module
+        from .utils import GradeCalculator
+        
+        results = Result.objects.filter(
+            student_id=OuterRef('student_id'),
+            score__gte=0,
+            score__lte=100
+        ).order_by().values('student_id')
+        return {
+            field: Coalesce(Subquery(results.annotate(total=aggregate).values('total')), 0)
+            for field, aggregate in GradeCalculator.wma_aggregates().items()
+        }
+    
+    @staticmethod
+    def remaining_expressions():
+        """
+        Update expressions recomputing the remaining-curriculum counts.
+        
+        Correlated on the row's student like total_expressions(); the
+        course is read through a subquery since an UPDATE can't join.
+        """
+        course = Student.objects.filter(pk=OuterRef(OuterRef('student_id'))).values('course')
+        curriculum = CurriculumUnit.objects.filter(course=Subquery(course)).order_by().values('course')
+        # A failed (E) unit still has to be retaken, so only passes count as done
+        remaining = curriculum.filter(~Exists(Result.objects.filter(
+            student_id=OuterRef(OuterRef('student_id')),
+            unit_id=OuterRef('unit_id')
+        ).exclude(grade='E')))
+        return {
+            field: Coalesce(Subquery(queryset.annotate(total=aggregate).values('total')), 0)
+            for field, queryset, aggregate in (
+                ('curriculum_units', curriculum, Count('id')),
+                ('remaining_units', remaining, Count('id')),
+                ('remaining_credit_units', remaining, Sum('unit__credit_units')),
+            )
+        }
+    
+    def totals(self):
+        """Running totals in the shape of GradeCalculator.wma_aggregates()."""
+        return {field: getattr(self, field) for field in self.TOTAL_FIELDS}
+    
+    def remaining(self):
+        """(units, credit units) left in the student's curriculum, or None without one."""
+        if not self.curriculum_units:
+            return None
+        return self.remaining_units, self.remaining_credit_units
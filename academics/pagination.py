@@ -0,0 +1,181 @@
+"""
+Pagination helpers for large listings.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Return the database's own row estimate for a model's table.
+
+    Uses pg_class.reltuples on PostgreSQL and sqlite_stat1 (populated by
+    ANALYZE) on SQLite. Returns None when no estimate is available.
+
+    Args:
+        model: Django model class
+        using: Database alias
+
+    Returns:
+        Estimated row count or None
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)'
+    elif connection.vendor == 'sqlite':
+        # The first number of each stat row is the table's row count
+        sql = 'SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s'
+    else:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 only exists once ANALYZE has run
+        return None
+
+    if row and row[0] and row[0] > 0:
+        return int(row[0])
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids COUNT(*) over large unfiltered tables.
+
+    When the queryset has no WHERE clause and the planner estimates at
+    least estimate_threshold rows, the estimate is used as the count.
+    Filtered querysets and small tables still get an exact count.
+    """
+
+    # Below this many rows an exact COUNT(*) is cheap enough
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        """Return the estimated or exact total number of objects."""
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimated_row_count(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+
+class KeysetPage:
+    """
+    One page of keyset-paginated results.
+
+    Exposes the same has_next/has_previous flags as Django's Page, plus
+    opaque cursors for the neighbouring pages instead of page numbers.
+    """
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginationMixin:
+    """
+    Cursor (keyset) pagination for list views and JSON endpoints.
+
+    Orders by (keyset_field, pk) descending and seeks past the last row
+    seen instead of using OFFSET, so every page costs the same as the
+    first and no COUNT(*) is needed. Pages are selected with ?after=
+    (older rows) or ?before= (newer rows) cursors.
+
+    Works as a drop-in for ListView's paginate_by: page_obj becomes a
+    KeysetPage and paginator is None. JSON views call get_keyset_page().
+    """
+
+    keyset_field = 'created_at'
+    paginate_by = 10
+
+    def get_keyset_page(self, queryset, page_size=None):
+        """
+        Return a KeysetPage for the request's cursor.
+
+        Args:
+            queryset: Unordered or ordered queryset to paginate
+            page_size: Rows per page, defaults to paginate_by
+
+        Returns:
+            KeysetPage
+        """
+        page_size = page_size or self.paginate_by
+        field = self.keyset_field
+        after = self.decode_cursor(queryset.model, self.request.GET.get('after'))
+        before = self.decode_cursor(queryset.model, self.request.GET.get('before'))
+
+        if before is not None:
+            value, pk = before
+            rows = list(queryset.filter(
+                Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk})
+            ).order_by(field, 'pk')[:page_size + 1])
+            has_previous = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            has_next = True
+        else:
+            queryset = queryset.order_by(f'-{field}', '-pk')
+            if after is not None:
+                value, pk = after
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk})
+                )
+            rows = list(queryset[:page_size + 1])
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+            has_previous = after is not None
+
+        return KeysetPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=self.encode_cursor(rows[-1]) if has_next and rows else None,
+            previous_cursor=self.encode_cursor(rows[0]) if has_previous and rows else None,
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """ListView hook: paginate by keyset instead of page number."""
+        page = self.get_keyset_page(queryset, page_size)
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def encode_cursor(self, obj):
+        """Encode an object's (keyset_field, pk) position as an opaque cursor."""
+        field = obj._meta.get_field(self.keyset_field)
+        raw = json.dumps([field.value_to_string(obj), obj.pk])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, model, cursor):
+        """Decode a cursor into (keyset value, pk); invalid cursors mean the first page."""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            value, pk = json.loads(raw)
+            return model._meta.get_field(self.keyset_field).to_python(value), int(pk)
+        except (ValueError, TypeError, ValidationError):
+            return None
@@ -0,0 +1,55 @@
+"""
+Signal handlers keeping derived state in sync with Result writes.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Student
+from jkuat_gpa.db_router import pin_students
+from .models import CurriculumUnit, Result, ResultSummary, curriculum_changed, results_changed
+
+
+@receiver(post_save, sender=Result, dispatch_uid='academics.result_saved')
+@receiver(post_delete, sender=Result, dispatch_uid='academics.result_deleted')
+def result_changed(sender, instance, **kwargs):
+    """Bump the student's results version and pin their reads to the primary."""
+    results_changed([instance.student_id])
+
+
+@receiver(pre_save, sender=Student, dispatch_uid='academics.student_saving')
+def remember_student_course(sender, instance, **kwargs):
+    """Note the course before the save, so only a course change recounts."""
+    instance._previous_course = (
+        Student.objects.filter(pk=instance.pk).values_list('course', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Student, dispatch_uid='academics.student_saved')
+def student_saved(sender, instance, created, **kwargs):
+    """Every student gets a ResultSummary; a course change changes their remaining units."""
+    if created:
+        ResultSummary.objects.get_or_create(student=instance)
+    elif instance.course == getattr(instance, '_previous_course', instance.course):
+        # Profile edits leave the version, and so ETags and fragments, alone
+        return
+    curriculum_changed(ResultSummary.objects.filter(student=instance))
+    pin_students([instance.pk])
+
+
+@receiver(pre_save, sender=CurriculumUnit, dispatch_uid='academics.curriculum_unit_saving')
+def remember_curriculum_course(sender, instance, **kwargs):
+    """Note the course an edited entry is moving away from."""
+    instance._previous_course = (
+        CurriculumUnit.objects.filter(pk=instance.pk).values_list('course', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=CurriculumUnit, dispatch_uid='academics.curriculum_unit_saved')
+@receiver(post_delete, sender=CurriculumUnit, dispatch_uid='academics.curriculum_unit_deleted')
+def curriculum_unit_changed(sender, instance, **kwargs):
+    """Recount remaining units for every student of the affected course(s)."""
+    courses = {instance.course, getattr(instance, '_previous_course', None)} - {None}
+    curriculum_changed(ResultSummary.objects.filter(student__course__in=courses))
@@ -0,0 +1,122 @@
+"""
+Import-time budget for worker boot.
+
+Boots the project in a fresh interpreter under `python -X importtime`,
+the way a gunicorn worker does (django.setup(), the WSGI handler with
+its middleware, then the URLconf the first request would load), and
+checks:
+
+- modules that are meant to load lazily (reportlab, cProfile, ...) are
+  not imported at boot
+- the project's own modules stay within PROJECT_IMPORT_BUDGET_MS of
+  import time, excluding Django and other dependencies
+- the whole boot stays within BOOT_BUDGET_MS of wall time
+
+The budgets are deliberately loose so slow CI machines pass; a failure
+lists the slowest project modules. Profile locally with:
+    python -X importtime -c "import jkuat_gpa.wsgi" 2> importtime.txt
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from jkuat_gpa.warmup import warm_up
+
+PROJECT_PACKAGES = ('academics', 'accounts', 'monitoring', 'jkuat_gpa')
+PROJECT_IMPORT_BUDGET_MS = 100
+BOOT_BUDGET_MS = 3000
+
+# Only needed by PDF exports, request profiling and tests
+DEFERRED_MODULES = ('reportlab', 'cProfile', 'pstats', 'unittest')
+
+BOOT_SCRIPT = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(f'BOOT_MS={(time.perf_counter() - start) * 1000:.1f}')
+"""
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def boot_profile():
+    """
+    Boot the project in a subprocess under -X importtime.
+
+    Returns:
+        Tuple of ({module: self time in ms}, boot wall time in ms)
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='jkuat_gpa.settings', WARMUP_ON_BOOT='False')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        cwd=Path(settings.BASE_DIR), env=env, capture_output=True, text=True, timeout=120,
+    )
+    if completed.returncode:
+        raise AssertionError(f'Boot failed:\n{completed.stderr[-2000:]}')
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(1)) / 1000
+    boot_ms = float(re.search(r'BOOT_MS=([\d.]+)', completed.stdout).group(1))
+    return modules, boot_ms
+
+
+class ImportTimeTest(SimpleTestCase):
+    """Check what worker boot imports and how long it takes."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.modules, cls.boot_ms = boot_profile()
+
+    def test_heavy_modules_load_lazily(self):
+        """Modules only some requests need are not imported at boot."""
+        loaded = sorted(
+            name for name in self.modules
+            if name.split('.')[0] in DEFERRED_MODULES
+        )
+        self.assertEqual(loaded, [], 'Imported at boot; import them where they are used')
+
+    def test_project_import_budget(self):
+        """The project's own modules import within PROJECT_IMPORT_BUDGET_MS."""
+        project = {
+            name: ms for name, ms in self.modules.items()
+            if name.split('.')[0] in PROJECT_PACKAGES
+        }
+        self.assertIn('academics.views', project)
+        total = sum(project.values())
+        slowest = sorted(project.items(), key=lambda item: -item[1])[:10]
+        self.assertLessEqual(
+            total, PROJECT_IMPORT_BUDGET_MS,
+            'Project imports took {:.1f}ms; slowest:\n{}'.format(
+                total, '\n'.join(f'  {ms:7.1f}ms  {name}' for name, ms in slowest)
+            )
+        )
+
+    def test_boot_budget(self):
+        """Setup, middleware and URLconf load within BOOT_BUDGET_MS."""
+        self.assertLessEqual(self.boot_ms, BOOT_BUDGET_MS)
+
+
+class WarmUpTest(SimpleTestCase):
+    """Tests for the boot-time warm-up hook."""
+
+    def test_warm_up_loads_urls_templates_and_imports(self):
+        """warm_up() resolves the URLconf, compiles templates and imports modules."""
+        with override_settings(WARMUP_TEMPLATES=['base.html'], WARMUP_IMPORTS=['json']):
+            with self.assertLogs('jkuat_gpa.warmup', level='INFO'):
+                timings = warm_up()
+        self.assertEqual(set(timings), {'urls', 'templates', 'imports'})
@@ -3,13 +3,24 @@ Integration tests for the JKUAT GPA Calculator system.
 Tests full user workflows including login, dashboard, transcript, projection.
 """
 
-from django.test import TestCase, Client
+import json
+from unittest.mock import patch
+
+from django.test import TestCase, TransactionTestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
 from accounts.models import Student
-from academics.models import AcademicYear, Unit, Result, GPACalculation
+from academics.models import (
+    AcademicYear, CurriculumUnit, Unit, Result, ResultSummary, GPACalculation, GradeAlert, GradeAnalytics
+)
+from academics import views
 from academics.utils import GradeCalculator
+from datetime import timedelta
 from decimal import Decimal
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import caches
+from django.db import connection
+from django.utils import timezone
 
 
 class StudentAuthenticationFlowTest(TestCase):
@@ -271,6 +282,22 @@ class ProjectionViewTest(TestCase):
         projections = response.context['projections']
         self.assertIn('First Class Honours', projections)
         self.assertIn('Second Class (Upper)', projections)
+    
+    def test_projection_form_sets_remaining_units(self):
+        """The planner form replaces the default number of remaining units."""
+        self.client.login(username='student3', password='pass123')
+        response = self.client.get(reverse('academics:projection'), {'remaining_units': 3, 'target_honors': 60})
+        self.assertEqual(response.context['remaining_units'], 3)
+        self.assertEqual(response.context['selected_target'], 60.0)
+        # 75% over 3 credits, First Class needs (70 * 12 - 225) / 9
+        self.assertAlmostEqual(
+            response.context['projections']['First Class Honours']['required_average'],
+            (70 * 12 - 225) / 9
+        )
+        
+        invalid = self.client.get(reverse('academics:projection'), {'remaining_units': 99})
+        self.assertEqual(invalid.context['remaining_units'], views.DEFAULT_REMAINING_UNITS)
+        self.assertTrue(invalid.context['form'].errors)
 
 
 class GradeCalculatorValidationTest(TestCase):
@@ -428,3 +455,524 @@ class TemplateRenderingTest(TestCase):
         response = self.client.get(reverse('academics:projection'))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'academics/projection.html')
+
+
+class GradeAlertsPaginationTest(TestCase):
+    """Test keyset pagination of grade alerts."""
+    
+    def setUp(self):
+        """Create a student with 25 alerts, some sharing a timestamp."""
+        self.client = Client()
+        self.user = User.objects.create_user(username='alerted', password='pass123')
+        self.student = Student.objects.create(user=self.user, registration_number='ALRT001')
+        
+        now = timezone.now()
+        for i in range(25):
+            alert = GradeAlert.objects.create(
+                student=self.student,
+                alert_type='low_grade',
+                title=f'Alert {i}',
+                message='Message',
+                is_read=i % 3 == 0
+            )
+            # Pairs of alerts share a timestamp so the id tie-breaker matters
+            GradeAlert.objects.filter(pk=alert.pk).update(created_at=now - timedelta(minutes=25 - i // 2))
+        self.expected = list(
+            GradeAlert.objects.filter(student=self.student).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.client.login(username='alerted', password='pass123')
+    
+    def test_walk_pages_forward_and_back(self):
+        """Following cursors visits every alert once, in order, both ways."""
+        seen, pages = [], []
+        params = {}
+        while True:
+            response = self.client.get(reverse('academics:alerts'), params)
+            self.assertEqual(response.status_code, 200)
+            page = response.context['page_obj']
+            pages.append([alert.id for alert in page])
+            seen.extend(pages[-1])
+            if not page.has_next:
+                break
+            params = {'after': page.next_cursor}
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 3)
+        
+        # Walk back from the last page
+        previous = page.previous_cursor
+        response = self.client.get(reverse('academics:alerts'), {'before': previous})
+        self.assertEqual([alert.id for alert in response.context['page_obj']], pages[1])
+    
+    def test_deep_page_costs_same_as_first(self):
+        """Later pages run the same number of queries as the first."""
+        # Warm the session and request-user caches
+        self.client.get(reverse('academics:alerts'))
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(reverse('academics:alerts'))
+        cursor = response.context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(reverse('academics:alerts'), {'after': cursor})
+        self.assertEqual(len(first), len(deep))
+        self.assertFalse(any('OFFSET' in q['sql'].upper() for q in deep.captured_queries))
+    
+    def test_unread_count(self):
+        """Unread count covers all alerts, not just the current page."""
+        response = self.client.get(reverse('academics:alerts'))
+        self.assertEqual(response.context['unread_count'], 16)
+    
+    def test_invalid_cursor_returns_first_page(self):
+        """A garbled cursor falls back to the first page."""
+        response = self.client.get(reverse('academics:alerts'), {'after': 'not-a-cursor'})
+        self.assertEqual([alert.id for alert in response.context['page_obj']], self.expected[:10])
+    
+    def test_json_feed(self):
+        """The JSON feed pages with the same cursors."""
+        response = self.client.get(reverse('academics:alerts_feed'))
+        data = response.json()
+        self.assertEqual([a['id'] for a in data['alerts']], self.expected[:10])
+        self.assertIsNone(data['previous_cursor'])
+        
+        data = self.client.get(reverse('academics:alerts_feed'), {'after': data['next_cursor']}).json()
+        self.assertEqual([a['id'] for a in data['alerts']], self.expected[10:20])
+
+
+class ConditionalJSONAPITest(TestCase):
+    """Test the JSON API's ETags and If-None-Match handling."""
+    
+    def setUp(self):
+        """Log in a student with a few results."""
+        self.academic_year = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+        self.unit = Unit.objects.create(code='API101', name='API Unit', credit_units=3, academic_year=self.academic_year)
+        other = Unit.objects.create(code='API102', name='Other Unit', credit_units=4, academic_year=self.academic_year)
+        self.user = User.objects.create_user(username='apiuser', password='testpass123')
+        self.student = Student.objects.create(user=self.user, registration_number='API-0001', course='CS')
+        Result.objects.create(student=self.student, unit=self.unit, score=72)
+        Result.objects.create(student=self.student, unit=other, score=55)
+        self.client.force_login(self.user)
+    
+    def get(self, name, etag=None, **params):
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.client.get(reverse(name), params, headers=headers)
+    
+    def test_payloads(self):
+        """Summary, transcript and projection return compact JSON."""
+        summary = self.get('academics:api_summary')
+        self.assertEqual(summary.status_code, 200)
+        self.assertEqual(summary.json()['grade_distribution']['A'], 1)
+        self.assertNotIn(b', ', summary.content)
+        
+        transcript = self.get('academics:api_transcript').json()
+        self.assertEqual([unit['code'] for unit in transcript['units']], ['API101', 'API102'])
+        
+        projection = self.get('academics:api_projection', remaining_units=4).json()
+        self.assertEqual(projection['remaining_units'], 4)
+        self.assertIn('First Class Honours', projection['projections'])
+        self.assertEqual(self.get('academics:api_projection', remaining_units='x').status_code, 400)
+    
+    def test_matching_etag_returns_304_without_calculating(self):
+        """If-None-Match with the current ETag skips the calculators."""
+        etag = self.get('academics:api_summary')['ETag']
+        self.assertTrue(etag.startswith('"'))
+        with patch('academics.views.GradeCalculator.calculate_wma') as calculate:
+            response = self.get('academics:api_summary', etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(calculate.called)
+    
+    def test_etag_changes_with_results_and_units(self):
+        """Result saves, bulk_record and unit edits all change the ETag."""
+        etag = self.get('academics:api_transcript')['ETag']
+        
+        Result.objects.filter(unit=self.unit).get().save()
+        self.assertEqual(self.get('academics:api_transcript', etag).status_code, 200)
+        etag = self.get('academics:api_transcript')['ETag']
+        
+        Result.objects.bulk_record([Result(student=self.student, unit=self.unit, score=40)])
+        response = self.get('academics:api_transcript', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['units'][0]['score'], 40)
+        etag = response['ETag']
+        
+        self.unit.name = 'Renamed Unit'
+        self.unit.save()
+        response = self.get('academics:api_transcript', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['units'][0]['name'], 'Renamed Unit')
+    
+    def test_etag_differs_per_resource(self):
+        """Each endpoint and query string has its own ETag."""
+        etags = {
+            self.get('academics:api_summary')['ETag'],
+            self.get('academics:api_transcript')['ETag'],
+            self.get('academics:api_projection')['ETag'],
+            self.get('academics:api_projection', remaining_units=2)['ETag'],
+        }
+        self.assertEqual(len(etags), 4)
+
+
+class WhatIfAPITest(TestCase):
+    """Test the what-if endpoint computed from ResultSummary totals."""
+    
+    def setUp(self):
+        """Log in a student with two results and leave one unit unrecorded."""
+        self.academic_year = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+        self.units = [
+            Unit.objects.create(code=f'WIF10{i}', name=f'What If {i}', credit_units=credits, academic_year=self.academic_year)
+            for i, credits in enumerate([3, 4, 2])
+        ]
+        self.user = User.objects.create_user(username='whatif', password='testpass123')
+        self.student = Student.objects.create(user=self.user, registration_number='WIF-0001')
+        Result.objects.create(student=self.student, unit=self.units[0], score=50)
+        Result.objects.create(student=self.student, unit=self.units[1], score=80)
+        self.client.force_login(self.user)
+    
+    def what_if(self, **params):
+        return self.client.get(reverse('academics:api_what_if'), params)
+    
+    def test_matches_recording_the_scores(self):
+        """Hypothetical scores give the WMA that recording them would."""
+        data = self.what_if(score=['WIF100:72', 'WIF102:65']).json()
+        self.assertEqual(data['current_gpa'], GradeCalculator.calculate_wma(self.student)['gpa'])
+        
+        Result.objects.filter(student=self.student, unit=self.units[0]).update(score=72)
+        Result.objects.create(student=self.student, unit=self.units[2], score=65)
+        actual = GradeCalculator.calculate_wma(self.student)
+        self.assertEqual(data['gpa'], actual['gpa'])
+        self.assertEqual(data['honors_level'], actual['honors_level'])
+        self.assertEqual(data['total_credit_units'], actual['total_credit_units'])
+    
+    def test_remaining_credit_units(self):
+        """Remaining credit units are added at the assumed average."""
+        data = self.what_if(remaining_credit_units=7, remaining_average=100).json()
+        # (150 + 320 + 700) / 14
+        self.assertEqual(data['gpa'], round(1170 / 14, 2))
+        self.assertEqual(data['honors_level'], 'First Class Honours')
+        self.assertEqual(data['change'], round(data['gpa'] - data['current_gpa'], 2))
+    
+    def test_cost_does_not_grow_with_results(self):
+        """The endpoint never reads the student's results."""
+        self.what_if(score='WIF102:65')
+        with CaptureQueriesContext(connection) as before:
+            self.what_if(score='WIF102:65')
+        Result.objects.bulk_record(
+            Result(student=self.student, unit=unit, score=60)
+            for unit in Unit.objects.bulk_create([
+                Unit(code=f'WIFX{i:03d}', name='Extra', credit_units=3, academic_year=self.academic_year)
+                for i in range(100)
+            ])
+        )
+        with CaptureQueriesContext(connection) as after:
+            self.what_if(score='WIF102:65')
+        self.assertEqual(len(after), len(before))
+        self.assertFalse(any('SUM(' in query['sql'] for query in after.captured_queries))
+    
+    def test_invalid_input(self):
+        """Bad scores, unknown units and out-of-range values are rejected."""
+        for params in (
+            {'score': 'WIF100:101'},
+            {'score': 'WIF100'},
+            {'score': 'WIF100:abc'},
+            {'score': 'NOPE999:50'},
+            {'remaining_credit_units': -1},
+            {'remaining_average': 'x'},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.what_if(**params).status_code, 400)
+
+
+class CurriculumIndexTest(TestCase):
+    """Test the remaining-curriculum index on ResultSummary and the projections using it."""
+    
+    COURSE = 'Bachelor of Science in Computer Science'
+    
+    def setUp(self):
+        """A three-unit curriculum (3 + 4 + 2 credit units) and a student with one result."""
+        self.academic_year = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+        self.units = [
+            Unit.objects.create(code=f'CUR10{i}', name=f'Curriculum {i}', credit_units=credits, academic_year=self.academic_year)
+            for i, credits in enumerate([3, 4, 2])
+        ]
+        for year, unit in zip([1, 1, 2], self.units):
+            CurriculumUnit.objects.create(course=self.COURSE, year_of_study=year, unit=unit)
+        self.user = User.objects.create_user(username='curriculum', password='testpass123')
+        self.student = Student.objects.create(user=self.user, registration_number='CUR-0001', course=self.COURSE)
+        Result.objects.create(student=self.student, unit=self.units[0], score=60)
+        self.client.force_login(self.user)
+    
+    def remaining(self):
+        return ResultSummary.objects.get(student=self.student).remaining()
+    
+    def test_results_update_the_index(self):
+        """Recording and deleting results moves units in and out of the remainder."""
+        self.assertEqual(self.remaining(), (2, 6))
+        Result.objects.bulk_record([Result(student=self.student, unit=self.units[1], score=70)])
+        self.assertEqual(self.remaining(), (1, 2))
+        Result.objects.filter(student=self.student, unit=self.units[0]).delete()
+        # queryset.delete() sends post_delete per row
+        self.assertEqual(self.remaining(), (2, 5))
+    
+    def test_failed_units_stay_remaining(self):
+        """A failed required unit has to be retaken, so it still counts as remaining."""
+        Result.objects.bulk_record([Result(student=self.student, unit=self.units[1], score=30)])
+        self.assertEqual(self.remaining(), (2, 6))
+        Result.objects.bulk_record([Result(student=self.student, unit=self.units[1], score=55)])
+        self.assertEqual(self.remaining(), (1, 2))
+    
+    def test_curriculum_and_unit_changes_update_the_index(self):
+        """Curriculum edits and credit unit changes are reflected without new results."""
+        extra = Unit.objects.create(code='CUR200', name='Project', credit_units=5, academic_year=self.academic_year)
+        entry = CurriculumUnit.objects.create(course=self.COURSE, year_of_study=4, unit=extra)
+        self.assertEqual(self.remaining(), (3, 11))
+        
+        extra.credit_units = 6
+        extra.save()
+        self.assertEqual(self.remaining(), (3, 12))
+        
+        entry.course = 'Another Course'
+        entry.save()
+        self.assertEqual(self.remaining(), (2, 6))
+        
+        CurriculumUnit.objects.filter(course=self.COURSE).delete()
+        self.assertIsNone(self.remaining())
+    
+    def test_course_change_updates_the_index(self):
+        """A student moving to a course without a curriculum falls back to estimates."""
+        self.student.course = 'Another Course'
+        self.student.save()
+        self.assertIsNone(self.remaining())
+    
+    def test_profile_edit_keeps_the_version(self):
+        """Saving a student without changing their course doesn't invalidate caches."""
+        version = ResultSummary.version_for(self.student)
+        with patch('academics.signals.pin_students') as pin:
+            self.student.year_of_study = 2
+            self.student.save()
+            self.assertEqual(ResultSummary.version_for(self.student), version)
+            pin.assert_not_called()
+            
+            self.student.course = 'Another Course'
+            self.student.save()
+        self.assertGreater(ResultSummary.version_for(self.student), version)
+        # The next read sees the new course's remainder, not a stale replica
+        pin.assert_called_once_with([self.student.pk])
+    
+    def test_projection_uses_exact_credit_units(self):
+        """Required averages are computed over the curriculum's real credit units."""
+        data = self.client.get(reverse('academics:api_projection'), {'remaining_units': 15}).json()
+        self.assertEqual(data['remaining_source'], 'curriculum')
+        self.assertEqual(data['remaining_units'], 2)
+        self.assertEqual(data['remaining_credit_units'], 6)
+        # (70 x 9 - 60 x 3) / 6
+        self.assertAlmostEqual(data['projections']['First Class Honours']['required_average'], 75.0)
+        
+        response = self.client.get(reverse('academics:projection'), {'target_honors': 70})
+        self.assertTrue(response.context['from_curriculum'])
+        self.assertEqual(response.context['remaining_credit_units'], 6)
+        self.assertEqual(response.context['selected_target'], 70.0)
+        self.assertContains(response, 'left in your curriculum')
+    
+    def test_remaining_by_year(self):
+        """The remainder is broken down by the curriculum's year of study."""
+        self.assertEqual(CurriculumUnit.remaining_by_year(self.student), [
+            {'year_of_study': 1, 'units': 1, 'credit_units': 4},
+            {'year_of_study': 2, 'units': 1, 'credit_units': 2},
+        ])
+        data = self.client.get(reverse('academics:api_projection')).json()
+        self.assertEqual(data['remaining_by_year'][0], {'year_of_study': 1, 'units': 1, 'credit_units': 4})
+        self.assertContains(self.client.get(reverse('academics:projection')), 'Year 2: 1 units (2 credit units)')
+    
+    def test_projection_without_curriculum_estimates(self):
+        """Students of a course with no curriculum keep the 3-credit estimate."""
+        CurriculumUnit.objects.all().delete()
+        data = self.client.get(reverse('academics:api_projection'), {'remaining_units': 2}).json()
+        self.assertEqual(data['remaining_source'], 'estimate')
+        self.assertIsNone(data['remaining_credit_units'])
+        # (70 x 9 - 60 x 3) / 6, with 2 units assumed at 3 credit units each
+        self.assertAlmostEqual(data['projections']['First Class Honours']['required_average'], 75.0)
+
+
+class RegistrarGPAStreamTest(TestCase):
+    """Test the staff NDJSON GPA export."""
+    
+    def setUp(self):
+        """Create two courses of students with results."""
+        self.academic_year = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+        units = [
+            Unit.objects.create(code=f'REG{i}', name=f'Unit {i}', credit_units=2 + i, academic_year=self.academic_year)
+            for i in range(3)
+        ]
+        self.students = []
+        for i in range(7):
+            user = User.objects.create_user(username=f'reg{i}')
+            student = Student.objects.create(
+                user=user,
+                registration_number=f'REG-{i:03d}',
+                course='CS' if i < 5 else 'Maths',
+                year_of_study=2
+            )
+            Result.objects.bulk_record(
+                Result(student=student, unit=unit, score=(30 + 11 * i + 7 * j) % 101)
+                for j, unit in enumerate(units[:1 + i % 3])
+            )
+            self.students.append(student)
+        self.staff = User.objects.create_user(username='registrar', password='testpass123', is_staff=True)
+        self.client.force_login(self.staff)
+    
+    def read_lines(self, response):
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+    
+    def test_course_filter_matches_calculate_wma(self):
+        """Each line carries the same figures as calculate_wma."""
+        lines = self.read_lines(self.client.get(reverse('academics:registrar_gpa'), {'course': 'CS'}))
+        self.assertEqual([line['registration_number'] for line in lines], [f'REG-{i:03d}' for i in range(5)])
+        for line, student in zip(lines, self.students):
+            expected = GradeCalculator.calculate_wma(student)
+            self.assertEqual(line['gpa'], expected['gpa'])
+            self.assertEqual(line['honors_level'], expected['honors_level'])
+            self.assertEqual(line['total_credit_units'], expected['total_credit_units'])
+    
+    def test_queries_per_chunk_are_constant(self):
+        """Two queries per chunk: the students and one grouped aggregate."""
+        with patch.object(views.RegistrarGPAStreamView, 'chunk_size', 3):
+            response = self.client.get(reverse('academics:registrar_gpa'), {'year_of_study': 2})
+            # 7 students in chunks of 3, plus the final empty chunk lookup
+            with self.assertNumQueries(7):
+                lines = self.read_lines(response)
+        self.assertEqual(len(lines), 7)
+    
+    def test_registration_number_list(self):
+        """Lists keep their order and report unknown numbers."""
+        response = self.client.post(
+            reverse('academics:registrar_gpa'),
+            {'registration_numbers': ['REG-006', 'NOPE', 'REG-001', 'REG-006']},
+            content_type='application/json'
+        )
+        lines = self.read_lines(response)
+        self.assertEqual([line['registration_number'] for line in lines], ['REG-006', 'NOPE', 'REG-001'])
+        self.assertEqual(lines[1]['error'], 'Student not found')
+        
+        response = self.client.post(reverse('academics:registrar_gpa'), {'registration_numbers': 'REG-002, REG-003\nREG-004'})
+        self.assertEqual(len(self.read_lines(response)), 3)
+    
+    def test_registration_numbers_must_be_a_list_of_strings(self):
+        """A string or non-string entries in the JSON body are rejected, not iterated."""
+        for numbers in ('REG-001', ['REG-001', 7], {'REG-001': True}):
+            response = self.client.post(
+                reverse('academics:registrar_gpa'), {'registration_numbers': numbers}, content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['message'], 'registration_numbers must be a list of strings')
+    
+    def test_requires_selection_and_staff(self):
+        """Unfiltered requests are rejected, and students cannot use the endpoint."""
+        self.assertEqual(self.client.get(reverse('academics:registrar_gpa')).status_code, 400)
+        self.client.force_login(self.students[0].user)
+        self.assertEqual(self.client.get(reverse('academics:registrar_gpa'), {'course': 'CS'}).status_code, 403)
+
+
+class AsyncViewsTest(TransactionTestCase):
+    """Test the async dashboard and analytics views with real thread concurrency."""
+    
+    def setUp(self):
+        """Create a student with committed results visible to worker threads."""
+        self.academic_year = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+        self.user = User.objects.create_user(username='asyncuser', password='testpass123')
+        self.student = Student.objects.create(user=self.user, registration_number='ASY-0001')
+        Result.objects.bulk_record(
+            Result(
+                student=self.student,
+                unit=Unit.objects.create(code=f'ASY{i}', name=f'Unit {i}', credit_units=3, academic_year=self.academic_year),
+                score=score
+            )
+            for i, score in enumerate([45, 58, 69, 74, 81])
+        )
+        self.client.force_login(self.user)
+    
+    def test_async_dashboard_matches_sync(self):
+        """The async dashboard shows the same figures as the sync one."""
+        sync = self.client.get(reverse('academics:dashboard')).context
+        response = self.client.get(reverse('academics:dashboard_async'))
+        self.assertEqual(response.status_code, 200)
+        for key in ('gpa', 'honors', 'units_completed', 'grade_distribution', 'total_credit_units'):
+            self.assertEqual(response.context[key], sync[key])
+    
+    def test_async_analytics_matches_sync(self):
+        """The async analytics view stores and shows the same analytics."""
+        response = self.client.get(reverse('academics:analytics_async'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('error', response.context)
+        self.assertEqual(GradeAnalytics.objects.get(student=self.student).units_at_risk, 2)
+        sync = self.client.get(reverse('academics:analytics')).context
+        self.assertEqual(response.context['analytics'], sync['analytics'])
+        self.assertEqual(response.context['alerts'], sync['alerts'])
+    
+    def test_login_and_profile_required(self):
+        """Anonymous users are redirected; users without a profile see an error."""
+        self.client.logout()
+        response = self.client.get(reverse('academics:dashboard_async'))
+        self.assertEqual(response.status_code, 302)
+        
+        self.client.force_login(User.objects.create_user(username='noprofile'))
+        response = self.client.get(reverse('academics:analytics_async'))
+        self.assertIn('error', response.context)
+
+
+class FragmentCacheTest(TestCase):
+    """Test the results-versioned transcript and distribution fragments."""
+    
+    def setUp(self):
+        """Log in a student with results and start from an empty fragment cache."""
+        caches['template_fragments'].clear()
+        self.academic_year = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+        self.user = User.objects.create_user(username='fraguser', password='testpass123')
+        self.student = Student.objects.create(user=self.user, registration_number='FRG-0001')
+        self.units = [
+            Unit.objects.create(code=f'FRG{i}', name=f'Fragment Unit {i}', credit_units=3, academic_year=self.academic_year)
+            for i in range(4)
+        ]
+        Result.objects.bulk_record(Result(student=self.student, unit=unit, score=65) for unit in self.units)
+        self.client.force_login(self.user)
+    
+    def result_queries(self, name):
+        """Return the rendered page and the queries that read Result rows."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(name))
+        return response.content.decode(), [
+            q['sql'] for q in ctx.captured_queries
+            if 'FROM "academics_result"' in q['sql'] and 'SUM(' not in q['sql']
+        ]
+    
+    def test_transcript_table_is_cached_until_results_change(self):
+        """The transcript rows are read once, then again only after a result write."""
+        html, queries = self.result_queries('academics:transcript')
+        self.assertEqual(len(queries), 1)
+        self.assertIn('FRG3', html)
+        
+        html, queries = self.result_queries('academics:transcript')
+        self.assertEqual(queries, [])
+        self.assertIn('FRG3', html)
+        
+        Result.objects.create(
+            student=self.student,
+            unit=Unit.objects.create(code='FRG9', name='New Unit', credit_units=3, academic_year=self.academic_year),
+            score=80
+        )
+        html, queries = self.result_queries('academics:transcript')
+        self.assertEqual(len(queries), 1)
+        self.assertIn('FRG9', html)
+    
+    def test_grade_distribution_is_cached_until_results_change(self):
+        """The dashboard's distribution is computed once per results version."""
+        html, queries = self.result_queries('academics:dashboard')
+        self.assertEqual(len(queries), 1)
+        self.assertIn("'B': 4", html)
+        
+        html, queries = self.result_queries('academics:dashboard')
+        self.assertEqual(queries, [])
+        self.assertIn("'B': 4", html)
+        
+        Result.objects.bulk_record([Result(student=self.student, unit=self.units[0], score=90)])
+        html, queries = self.result_queries('academics:dashboard')
+        self.assertEqual(len(queries), 1)
+        self.assertIn("'A': 1", html)
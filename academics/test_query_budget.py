@@ -0,0 +1,224 @@
+"""
+Per-view query budget regression suite.
+
+Logs in synthetic students with 6, 40 and 200 results, hits every route
+in academics.urls and accounts.urls, and checks the query count of each
+request against academics/query_budgets.json. Every route is measured
+twice: cold (first request, caches empty, so fragment and ETag misses are
+counted) and warm (the same request again). Requests that repeat one
+statement shape fail too (see monitoring.nplusone).
+
+Wall time is recorded but only checked with CHECK_QUERY_BUDGET_TIME=1, on a
+machine comparable to the one that generated the budgets; timings are too
+noisy for the default run.
+
+After an intentional change, regenerate the budget file with:
+    UPDATE_QUERY_BUDGETS=1 python manage.py test academics.test_query_budget
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from django.core.cache import caches
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+import academics.urls
+import accounts.urls
+from accounts.models import Student
+from academics.models import AcademicYear, Unit, Result, GradeAlert
+from monitoring.nplusone import detect_repeated_queries
+
+BUDGET_FILE = Path(__file__).with_name('query_budgets.json')
+RESULT_SIZES = (6, 40, 200)
+UPDATE_BUDGETS = os.environ.get('UPDATE_QUERY_BUDGETS') == '1'
+CHECK_TIME = os.environ.get('CHECK_QUERY_BUDGET_TIME') == '1'
+
+
+def token_kwargs(case):
+    """URL kwargs for the email verification and password reset links."""
+    return {
+        'uidb64': urlsafe_base64_encode(force_bytes(case['user'].pk)),
+        'token': default_token_generator.make_token(case['user']),
+    }
+
+
+# How to request each route. Routes not listed are plain authenticated GETs.
+ROUTE_OPTIONS = {
+    'academics:mark_alert_read': {
+        'method': 'post',
+        'kwargs': lambda case: {'alert_id': case['alert_id']},
+    },
+    'accounts:login': {'anonymous': True},
+    'accounts:register': {'anonymous': True},
+    'accounts:verify-email': {'anonymous': True, 'kwargs': token_kwargs},
+    'accounts:password_reset': {'anonymous': True},
+    'accounts:password_reset_done': {'anonymous': True},
+    'accounts:password_reset_confirm': {'anonymous': True, 'kwargs': token_kwargs},
+    'accounts:password_reset_complete': {'anonymous': True},
+}
+
+
+def route_names():
+    """Every named route in academics.urls and accounts.urls."""
+    names = []
+    for module in (academics.urls, accounts.urls):
+        for pattern in module.urlpatterns:
+            names.append(f'{module.app_name}:{pattern.name}')
+    return names
+
+
+# Async views run their calculations on the test's connection so that they
+# see the test transaction's data and their queries are captured
+@override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    ASYNC_VIEW_CONCURRENCY=False,
+)
+class QueryBudgetTest(TestCase):
+    """Check every route's cold and warm query counts (and optionally wall time) against the budget file."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create one student per result-count size."""
+        years = [
+            AcademicYear.objects.create(year=2021 + i // 2, semester=i % 2 + 1)
+            for i in range(8)
+        ]
+        Unit.objects.bulk_create([
+            Unit(
+                code=f'BGT{i:03d}',
+                name=f'Budget Unit {i}',
+                credit_units=2 + i % 3,
+                academic_year=years[i % len(years)]
+            )
+            for i in range(max(RESULT_SIZES))
+        ])
+        units = list(Unit.objects.order_by('code'))
+
+        cls.cases = {}
+        for size in RESULT_SIZES:
+            user = User.objects.create_user(
+                username=f'budget{size}',
+                password='pass123',
+                first_name='Budget',
+                last_name=str(size),
+                email=f'budget{size}@jkuat.ac.ke'
+            )
+            student = Student.objects.create(
+                user=user,
+                registration_number=f'BGT-{size:04d}',
+                course='Computer Science',
+                year_of_study=2
+            )
+            Result.objects.bulk_record(
+                Result(student=student, unit=unit, score=(i * 37) % 101)
+                for i, unit in enumerate(units[:size])
+            )
+            alerts = [
+                GradeAlert.objects.create(
+                    student=student,
+                    alert_type='low_grade',
+                    title=f'Alert {i}',
+                    message='Message',
+                    is_read=i % 2 == 0
+                )
+                for i in range(15)
+            ]
+            cls.cases[size] = {'user': user, 'student': student, 'alert_id': alerts[0].pk}
+
+    def request(self, name, case):
+        """Make one request for a route, returning (response, queries, ms)."""
+        options = ROUTE_OPTIONS.get(name, {})
+        kwargs = options.get('kwargs', lambda case: {})(case)
+        url = reverse(name, kwargs=kwargs)
+
+        client = Client()
+        if not options.get('anonymous'):
+            client.force_login(case['user'])
+        method = getattr(client, options.get('method', 'get'))
+
+        # Fail on N+1 patterns even when the total stays under budget
+        with detect_repeated_queries(raise_error=True, label=name):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = method(url)
+                elapsed = (time.perf_counter() - start) * 1000
+        return response, len(ctx.captured_queries), elapsed
+
+    def test_every_route_has_a_budget(self):
+        """New routes must be added to the budget file."""
+        budgets = json.loads(BUDGET_FILE.read_text())
+        if UPDATE_BUDGETS:
+            return
+        missing = [name for name in route_names() if name not in budgets]
+        self.assertEqual(missing, [], 'Regenerate query_budgets.json for new routes')
+
+    def test_query_budgets(self):
+        """Each route stays within its cold and warm budgets at every size."""
+        budgets = json.loads(BUDGET_FILE.read_text())
+        measured = {}
+
+        for name in route_names():
+            for size in RESULT_SIZES:
+                case = self.cases[size]
+                for cache in caches.all():
+                    cache.clear()
+                cold_response, cold_queries, cold_ms = self.request(name, case)
+                response, queries, elapsed = self.request(name, case)
+                measured.setdefault(name, {})[str(size)] = {
+                    'cold_queries': cold_queries, 'queries': queries, 'cold_ms': cold_ms, 'ms': elapsed,
+                }
+
+                if UPDATE_BUDGETS:
+                    continue
+                with self.subTest(route=name, results=size):
+                    self.assertLess(cold_response.status_code, 500)
+                    self.assertLess(response.status_code, 500)
+                    budget = budgets.get(name, {}).get(str(size))
+                    self.assertIsNotNone(budget, f'No budget for {name} at {size} results')
+                    for label, count, limit in (
+                        ('cold', cold_queries, budget['cold_queries']),
+                        ('warm', queries, budget['queries']),
+                    ):
+                        self.assertLessEqual(
+                            count, limit,
+                            f'{name} with {size} results ran {count} queries {label} (budget {limit})'
+                        )
+                    if CHECK_TIME:
+                        for label, ms, limit in (
+                            ('cold', cold_ms, budget['cold_ms']),
+                            ('warm', elapsed, budget['ms']),
+                        ):
+                            self.assertLessEqual(
+                                ms, limit,
+                                f'{name} with {size} results took {ms:.0f}ms {label} (budget {limit}ms)'
+                            )
+
+        if UPDATE_BUDGETS:
+            budgets = {
+                '_comment': (
+                    'Per-route query count ceilings, cold (empty caches) and warm, by number of results; '
+                    'ms ceilings are only checked with CHECK_QUERY_BUDGET_TIME=1. '
+                    'Regenerate with UPDATE_QUERY_BUDGETS=1 python manage.py test academics.test_query_budget'
+                )
+            }
+            for name, sizes in measured.items():
+                budgets[name] = {
+                    size: {
+                        'cold_queries': values['cold_queries'],
+                        'queries': values['queries'],
+                        # Three times the measured time, plus slack for very fast routes
+                        'cold_ms': int(values['cold_ms'] * 3) + 50,
+                        'ms': int(values['ms'] * 3) + 50,
+                    }
+                    for size, values in sizes.items()
+                }
+            BUDGET_FILE.write_text(json.dumps(budgets, indent=2) + '\n')
@@ -0,0 +1,108 @@
+"""
+Query plan regression tests for the hot Result/GradeAlert access paths.
+Captures EXPLAIN output and asserts the intended composite index is used,
+so a model change cannot silently drop an index from the query plan.
+"""
+
+from unittest import skipUnless
+
+from django.test import TestCase
+from django.db import connection
+from django.contrib.auth.models import User
+from accounts.models import Student
+from academics.models import AcademicYear, Unit, Result, GradeAlert
+
+
+class QueryPlanTest(TestCase):
+    """Assert the hot query paths are served by their composite indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create enough rows across several students for a realistic plan."""
+        cls.academic_year = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+        cls.other_year = AcademicYear.objects.create(year=2024, semester=2)
+        units = [
+            Unit.objects.create(
+                code=f'PLN{i:03d}',
+                name=f'Plan Unit {i}',
+                credit_units=3,
+                academic_year=cls.academic_year if i % 2 else cls.other_year
+            )
+            for i in range(10)
+        ]
+        cls.students = []
+        for s in range(5):
+            user = User.objects.create_user(username=f'planner{s}', password='pass123')
+            student = Student.objects.create(
+                user=user,
+                registration_number=f'PLN{s:03d}',
+                academic_year='2024/2025'
+            )
+            cls.students.append(student)
+            for i, unit in enumerate(units):
+                Result.objects.create(student=student, unit=unit, score=(s * 13 + i * 7) % 100)
+                GradeAlert.objects.create(
+                    student=student,
+                    alert_type='low_grade',
+                    title='Alert',
+                    message='Message',
+                    is_read=i > 0
+                )
+        cls.student = cls.students[0]
+
+    def setUp(self):
+        """Keep the planner from preferring sequential scans on tiny tables."""
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, index_name):
+        """Assert that EXPLAIN for the queryset mentions the given index."""
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f'Expected {index_name} in plan:\n{plan}')
+
+    @skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN format is backend specific')
+    def test_results_for_semester(self):
+        """Per-semester GPA aggregates use the (student, academic_year) index."""
+        queryset = Result.objects.filter(student=self.student, academic_year=self.academic_year).order_by()
+        self.assertUsesIndex(queryset, 'result_student_year_idx')
+
+    @skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN format is backend specific')
+    def test_results_sorted_by_score(self):
+        """Best/worst unit lookups use the (student, score) index."""
+        queryset = Result.objects.filter(student=self.student).order_by('-score')
+        self.assertUsesIndex(queryset, 'result_student_score_idx')
+
+    @skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN format is backend specific')
+    def test_low_score_filter(self):
+        """Struggling-unit filters use the (student, score) index."""
+        queryset = Result.objects.filter(student=self.student, score__lt=50).order_by('score')
+        self.assertUsesIndex(queryset, 'result_student_score_idx')
+
+    @skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN format is backend specific')
+    def test_results_sorted_by_created_at(self):
+        """Trend calculation uses the (student, created_at) index."""
+        queryset = Result.objects.filter(student=self.student).order_by('created_at')
+        self.assertUsesIndex(queryset, 'result_student_created_idx')
+
+    @skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN format is backend specific')
+    def test_unread_alerts(self):
+        """Unread alert lookups use the partial (student, created_at) index."""
+        queryset = GradeAlert.objects.filter(student=self.student, is_read=False).order_by('-created_at')
+        self.assertUsesIndex(queryset, 'alert_student_unread_idx')
+
+    @skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN format is backend specific')
+    def test_unread_count(self):
+        """The unread badge count uses the partial unread index."""
+        queryset = GradeAlert.objects.filter(student=self.student, is_read=False).values('id')
+        self.assertUsesIndex(queryset, 'alert_student_unread_idx')
+
+    @skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN format is backend specific')
+    def test_alert_listing(self):
+        """Alert listing uses the (student, created_at, id) index."""
+        queryset = GradeAlert.objects.filter(student=self.student).order_by('-created_at', '-id')
+        self.assertUsesIndex(queryset, 'alert_student_created_idx')
@@ -1,8 +1,27 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection, connections
+from django.utils import timezone
+from django.urls import reverse
 
-from accounts.models import Student
-from .models import AcademicYear, Unit, Result
+from accounts.models import OutgoingEmail, Student
+from jkuat_gpa.middleware import WhiteNoiseMiddleware
+from jkuat_gpa.db_router import ReplicaRouter, is_student_pinned, pin_students, use_replica
+from .models import AcademicYear, Unit, Result, GradeAlert, ResultSummary
+from .pagination import EstimatedCountPaginator
 from .utils import GradeCalculator
 
 
@@ -59,3 +78,288 @@ class GradeCalculatorTests(TestCase):
 		self.assertGreaterEqual(projection['required_average'], 0.0)
 		self.assertLessEqual(projection['required_average'], 100.0)
 
+
+	def test_result_copies_unit_fields(self):
+		result = Result.objects.get(student=self.student, unit=self.u2)
+		self.assertEqual(result.credit_units, 4)
+		self.assertEqual(result.academic_year_id, self.ay.pk)
+
+	def test_unit_change_updates_results(self):
+		# Changing a unit's credits and year must flow through to its results
+		ay2 = AcademicYear.objects.create(year=2024, semester=2)
+		self.u1.credit_units = 2
+		self.u1.academic_year = ay2
+		self.u1.save()
+
+		result = Result.objects.get(student=self.student, unit=self.u1)
+		self.assertEqual(result.credit_units, 2)
+		self.assertEqual(result.academic_year_id, ay2.pk)
+		self.assertEqual(result.points, 80 * 2)
+
+		gpa_data = GradeCalculator.calculate_wma(self.student, ay2)
+		self.assertEqual(gpa_data['total_credit_units'], 2)
+		self.assertAlmostEqual(gpa_data['gpa'], 80.0, places=2)
+
+
+class ResultBulkRecordTests(TestCase):
+	def setUp(self):
+		self.ay = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+		self.unit = Unit.objects.create(code='BLK101', name='Bulk 1', credit_units=3, academic_year=self.ay)
+		self.other = Unit.objects.create(code='BLK102', name='Bulk 2', credit_units=4, academic_year=self.ay)
+		self.students = []
+		for i in range(2):
+			user = User.objects.create_user(username=f'bulk{i}', password='password')
+			self.students.append(Student.objects.create(user=user, registration_number=f'BLK-{i}'))
+
+	def test_bulk_record_matches_save(self):
+		# Boundary scores must produce the same grade and points as save()
+		scores = [100, 70, 69, 60, 59, 50, 49, 40, 39, 0]
+		for score in scores:
+			saved = Result(student=self.students[0], unit=self.unit, score=score)
+			saved.save()
+			saved.refresh_from_db()
+			saved.delete()
+
+			Result.objects.bulk_record([Result(student=self.students[1], unit=self.unit, score=score)])
+			recorded = Result.objects.get(student=self.students[1], unit=self.unit)
+
+			self.assertEqual(recorded.grade, saved.grade)
+			self.assertEqual(recorded.points, saved.points)
+			self.assertEqual(recorded.credit_units, saved.credit_units)
+			self.assertEqual(recorded.academic_year_id, saved.academic_year_id)
+
+	def test_bulk_record_upserts_existing_rows(self):
+		Result.objects.create(student=self.students[0], unit=self.unit, score=30)
+		# Unit preload, upsert, and one ResultSummary version/totals update
+		with self.assertNumQueries(3):
+			Result.objects.bulk_record([
+				Result(student=self.students[0], unit=self.unit, score=75),
+				Result(student=self.students[0], unit=self.other, score=55),
+				Result(student=self.students[1], unit=self.other, score=65),
+			])
+
+		self.assertEqual(Result.objects.count(), 3)
+		updated = Result.objects.get(student=self.students[0], unit=self.unit)
+		self.assertEqual((updated.score, updated.grade, updated.points), (75, 'A', 225))
+
+	def test_summary_totals_track_every_write(self):
+		def assert_totals_match(student):
+			summary = ResultSummary.objects.get(student=student)
+			expected = Result.objects.filter(student=student).aggregate(**GradeCalculator.wma_aggregates())
+			self.assertEqual(summary.totals(), {key: value or 0 for key, value in expected.items()})
+			self.assertEqual(GradeCalculator.wma_from_totals(summary.totals()), GradeCalculator.calculate_wma(student))
+
+		student = self.students[0]
+		Result.objects.bulk_record([
+			Result(student=student, unit=self.unit, score=35),
+			Result(student=student, unit=self.other, score=81),
+		])
+		assert_totals_match(student)
+		self.assertEqual(ResultSummary.objects.get(student=student).failed_units, 1)
+
+		result = Result.objects.get(student=student, unit=self.unit)
+		result.score = 64
+		result.save()
+		assert_totals_match(student)
+
+		self.other.credit_units = 2
+		self.other.save()
+		assert_totals_match(student)
+
+		result.delete()
+		assert_totals_match(student)
+		Result.objects.filter(student=student).delete()
+		assert_totals_match(student)
+		self.assertEqual(ResultSummary.objects.get(student=student).total_points, 0)
+
+	def test_with_points(self):
+		Result.objects.bulk_record([Result(student=self.students[0], unit=self.other, score=55)])
+		result = Result.objects.with_points().get()
+		self.assertEqual(result.weighted_points, result.points)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class AdminScalabilityTests(TestCase):
+	def setUp(self):
+		self.ay = AcademicYear.objects.create(year=2024, semester=1, is_active=True)
+		self.admin = User.objects.create_superuser(username='registrar', password='password', email='r@example.com')
+		self.client.force_login(self.admin)
+
+	def add_results(self, count, offset=0):
+		rows = []
+		for i in range(offset, offset + count):
+			user = User.objects.create_user(username=f'adm{i}', first_name='Student', last_name=str(i))
+			student = Student.objects.create(user=user, registration_number=f'ADM-{i}')
+			unit = Unit.objects.create(code=f'ADM{i:03d}', name=f'Admin {i}', academic_year=self.ay)
+			rows.append(Result(student=student, unit=unit, score=60))
+		Result.objects.bulk_record(rows)
+
+	def changelist_queries(self, url):
+		# Warm the session and request-user caches so only the changelist is measured
+		self.client.get(url)
+		with CaptureQueriesContext(connection) as ctx:
+			response = self.client.get(url)
+		self.assertEqual(response.status_code, 200)
+		return len(ctx.captured_queries)
+
+	def test_result_changelist_queries_do_not_grow_with_rows(self):
+		url = reverse('admin:academics_result_changelist')
+		self.add_results(3)
+		small = self.changelist_queries(url)
+		self.add_results(20, offset=3)
+		self.assertEqual(self.changelist_queries(url), small)
+
+	def test_student_changelist_queries_do_not_grow_with_rows(self):
+		url = reverse('admin:accounts_student_changelist')
+		self.add_results(3)
+		small = self.changelist_queries(url)
+		self.add_results(20, offset=3)
+		self.assertEqual(self.changelist_queries(url), small)
+
+	def test_result_add_form_renders_only_selected_options(self):
+		self.add_results(20)
+		response = self.client.get(reverse('admin:academics_result_add'))
+		self.assertNotContains(response, 'ADM-1')
+		self.assertContains(response, 'admin-autocomplete')
+
+	def test_paginator_uses_estimate_for_large_unfiltered_tables(self):
+		self.add_results(3)
+		paginator = EstimatedCountPaginator(Result.objects.all(), 10)
+		paginator.estimate_threshold = 1
+		with connection.cursor() as cursor:
+			cursor.execute('ANALYZE')
+		with CaptureQueriesContext(connection) as ctx:
+			self.assertEqual(paginator.count, 3)
+		self.assertEqual(len(ctx.captured_queries), 1)
+		self.assertNotIn('COUNT(', ctx.captured_queries[0]['sql'].upper())
+
+		filtered = EstimatedCountPaginator(Result.objects.filter(score__gt=90), 10)
+		filtered.estimate_threshold = 1
+		self.assertEqual(filtered.count, 0)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite profile only applies to SQLite')
+class SQLiteTuningTests(SimpleTestCase):
+	def open_connection(self):
+		# A fresh connection to a file database fires connection_created
+		fd, path = tempfile.mkstemp(suffix='.sqlite3')
+		os.close(fd)
+		self.addCleanup(lambda: [os.remove(p) for p in (path, path + '-wal', path + '-shm') if os.path.exists(p)])
+		wrapper = connections['default'].__class__({**connection.settings_dict, 'NAME': path}, alias='tuning')
+		self.addCleanup(wrapper.close)
+		wrapper.ensure_connection()
+		return wrapper
+
+	def pragma(self, wrapper, name):
+		with wrapper.cursor() as cursor:
+			cursor.execute(f'PRAGMA {name}')
+			return cursor.fetchone()[0]
+
+	@override_settings(SQLITE_TUNING=True)
+	def test_profile_applied_when_enabled(self):
+		wrapper = self.open_connection()
+		self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+		self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)  # NORMAL
+		self.assertEqual(self.pragma(wrapper, 'temp_store'), 2)  # MEMORY
+		self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+
+	@override_settings(SQLITE_TUNING=False)
+	def test_profile_skipped_when_disabled(self):
+		wrapper = self.open_connection()
+		self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+
+
+REPLICA_DATABASES = {
+	'default': settings.DATABASES['default'],
+	'replica': {**settings.DATABASES['default'], 'TEST': {'MIRROR': 'default'}},
+}
+
+
+@override_settings(DATABASES=REPLICA_DATABASES, REPLICA_PIN_SECONDS=30)
+class ReplicaRouterTests(SimpleTestCase):
+	def setUp(self):
+		self.router = ReplicaRouter()
+		cache.clear()
+
+	def test_reads_use_primary_outside_replica_views(self):
+		self.assertIsNone(self.router.db_for_read(Result))
+
+	def test_reads_use_replica_inside_block(self):
+		with use_replica():
+			self.assertEqual(self.router.db_for_read(Result), 'replica')
+		self.assertIsNone(self.router.db_for_read(Result))
+
+	def test_write_pins_rest_of_block_to_primary(self):
+		with use_replica():
+			self.assertEqual(self.router.db_for_write(Result), 'default')
+			self.assertIsNone(self.router.db_for_read(Result))
+
+	def test_result_change_pins_student(self):
+		self.assertFalse(is_student_pinned(42))
+		pin_students([42])
+		self.assertTrue(is_student_pinned(42))
+
+	def test_no_replica_configured(self):
+		with override_settings(DATABASES={'default': settings.DATABASES['default']}):
+			with use_replica():
+				self.assertIsNone(self.router.db_for_read(Result))
+			pin_students([7])
+			self.assertFalse(is_student_pinned(7))
+
+	def test_replica_never_migrated(self):
+		self.assertFalse(self.router.allow_migrate('replica', 'academics'))
+		self.assertIsNone(self.router.allow_migrate('default', 'academics'))
+
+
+class PruneStaleDataTests(TestCase):
+	def setUp(self):
+		user = User.objects.create_user(username='prune', password='password')
+		self.student = Student.objects.create(user=user, registration_number='PRN-0001')
+		old = timezone.now() - timedelta(days=400)
+		alerts = [
+			GradeAlert.objects.create(student=self.student, alert_type='low_grade', title=str(i), message='m', is_read=i % 2 == 0)
+			for i in range(10)
+		]
+		# 5 old read, 5 old unread
+		GradeAlert.objects.filter(pk__in=[a.pk for a in alerts]).update(created_at=old)
+		self.recent = GradeAlert.objects.create(student=self.student, alert_type='low_grade', title='new', message='m', is_read=True)
+		Session.objects.create(session_key='expired', session_data='', expire_date=timezone.now() - timedelta(days=1))
+		Session.objects.create(session_key='live', session_data='', expire_date=timezone.now() + timedelta(days=1))
+		OutgoingEmail.objects.queue('Subject', 'Body', 'prune@students.jkuat.ac.ke')
+		OutgoingEmail.objects.update(status=OutgoingEmail.STATUS_SENT, sent_at=timezone.now() - timedelta(days=40))
+		OutgoingEmail.objects.queue('Subject', 'Body', 'pending@students.jkuat.ac.ke')
+
+	def test_deletes_old_read_alerts_and_expired_sessions(self):
+		out = StringIO()
+		call_command('prune_stale_data', '--alert-days=180', '--batch-size=2', '--pause=0', stdout=out)
+		self.assertEqual(GradeAlert.objects.count(), 6)
+		self.assertFalse(GradeAlert.objects.filter(is_read=True, created_at__lt=timezone.now() - timedelta(days=180)).exists())
+		self.assertTrue(GradeAlert.objects.filter(pk=self.recent.pk).exists())
+		self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+		self.assertIn('Deleted 5 read alerts older than 180 days', out.getvalue())
+		self.assertIn('(3 batches)', out.getvalue())
+		# Pending emails are kept however old
+		self.assertEqual(list(OutgoingEmail.objects.values_list('to', flat=True)), ['pending@students.jkuat.ac.ke'])
+
+	def test_dry_run_deletes_nothing(self):
+		out = StringIO()
+		call_command('prune_stale_data', '--dry-run', stdout=out)
+		self.assertEqual(GradeAlert.objects.count(), 11)
+		self.assertEqual(Session.objects.count(), 2)
+		self.assertIn('Would delete 5 read alerts', out.getvalue())
+
+
+class AsyncCapableWhiteNoiseTests(SimpleTestCase):
+	def test_async_chain_stays_async(self):
+		async def get_response(request):
+			return HttpResponse('view')
+
+		middleware = WhiteNoiseMiddleware(get_response)
+		self.assertTrue(iscoroutinefunction(middleware))
+		response = async_to_sync(middleware)(RequestFactory().get('/dashboard/'))
+		self.assertEqual(response.content, b'view')
+
+	def test_sync_chain_unchanged(self):
+		middleware = WhiteNoiseMiddleware(lambda request: HttpResponse('view'))
+		self.assertFalse(iscoroutinefunction(middleware))
+		self.assertEqual(middleware(RequestFactory().get('/dashboard/')).content, b'view')
@@ -15,5 +15,19 @@ urlpatterns = [
     path('analytics/', views.GradeAnalyticsView.as_view(), name='analytics'),
     path('notifications/settings/', views.NotificationSettingsView.as_view(), name='notification_settings'),
     path('alerts/', views.GradeAlertsListView.as_view(), name='alerts'),
+    path('alerts/feed/', views.GradeAlertsFeedView.as_view(), name='alerts_feed'),
     path('alerts/<int:alert_id>/mark-read/', views.MarkAlertAsReadView.as_view(), name='mark_alert_read'),
+    
+    # Async variants (concurrent calculations; see benchmark_async_views)
+    path('dashboard/async/', views.AsyncDashboardView.as_view(), name='dashboard_async'),
+    path('analytics/async/', views.AsyncGradeAnalyticsView.as_view(), name='analytics_async'),
+    
+    # JSON API (ETag / If-None-Match aware)
+    path('api/summary/', views.GPASummaryAPIView.as_view(), name='api_summary'),
+    path('api/transcript/', views.TranscriptAPIView.as_view(), name='api_transcript'),
+    path('api/projection/', views.ProjectionAPIView.as_view(), name='api_projection'),
+    path('api/what-if/', views.WhatIfAPIView.as_view(), name='api_what_if'),
+    
+    # Registrar (staff only)
+    path('registrar/gpa/', views.RegistrarGPAStreamView.as_view(), name='registrar_gpa'),
 ]
@@ -5,9 +5,12 @@ Implements JKUAT-specific grading standards and calculations.
 
 from decimal import Decimal
 from typing import Dict, Tuple, List
+from django.db.models import Count, F, Q, Sum
+from monitoring.timing import timed_calculator
 from .models import Result, Student, AcademicYear
 
 
+@timed_calculator
 class GradeCalculator:
     """
     Utility class for calculating grades and GPA based on JKUAT standards.
@@ -22,6 +25,9 @@ class GradeCalculator:
         'E': (0, 39, 'Fail'),
     }
     
+    # Credit units per remaining unit when the student's curriculum is unknown
+    ASSUMED_CREDIT_UNITS = 3
+    
     @staticmethod
     def get_grade(score: int) -> Tuple[str, str]:
         """
@@ -59,69 +65,17 @@ class GradeCalculator:
             }
         """
         try:
-            # Get results for the student
+            # Get results for the student; credit_units and academic_year
+            # are stored on Result, so no join to Unit is needed
+            results = Result.objects.filter(student=student)
             if academic_year:
-                results = Result.objects.filter(
-                    student=student,
-                    unit__academic_year=academic_year
-                ).select_related('unit')
-            else:
-                results = Result.objects.filter(student=student).select_related('unit')
-            
-            if not results.exists():
-                return {
-                    'gpa': 0.00,
-                    'total_points': 0.00,
-                    'total_credit_units': 0,
-                    'units_completed': 0,
-                    'failed_units': 0,
-                    'honors_level': 'No grades recorded yet'
-                }
-            
-            # Calculate totals with validation
-            total_points = Decimal('0.00')
-            total_credit_units = 0
-            failed_count = 0
-            
-            for result in results:
-                # Validate score is in range
-                if result.score is None or result.score < 0 or result.score > 100:
-                    continue
-                    
-                # Points = Score * Credit Units
-                points = Decimal(str(result.score)) * Decimal(result.unit.credit_units)
-                total_points += points
-                total_credit_units += result.unit.credit_units
-                
-                if result.grade == 'E':  # Fail
-                    failed_count += 1
-            
-            # Calculate GPA/WMA: Total weighted points / Total credit units
-            if total_credit_units > 0:
-                gpa = float(round(total_points / Decimal(total_credit_units), 2))
-            else:
-                gpa = 0.00
-            
-            # Determine overall honors level
-            if gpa >= 70:
-                honors = 'First Class Honours'
-            elif gpa >= 60:
-                honors = 'Second Class Honours (Upper Division)'
-            elif gpa >= 50:
-                honors = 'Second Class Honours (Lower Division)'
-            elif gpa >= 40:
-                honors = 'Pass'
-            else:
-                honors = 'Fail'
+                results = results.filter(academic_year=academic_year)
             
-            return {
-                'gpa': gpa,
-                'total_points': float(total_points),
-                'total_credit_units': total_credit_units,
-                'units_completed': results.exclude(grade='E').count(),
-                'failed_units': failed_count,
-                'honors_level': honors
-            }
+            # Calculate totals in a single aggregate, skipping out-of-range scores
+            totals = results.filter(score__gte=0, score__lte=100).aggregate(
+                **GradeCalculator.wma_aggregates()
+            )
+            return GradeCalculator.wma_from_totals(totals)
         except Exception as e:
             print(f"Error calculating WMA for {student}: {str(e)}")
             return {
@@ -132,27 +86,140 @@ class GradeCalculator:
                 'failed_units': 0,
                 'honors_level': f'Error: {str(e)[:50]}'
             }
+    
+    @staticmethod
+    def wma_aggregates() -> Dict:
+        """
+        Aggregate expressions behind calculate_wma.
+        
+        Usable with aggregate() for one student, or with
+        values('student').annotate() for many students in one query.
+        
+        Returns:
+            Dictionary of aliases to aggregate expressions
+        """
+        return {
+            'total_points': Sum(F('score') * F('credit_units')),
+            'total_credit_units': Sum('credit_units'),
+            'units_recorded': Count('id'),
+            'units_completed': Count('id', filter=~Q(grade='E')),
+            'failed_units': Count('id', filter=Q(grade='E')),
+        }
+    
+    @staticmethod
+    def wma_from_totals(totals: Dict) -> Dict:
+        """
+        Build calculate_wma's result from a row of wma_aggregates() totals.
+        
+        Args:
+            totals: Dictionary with the wma_aggregates() keys
+            
+        Returns:
+            Dictionary with GPA information, as calculate_wma
+        """
+        if not totals.get('units_recorded'):
+            return {
+                'gpa': 0.00,
+                'total_points': 0.00,
+                'total_credit_units': 0,
+                'units_completed': 0,
+                'failed_units': 0,
+                'honors_level': 'No grades recorded yet'
+            }
+        
+        total_points = Decimal(totals['total_points'] or 0)
+        total_credit_units = totals['total_credit_units'] or 0
         
-        # Determine overall honors level
-        gpa_float = float(gpa)
-        if gpa_float >= 70:
-            honors_level = 'First Class Honours'
-        elif gpa_float >= 60:
-            honors_level = 'Second Class Honours (Upper Division)'
-        elif gpa_float >= 50:
-            honors_level = 'Second Class Honours (Lower Division)'
-        elif gpa_float >= 40:
-            honors_level = 'Pass'
+        # Calculate GPA/WMA: Total weighted points / Total credit units
+        if total_credit_units > 0:
+            gpa = float(round(total_points / Decimal(total_credit_units), 2))
         else:
-            honors_level = 'Below Pass'
+            gpa = 0.00
         
         return {
-            'gpa': float(gpa),
+            'gpa': gpa,
+            'total_points': float(total_points),
+            'total_credit_units': total_credit_units,
+            'units_completed': totals['units_completed'],
+            'failed_units': totals['failed_units'],
+            'honors_level': GradeCalculator.get_honors_level(gpa)
+        }
+    
+    @staticmethod
+    def get_honors_level(gpa: float) -> str:
+        """
+        Overall degree classification for a WMA.
+        
+        Args:
+            gpa: Weighted mean average (0-100)
+            
+        Returns:
+            Classification name
+        """
+        if gpa >= 70:
+            return 'First Class Honours'
+        elif gpa >= 60:
+            return 'Second Class Honours (Upper Division)'
+        elif gpa >= 50:
+            return 'Second Class Honours (Lower Division)'
+        elif gpa >= 40:
+            return 'Pass'
+        return 'Fail'
+    
+    @staticmethod
+    def what_if(totals: Dict, changes: List[Tuple] = (), remaining_credit_units: int = 0,
+                remaining_average: float = 0) -> Dict:
+        """
+        WMA after hypothetical scores, from running totals.
+        
+        Costs O(len(changes)) arithmetic; no results are read.
+        
+        Args:
+            totals: Dictionary with the wma_aggregates() keys, e.g. ResultSummary.totals()
+            changes: (credit_units, new_score, recorded_score) per unit, with
+                recorded_score None for units without a result yet
+            remaining_credit_units: Further credit units to assume
+            remaining_average: Score assumed across remaining_credit_units
+            
+        Returns:
+            Dictionary with the current and hypothetical WMA:
+            {
+                'current_gpa': float,
+                'current_honors_level': str,
+                'gpa': float,
+                'honors_level': str,
+                'change': float,
+                'total_points': float,
+                'total_credit_units': int
+            }
+        """
+        current = GradeCalculator.wma_from_totals(totals)
+        total_points = Decimal(totals['total_points'] or 0)
+        total_credit_units = totals['total_credit_units'] or 0
+        
+        for credit_units, new_score, recorded_score in changes:
+            if recorded_score is not None:
+                total_points -= recorded_score * credit_units
+                total_credit_units -= credit_units
+            total_points += new_score * credit_units
+            total_credit_units += credit_units
+        
+        total_points += Decimal(str(remaining_average)) * remaining_credit_units
+        total_credit_units += remaining_credit_units
+        
+        if total_credit_units > 0:
+            gpa = float(round(total_points / Decimal(total_credit_units), 2))
+        else:
+            gpa = 0.00
+        
+        return {
+            'current_gpa': current['gpa'],
+            'current_honors_level': current['honors_level'],
+            'gpa': gpa,
+            'honors_level': GradeCalculator.get_honors_level(gpa),
+            'change': round(gpa - current['gpa'], 2),
             'total_points': float(total_points),
             'total_credit_units': total_credit_units,
-            'units_completed': results.count(),
-            'failed_units': failed_count,
-            'honors_level': honors_level
         }
     
     @staticmethod
@@ -160,7 +227,9 @@ class GradeCalculator:
         student: Student,
         target_gpa: float,
         remaining_units: int,
-        academic_year: AcademicYear = None
+        academic_year: AcademicYear = None,
+        totals: Dict = None,
+        remaining_credit_units: int = None
     ) -> Dict:
         """
         Calculate the required average in remaining units to achieve target GPA.
@@ -170,6 +239,11 @@ class GradeCalculator:
             target_gpa: Target GPA (e.g., 70 for First Class)
             remaining_units: Number of remaining units
             academic_year: Optional AcademicYear filter
+            totals: Optional wma_aggregates() totals (e.g. ResultSummary.totals())
+                to use instead of reading the student's results
+            remaining_credit_units: Exact credit units of the remaining units
+                (e.g. from ResultSummary.remaining()); estimated as
+                ASSUMED_CREDIT_UNITS per unit when omitted
             
         Returns:
             Dictionary with projection information:
@@ -182,7 +256,10 @@ class GradeCalculator:
             }
         """
         # Get current GPA
-        current_data = GradeCalculator.calculate_wma(student, academic_year)
+        if totals is not None:
+            current_data = GradeCalculator.wma_from_totals(totals)
+        else:
+            current_data = GradeCalculator.calculate_wma(student, academic_year)
         current_gpa = current_data['gpa']
         current_points = current_data['total_points']
         current_credits = current_data['total_credit_units']
@@ -196,15 +273,17 @@ class GradeCalculator:
                 'message': 'No remaining units to complete.'
             }
         
+        if remaining_credit_units is None:
+            remaining_credit_units = remaining_units * GradeCalculator.ASSUMED_CREDIT_UNITS
+        
         # Calculate required total points
-        total_units_after = current_credits + (remaining_units * 3)  # Assuming avg credit units is 3
+        total_units_after = current_credits + remaining_credit_units
         target_total_points = target_gpa * total_units_after
         
         # Calculate required points from remaining units
         required_points = target_total_points - current_points
         
-        # Calculate required average score (assuming each remaining unit has 3 credit units)
-        remaining_credit_units = remaining_units * 3
+        # Calculate required average score over the remaining credit units
         if remaining_credit_units > 0:
             required_average = required_points / remaining_credit_units
         else:
@@ -267,7 +346,7 @@ class GradeCalculator:
         if academic_year:
             results = Result.objects.filter(
                 student=student,
-                unit__academic_year=academic_year
+                academic_year=academic_year
             ).select_related('unit').order_by('unit__code')
         else:
             results = Result.objects.filter(student=student).select_related('unit').order_by('unit__code')
@@ -277,7 +356,7 @@ class GradeCalculator:
             transcript.append({
                 'code': result.unit.code,
                 'name': result.unit.name,
-                'credit_units': result.unit.credit_units,
+                'credit_units': result.credit_units,
                 'score': result.score,
                 'grade': result.grade,
                 'points': float(result.points),
@@ -287,6 +366,7 @@ class GradeCalculator:
         return transcript
 
 
+@timed_calculator
 class PDFGenerator:
     """
     Utility class for generating PDF transcripts and documents.
@@ -413,6 +493,7 @@ class PDFGenerator:
         return buffer.getvalue()
 
 
+@timed_calculator
 class AnalyticsCalculator:
     """
     Utility class for calculating grade analytics and trends for Phase 5.
@@ -1,16 +1,97 @@
-from django.shortcuts import render
+import asyncio
+import hashlib
+import json
+import re
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.shortcuts import render, redirect
 from django.views.generic import TemplateView, ListView, View
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse, HttpResponse, FileResponse
+from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin, UserPassesTestMixin
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.core.exceptions import ObjectDoesNotExist
-from django.views.decorators.http import require_http_methods
+from django.db import close_old_connections
+from django.db.models import OuterRef, Subquery
+from django.views.decorators.http import condition, require_http_methods
 from django.utils.decorators import method_decorator
-from .models import Result, Student, NotificationPreference, GradeAlert, GradeAnalytics
+from django.utils.functional import SimpleLazyObject
+from jkuat_gpa.db_router import ReplicaReadMixin
+from monitoring.metrics import observe_time
+from .forms import ProjectionForm
+from .models import (
+    CurriculumUnit, Result, Student, Unit, NotificationPreference, GradeAlert, GradeAnalytics, ResultSummary
+)
+from .pagination import KeysetPaginationMixin
 from .utils import GradeCalculator, PDFGenerator, AnalyticsCalculator
 
+# Projection targets for different honor levels
+PROJECTION_TARGETS = {
+    'First Class Honours': 70.0,
+    'Second Class (Upper)': 60.0,
+    'Second Class (Lower)': 50.0,
+    'Pass': 40.0,
+}
+DEFAULT_REMAINING_UNITS = 8  # Used when the student's course has no curriculum
+
+
+def remaining_for(summary, requested_units):
+    """
+    Remaining (units, credit units, from_curriculum) to project over.
+    
+    Exact figures from the student's remaining-curriculum index when their
+    course has a curriculum; otherwise requested_units, with credit units
+    left for GradeCalculator.project_required_average to estimate.
+    """
+    remaining = summary.remaining()
+    if remaining:
+        return remaining[0], remaining[1], True
+    return requested_units, None, False
+
+
+def dashboard_context(student, gpa_data, grade_dist):
+    """Template context shared by DashboardView and AsyncDashboardView."""
+    return {
+        'student': student,
+        'gpa': f"{gpa_data.get('gpa', 0.00):.2f}",
+        'honors': gpa_data.get('honors_level', 'Pass'),
+        'units_completed': gpa_data.get('units_completed', 0),
+        'failed_units': gpa_data.get('failed_units', 0),
+        'grade_distribution': grade_dist,
+        'total_points': gpa_data.get('total_points', 0),
+        'total_credit_units': gpa_data.get('total_credit_units', 0),
+    }
+
+
+def analytics_context(student, analytics, gpa_data, alerts):
+    """Template context shared by GradeAnalyticsView and AsyncGradeAnalyticsView."""
+    return {
+        'student': student,
+        'analytics': analytics,
+        'gpa': f"{gpa_data.get('gpa', 0):.2f}",
+        'alerts': alerts,
+        'trend_icon': {
+            'improving': '📈',
+            'declining': '📉',
+            'stable': '➡️'
+        }.get(analytics['gpa_trend'], '➡️'),
+    }
+
+
+def save_grade_analytics(student, analytics):
+    """Get or create the student's analytics record and store the latest figures."""
+    grade_analytics, _ = GradeAnalytics.objects.get_or_create(student=student)
+    grade_analytics.average_grade_score = analytics['average_score']
+    grade_analytics.best_performing_unit = analytics['best_unit'] or ''
+    grade_analytics.worst_performing_unit = analytics['worst_unit'] or ''
+    grade_analytics.units_at_risk = analytics['units_at_risk']
+    grade_analytics.gpa_trend = analytics['gpa_trend']
+    grade_analytics.save()
+    return grade_analytics
 
-class DashboardView(LoginRequiredMixin, TemplateView):
+
+class DashboardView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     """Main dashboard showing student's academic summary."""
     template_name = 'academics/dashboard.html'
     login_url = 'accounts:login'
@@ -20,16 +101,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         try:
             student = self.request.user.student
             gpa_data = GradeCalculator.calculate_wma(student)
-            grade_dist = GradeCalculator.get_grade_distribution(student)
-            
-            context['student'] = student
-            context['gpa'] = f"{gpa_data.get('gpa', 0.00):.2f}"
-            context['honors'] = gpa_data.get('honors_level', 'Pass')
-            context['units_completed'] = gpa_data.get('units_completed', 0)
-            context['failed_units'] = gpa_data.get('failed_units', 0)
-            context['grade_distribution'] = grade_dist
-            context['total_points'] = gpa_data.get('total_points', 0)
-            context['total_credit_units'] = gpa_data.get('total_credit_units', 0)
+            # Only evaluated when the cached distribution fragment is missing
+            grade_dist = SimpleLazyObject(lambda: GradeCalculator.get_grade_distribution(student))
+            context.update(dashboard_context(student, gpa_data, grade_dist))
+            context['results_version'] = ResultSummary.version_for(student)
         except ObjectDoesNotExist:
             context['error'] = 'Student profile not found. Please contact the registrar.'
             context['student'] = None
@@ -40,7 +115,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class TranscriptView(LoginRequiredMixin, TemplateView):
+class TranscriptView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     """Display student's academic transcript."""
     template_name = 'academics/transcript.html'
     login_url = 'accounts:login'
@@ -49,11 +124,12 @@ class TranscriptView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         try:
             student = self.request.user.student
-            transcript = GradeCalculator.get_transcript(student)
             gpa_data = GradeCalculator.calculate_wma(student)
             
             context['student'] = student
-            context['transcript'] = transcript
+            # Only evaluated when the cached table fragment is missing
+            context['transcript'] = SimpleLazyObject(lambda: GradeCalculator.get_transcript(student))
+            context['results_version'] = ResultSummary.version_for(student)
             context['gpa'] = f"{gpa_data.get('gpa', 0.00):.2f}"
             context['total_points'] = gpa_data.get('total_points', 0)
             context['total_credit_units'] = gpa_data.get('total_credit_units', 0)
@@ -68,7 +144,7 @@ class TranscriptView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class UnitsView(LoginRequiredMixin, TemplateView):
+class UnitsView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     """Display available units and results."""
     template_name = 'academics/units.html'
     login_url = 'accounts:login'
@@ -96,34 +172,48 @@ class UnitsView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class ProjectionView(LoginRequiredMixin, TemplateView):
+class ProjectionView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     """Graduation planner - project future grades needed."""
     template_name = 'academics/projection.html'
     login_url = 'accounts:login'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        form = ProjectionForm(
+            self.request.GET or None,
+            initial={'remaining_units': DEFAULT_REMAINING_UNITS}
+        )
+        context['form'] = form
         try:
             student = self.request.user.student
-            gpa_data = GradeCalculator.calculate_wma(student)
+            # Running totals and remaining curriculum: every projection
+            # below is arithmetic on one row
+            summary = ResultSummary.for_student(student)
+            totals = summary.totals()
+            gpa_data = GradeCalculator.wma_from_totals(totals)
             current_gpa = gpa_data.get('gpa', 0.00)
             
-            # Projection targets for different honor levels
-            targets = {
-                'First Class Honours': 70.0,
-                'Second Class (Upper)': 60.0,
-                'Second Class (Lower)': 50.0,
-                'Pass': 40.0,
-            }
+            from_curriculum = summary.remaining() is not None
+            if from_curriculum:
+                # The curriculum decides; the field is not shown
+                form.fields['remaining_units'].required = False
             
             projections = {}
-            remaining_units = 8  # Default - can be customized
+            requested_units = DEFAULT_REMAINING_UNITS
+            selected_target = None
+            if form.is_valid():
+                requested_units = form.cleaned_data['remaining_units'] or DEFAULT_REMAINING_UNITS
+                if form.cleaned_data['target_honors']:
+                    selected_target = float(form.cleaned_data['target_honors'])
+            remaining_units, remaining_credit_units, from_curriculum = remaining_for(summary, requested_units)
             
-            for target_name, target_gpa in targets.items():
+            for target_name, target_gpa in PROJECTION_TARGETS.items():
                 projection = GradeCalculator.project_required_average(
                     student,
                     target_gpa,
-                    remaining_units=remaining_units
+                    remaining_units=remaining_units,
+                    totals=totals,
+                    remaining_credit_units=remaining_credit_units
                 )
                 projections[target_name] = projection
             
@@ -131,6 +221,10 @@ class ProjectionView(LoginRequiredMixin, TemplateView):
             context['current_gpa'] = f"{current_gpa:.2f}"
             context['projections'] = projections
             context['remaining_units'] = remaining_units
+            context['remaining_credit_units'] = remaining_credit_units
+            context['from_curriculum'] = from_curriculum
+            context['remaining_by_year'] = CurriculumUnit.remaining_by_year(student) if from_curriculum else []
+            context['selected_target'] = selected_target
             context['honors_level'] = gpa_data.get('honors_level', 'Pass')
         except ObjectDoesNotExist:
             context['error'] = 'Student profile not found. Please contact the registrar.'
@@ -156,7 +250,8 @@ class TranscriptPDFExportView(LoginRequiredMixin, View):
             gpa_data = GradeCalculator.calculate_wma(student)
             
             # Generate PDF
-            pdf_bytes = PDFGenerator.generate_transcript_pdf(student, gpa_data)
+            with observe_time('pdf_render_seconds', document='transcript'):
+                pdf_bytes = PDFGenerator.generate_transcript_pdf(student, gpa_data)
             
             # Return as download
             response = HttpResponse(pdf_bytes, content_type='application/pdf')
@@ -170,7 +265,7 @@ class TranscriptPDFExportView(LoginRequiredMixin, View):
             return redirect('academics:transcript')
 
 
-class GradeAnalyticsView(LoginRequiredMixin, TemplateView):
+class GradeAnalyticsView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     """Display grade analytics and insights."""
     template_name = 'academics/analytics.html'
     login_url = 'accounts:login'
@@ -184,25 +279,9 @@ class GradeAnalyticsView(LoginRequiredMixin, TemplateView):
             analytics = AnalyticsCalculator.calculate_analytics(student)
             gpa_data = GradeCalculator.calculate_wma(student)
             alerts = AnalyticsCalculator.check_grade_alerts(student, gpa_data)
+            save_grade_analytics(student, analytics)
             
-            # Get or create analytics record
-            grade_analytics, _ = GradeAnalytics.objects.get_or_create(student=student)
-            grade_analytics.average_grade_score = analytics['average_score']
-            grade_analytics.best_performing_unit = analytics['best_unit'] or ''
-            grade_analytics.worst_performing_unit = analytics['worst_unit'] or ''
-            grade_analytics.units_at_risk = analytics['units_at_risk']
-            grade_analytics.gpa_trend = analytics['gpa_trend']
-            grade_analytics.save()
-            
-            context['student'] = student
-            context['analytics'] = analytics
-            context['gpa'] = f"{gpa_data.get('gpa', 0):.2f}"
-            context['alerts'] = alerts
-            context['trend_icon'] = {
-                'improving': '📈',
-                'declining': '📉',
-                'stable': '➡️'
-            }.get(analytics['gpa_trend'], '➡️')
+            context.update(analytics_context(student, analytics, gpa_data, alerts))
             
         except ObjectDoesNotExist:
             context['error'] = 'Student profile not found.'
@@ -259,8 +338,8 @@ class NotificationSettingsView(LoginRequiredMixin, TemplateView):
             return self.get(request)
 
 
-class GradeAlertsListView(LoginRequiredMixin, ListView):
-    """Display list of grade alerts."""
+class GradeAlertsListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    """Display list of grade alerts, newest first, with cursor pagination."""
     template_name = 'academics/grade_alerts.html'
     context_object_name = 'alerts'
     paginate_by = 10
@@ -268,7 +347,7 @@ class GradeAlertsListView(LoginRequiredMixin, ListView):
     
     def get_queryset(self):
         student = self.request.user.student
-        return GradeAlert.objects.filter(student=student).order_by('-created_at')
+        return GradeAlert.objects.filter(student=student)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -280,6 +359,33 @@ class GradeAlertsListView(LoginRequiredMixin, ListView):
         return context
 
 
+class GradeAlertsFeedView(LoginRequiredMixin, KeysetPaginationMixin, View):
+    """JSON feed of grade alerts with cursor pagination (for AJAX/mobile)."""
+    login_url = 'accounts:login'
+    
+    def get(self, request):
+        try:
+            student = request.user.student
+            page = self.get_keyset_page(GradeAlert.objects.filter(student=student))
+            return JsonResponse({
+                'alerts': [
+                    {
+                        'id': alert.id,
+                        'type': alert.alert_type,
+                        'title': alert.title,
+                        'message': alert.message,
+                        'is_read': alert.is_read,
+                        'created_at': alert.created_at.isoformat(),
+                    }
+                    for alert in page
+                ],
+                'next_cursor': page.next_cursor,
+                'previous_cursor': page.previous_cursor,
+            })
+        except ObjectDoesNotExist:
+            return JsonResponse({'status': 'error', 'message': 'Student profile not found'}, status=404)
+
+
 class MarkAlertAsReadView(LoginRequiredMixin, View):
     """Mark an alert as read (AJAX)."""
     login_url = 'accounts:login'
@@ -304,7 +410,10 @@ class ProjectionPDFExportView(LoginRequiredMixin, View):
     def get(self, request):
         try:
             student = request.user.student
-            gpa_data = GradeCalculator.calculate_wma(student)
+            summary = ResultSummary.for_student(student)
+            totals = summary.totals()
+            gpa_data = GradeCalculator.wma_from_totals(totals)
+            remaining_units, remaining_credit_units, _ = remaining_for(summary, DEFAULT_REMAINING_UNITS)
             
             from reportlab.lib.pagesizes import letter
             from reportlab.lib import colors
@@ -351,16 +460,15 @@ class ProjectionPDFExportView(LoginRequiredMixin, View):
             elements.append(Spacer(1, 12))
             
             # Projections
-            targets = {
-                'First Class Honours': 70.0,
-                'Second Class (Upper)': 60.0,
-                'Second Class (Lower)': 50.0,
-                'Pass': 40.0,
-            }
-            
             proj_data = [['Target', 'Required Average', 'Achievable']]
-            for target_name, target_gpa in targets.items():
-                projection = GradeCalculator.project_required_average(student, target_gpa)
+            for target_name, target_gpa in PROJECTION_TARGETS.items():
+                projection = GradeCalculator.project_required_average(
+                    student,
+                    target_gpa,
+                    remaining_units=remaining_units,
+                    totals=totals,
+                    remaining_credit_units=remaining_credit_units
+                )
                 proj_data.append([
                     target_name,
                     f"{projection.get('required_average', 0):.2f}%" if projection.get('required_average') else 'N/A',
@@ -383,7 +491,8 @@ class ProjectionPDFExportView(LoginRequiredMixin, View):
             elements.append(Spacer(1, 20))
             elements.append(Paragraph("Report Generated: " + str(timezone.now().strftime('%Y-%m-%d %H:%M:%S')), styles['Normal']))
             
-            doc.build(elements)
+            with observe_time('pdf_render_seconds', document='projection'):
+                doc.build(elements)
             buffer.seek(0)
             
             response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
@@ -397,3 +506,467 @@ class ProjectionPDFExportView(LoginRequiredMixin, View):
             return redirect('academics:projection')
 
 
+# ========== JSON API (mobile) ==========
+
+# Bump when the shape of the API payloads changes so old ETags stop matching
+API_VERSION = 1
+
+
+def student_results_etag(request, *args, **kwargs):
+    """
+    Strong ETag for a student's JSON resources.
+    
+    Derived from the student's ResultSummary version, their profile's
+    updated_at and the full request path, so it costs one small query
+    and changes whenever any result, unit or profile field in the payload
+    does. Returns None (no ETag) when there is no student.
+    """
+    try:
+        student = request.user.student
+    except ObjectDoesNotExist:
+        return None
+    version = ResultSummary.version_for(student)
+    raw = f'{API_VERSION}:{student.pk}:{version}:{student.updated_at.timestamp()}:{request.get_full_path()}'
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def compact_json(data, **kwargs):
+    """JsonResponse without whitespace between separators."""
+    return JsonResponse(data, json_dumps_params={'separators': (',', ':')}, **kwargs)
+
+
+def student_not_found():
+    return compact_json({'status': 'error', 'message': 'Student profile not found'}, status=404)
+
+
+class ResultsETagMixin:
+    """
+    Conditional GET for per-student JSON views.
+    
+    Answers If-None-Match with 304 before the view (and any calculator)
+    runs. Must come after LoginRequiredMixin.
+    """
+    
+    @method_decorator(condition(etag_func=student_results_etag))
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+
+class GPASummaryAPIView(LoginRequiredMixin, ReplicaReadMixin, ResultsETagMixin, View):
+    """JSON counterpart of DashboardView."""
+    login_url = 'accounts:login'
+    
+    def get(self, request):
+        try:
+            student = request.user.student
+        except ObjectDoesNotExist:
+            return student_not_found()
+        
+        gpa_data = GradeCalculator.calculate_wma(student)
+        return compact_json({
+            'registration_number': student.registration_number,
+            'course': student.course,
+            'year_of_study': student.year_of_study,
+            'gpa': gpa_data['gpa'],
+            'honors_level': gpa_data['honors_level'],
+            'units_completed': gpa_data['units_completed'],
+            'failed_units': gpa_data['failed_units'],
+            'total_points': gpa_data['total_points'],
+            'total_credit_units': gpa_data['total_credit_units'],
+            'grade_distribution': GradeCalculator.get_grade_distribution(student),
+        })
+
+
+class TranscriptAPIView(LoginRequiredMixin, ReplicaReadMixin, ResultsETagMixin, View):
+    """JSON counterpart of TranscriptView."""
+    login_url = 'accounts:login'
+    
+    def get(self, request):
+        try:
+            student = request.user.student
+        except ObjectDoesNotExist:
+            return student_not_found()
+        
+        gpa_data = GradeCalculator.calculate_wma(student)
+        return compact_json({
+            'registration_number': student.registration_number,
+            'gpa': gpa_data['gpa'],
+            'honors_level': gpa_data['honors_level'],
+            'total_points': gpa_data['total_points'],
+            'total_credit_units': gpa_data['total_credit_units'],
+            'units': GradeCalculator.get_transcript(student),
+        })
+
+
+class ProjectionAPIView(LoginRequiredMixin, ReplicaReadMixin, ResultsETagMixin, View):
+    """
+    JSON counterpart of ProjectionView.
+    
+    Projects over the student's remaining curriculum; ?remaining_units=
+    is only used when their course has no curriculum.
+    """
+    login_url = 'accounts:login'
+    
+    def get(self, request):
+        try:
+            student = request.user.student
+        except ObjectDoesNotExist:
+            return student_not_found()
+        
+        try:
+            remaining_units = int(request.GET.get('remaining_units', DEFAULT_REMAINING_UNITS))
+        except ValueError:
+            remaining_units = -1
+        if not 0 <= remaining_units <= 100:
+            return compact_json(
+                {'status': 'error', 'message': 'remaining_units must be a whole number from 0 to 100'},
+                status=400
+            )
+        
+        summary = ResultSummary.for_student(student)
+        totals = summary.totals()
+        gpa_data = GradeCalculator.wma_from_totals(totals)
+        remaining_units, remaining_credit_units, from_curriculum = remaining_for(summary, remaining_units)
+        projections = {}
+        for target_name, target_gpa in PROJECTION_TARGETS.items():
+            projection = GradeCalculator.project_required_average(
+                student,
+                target_gpa,
+                remaining_units=remaining_units,
+                totals=totals,
+                remaining_credit_units=remaining_credit_units
+            )
+            projections[target_name] = {
+                'target_gpa': projection['target_gpa'],
+                'required_average': projection['required_average'],
+                'is_achievable': projection['is_achievable'],
+                'message': projection['message'],
+            }
+        
+        return compact_json({
+            'current_gpa': gpa_data['gpa'],
+            'honors_level': gpa_data['honors_level'],
+            'remaining_units': remaining_units,
+            'remaining_credit_units': remaining_credit_units,
+            'remaining_source': 'curriculum' if from_curriculum else 'estimate',
+            'remaining_by_year': CurriculumUnit.remaining_by_year(student) if from_curriculum else None,
+            'projections': projections,
+        })
+
+
+class WhatIfAPIView(LoginRequiredMixin, ReplicaReadMixin, View):
+    """
+    What-if WMA from the student's running totals.
+    
+    GET ?score=MIT201:75 (repeatable) replaces or adds a unit's score;
+    ?remaining_credit_units=12&remaining_average=65 assumes further
+    credit units at an average score. Costs two small queries however
+    many results the student has: the summary row and, when scores are
+    given, the named units with any recorded score.
+    """
+    login_url = 'accounts:login'
+    max_units = 50
+    
+    def get(self, request):
+        try:
+            student = request.user.student
+        except ObjectDoesNotExist:
+            return student_not_found()
+        
+        try:
+            scores = self.parse_scores(request.GET.getlist('score'))
+        except ValueError as e:
+            return self.bad_request(str(e))
+        try:
+            remaining_credit_units = int(request.GET.get('remaining_credit_units', 0))
+            remaining_average = float(request.GET.get('remaining_average', 0))
+        except ValueError:
+            return self.bad_request('remaining_credit_units and remaining_average must be numbers')
+        if not 0 <= remaining_credit_units <= 500:
+            return self.bad_request('remaining_credit_units must be from 0 to 500')
+        if not 0 <= remaining_average <= 100:
+            return self.bad_request('remaining_average must be from 0 to 100')
+        
+        changes = []
+        if scores:
+            units = Unit.objects.filter(code__in=scores).annotate(
+                recorded_score=Subquery(
+                    Result.objects.filter(student=student, unit=OuterRef('pk')).values('score')[:1]
+                )
+            ).values_list('code', 'credit_units', 'recorded_score')
+            found = set()
+            for code, credit_units, recorded_score in units:
+                found.add(code)
+                changes.append((credit_units, scores[code], recorded_score))
+            unknown = sorted(set(scores) - found)
+            if unknown:
+                return self.bad_request(f'Unknown unit codes: {", ".join(unknown)}')
+        
+        summary = ResultSummary.for_student(student)
+        data = GradeCalculator.what_if(
+            summary.totals(),
+            changes,
+            remaining_credit_units=remaining_credit_units,
+            remaining_average=remaining_average
+        )
+        return compact_json(data)
+    
+    def parse_scores(self, values):
+        """Turn ['MIT201:75', ...] into {'MIT201': 75}; last value per unit wins."""
+        if len(values) > self.max_units:
+            raise ValueError(f'At most {self.max_units} scores per request')
+        scores = {}
+        for value in values:
+            code, _, score = value.rpartition(':')
+            if not code:
+                raise ValueError(f'Expected UNIT:SCORE, got "{value}"')
+            code = code.strip()
+            try:
+                score = int(score)
+            except ValueError:
+                raise ValueError(f'Score for {code} must be a whole number')
+            if not 0 <= score <= 100:
+                raise ValueError(f'Score for {code} must be from 0 to 100')
+            scores[code] = score
+        return scores
+    
+    def bad_request(self, message):
+        return compact_json({'status': 'error', 'message': message}, status=400)
+
+
+# ========== Registrar ==========
+
+class RegistrarGPAStreamView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Staff-only GPA export for class lists, streamed as NDJSON.
+    
+    GET ?course=&year_of_study= selects students by filter; GET with
+    repeated ?registration_number= or POST registration_numbers (JSON
+    list, or a form field separated by commas/whitespace) selects a list.
+    Students are processed chunk_size at a time with one grouped
+    aggregate per chunk, so output starts immediately and memory stays
+    flat however many students are requested.
+    """
+    login_url = 'accounts:login'
+    chunk_size = 500
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def get(self, request):
+        numbers = request.GET.getlist('registration_number')
+        if numbers:
+            return self.stream(self.number_chunks(numbers))
+        
+        students = Student.objects.all()
+        if request.GET.get('course'):
+            students = students.filter(course=request.GET['course'])
+        if request.GET.get('year_of_study'):
+            try:
+                students = students.filter(year_of_study=int(request.GET['year_of_study']))
+            except ValueError:
+                return JsonResponse({'status': 'error', 'message': 'year_of_study must be a number'}, status=400)
+        if not students.query.where:
+            return JsonResponse(
+                {'status': 'error', 'message': 'Provide registration numbers or a course/year_of_study filter'},
+                status=400
+            )
+        return self.stream(self.filter_chunks(students))
+    
+    def post(self, request):
+        if request.content_type == 'application/json':
+            try:
+                numbers = json.loads(request.body).get('registration_numbers', [])
+            except (ValueError, AttributeError):
+                return JsonResponse({'status': 'error', 'message': 'Invalid JSON body'}, status=400)
+            # A bare string would otherwise be read one character at a time
+            if not isinstance(numbers, list) or not all(isinstance(number, str) for number in numbers):
+                return JsonResponse(
+                    {'status': 'error', 'message': 'registration_numbers must be a list of strings'},
+                    status=400
+                )
+        else:
+            numbers = re.split(r'[\s,]+', request.POST.get('registration_numbers', ''))
+        numbers = [number.strip() for number in numbers if number.strip()]
+        if not numbers:
+            return JsonResponse({'status': 'error', 'message': 'No registration numbers given'}, status=400)
+        return self.stream(self.number_chunks(numbers))
+    
+    def stream(self, chunks):
+        response = StreamingHttpResponse(self.rows(chunks), content_type='application/x-ndjson')
+        # Don't let a reverse proxy hold the stream back
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    def filter_chunks(self, students):
+        """Yield lists of student rows from a queryset, walking by primary key."""
+        last_pk = 0
+        while True:
+            chunk = list(
+                students.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', 'registration_number', 'course', 'year_of_study')[:self.chunk_size]
+            )
+            if not chunk:
+                return
+            yield chunk
+            last_pk = chunk[-1][0]
+    
+    def number_chunks(self, numbers):
+        """Yield lists of student rows for registration numbers, in the order given."""
+        numbers = list(dict.fromkeys(numbers))
+        for start in range(0, len(numbers), self.chunk_size):
+            batch = numbers[start:start + self.chunk_size]
+            found = {
+                row[1]: row
+                for row in Student.objects.filter(registration_number__in=batch).values_list(
+                    'pk', 'registration_number', 'course', 'year_of_study'
+                )
+            }
+            # Unknown numbers are reported rather than dropped
+            yield [found.get(number, (None, number, None, None)) for number in batch]
+    
+    def rows(self, chunks):
+        """Yield one JSON line per student, one grouped aggregate per chunk."""
+        for chunk in chunks:
+            totals = {
+                row['student']: row
+                for row in Result.objects.filter(
+                    student_id__in=[pk for pk, *_ in chunk if pk is not None],
+                    score__gte=0,
+                    score__lte=100
+                ).values('student').annotate(**GradeCalculator.wma_aggregates()).order_by()
+            }
+            lines = []
+            for pk, registration_number, course, year_of_study in chunk:
+                if pk is None:
+                    line = {'registration_number': registration_number, 'error': 'Student not found'}
+                else:
+                    gpa_data = GradeCalculator.wma_from_totals(totals.get(pk, {}))
+                    line = {
+                        'registration_number': registration_number,
+                        'course': course,
+                        'year_of_study': year_of_study,
+                        'gpa': gpa_data['gpa'],
+                        'honors_level': gpa_data['honors_level'],
+                        'total_points': gpa_data['total_points'],
+                        'total_credit_units': gpa_data['total_credit_units'],
+                        'units_completed': gpa_data['units_completed'],
+                        'failed_units': gpa_data['failed_units'],
+                    }
+                lines.append(json.dumps(line, separators=(',', ':')))
+            yield '\n'.join(lines) + '\n'
+
+
+# ========== Async views ==========
+
+def _closing_connection(func):
+    """Wrap an ORM call so the worker thread's connection is released afterwards."""
+    def wrapper(*args):
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+def run_concurrently(*calls):
+    """
+    Run blocking calculator calls at the same time in the thread pool.
+    
+    Each call gets its own worker thread (thread_sensitive=False) and
+    therefore its own database connection, which is closed afterwards
+    unless CONN_MAX_AGE keeps it. With ASYNC_VIEW_CONCURRENCY off, calls
+    run one after another on the request's own thread and connection.
+    
+    Args:
+        calls: (function, *args) tuples
+        
+    Returns:
+        Awaitable of the results, in order
+    """
+    if not settings.ASYNC_VIEW_CONCURRENCY:
+        return asyncio.gather(*(sync_to_async(func)(*args) for func, *args in calls))
+    return asyncio.gather(*(
+        sync_to_async(_closing_connection(func), thread_sensitive=False)(*args)
+        for func, *args in calls
+    ))
+
+
+class AsyncStudentMixin(AccessMixin):
+    """
+    Login check for async views.
+    
+    Loads the session, user and student profile off the event loop and
+    stores the profile on self.student (None when missing). Reads go to
+    the primary database; ReplicaReadMixin only wraps sync views.
+    """
+    login_url = 'accounts:login'
+    
+    async def dispatch(self, request, *args, **kwargs):
+        def load_student():
+            if not request.user.is_authenticated:
+                return False, None
+            try:
+                return True, request.user.student
+            except ObjectDoesNotExist:
+                return True, None
+        
+        is_authenticated, self.student = await sync_to_async(load_student)()
+        if not is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncDashboardView(AsyncStudentMixin, TemplateView):
+    """DashboardView computing the GPA and grade distribution concurrently."""
+    template_name = 'academics/dashboard.html'
+    
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        student = self.student
+        if student is None:
+            context['error'] = 'Student profile not found. Please contact the registrar.'
+            context['student'] = None
+            return self.render_to_response(context)
+        
+        try:
+            gpa_data, grade_dist, results_version = await run_concurrently(
+                (GradeCalculator.calculate_wma, student),
+                (GradeCalculator.get_grade_distribution, student),
+                (ResultSummary.version_for, student),
+            )
+            context.update(dashboard_context(student, gpa_data, grade_dist))
+            context['results_version'] = results_version
+        except Exception as e:
+            context['error'] = f'Error loading dashboard: {str(e)}'
+            context['student'] = None
+        return self.render_to_response(context)
+
+
+class AsyncGradeAnalyticsView(AsyncStudentMixin, TemplateView):
+    """GradeAnalyticsView running its independent calculations concurrently."""
+    template_name = 'academics/analytics.html'
+    
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        student = self.student
+        if student is None:
+            context['error'] = 'Student profile not found.'
+            context['student'] = None
+            return self.render_to_response(context)
+        
+        try:
+            analytics, gpa_data = await run_concurrently(
+                (AnalyticsCalculator.calculate_analytics, student),
+                (GradeCalculator.calculate_wma, student),
+            )
+            # Alerts need the GPA; the analytics record needs the analytics
+            alerts, _ = await run_concurrently(
+                (AnalyticsCalculator.check_grade_alerts, student, gpa_data),
+                (save_grade_analytics, student, analytics),
+            )
+            context.update(analytics_context(student, analytics, gpa_data, alerts))
+        except Exception as e:
+            context['error'] = f'Error loading analytics: {str(e)}'
+            context['student'] = None
+        return self.render_to_response(context)
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Student
+from django.utils import timezone
+from academics.pagination import EstimatedCountPaginator
+from .models import OutgoingEmail, Student
 
 
 @admin.register(Student)
@@ -7,6 +9,9 @@ class StudentAdmin(admin.ModelAdmin):
     list_display = ['registration_number', 'user', 'course', 'year_of_study', 'academic_year']
     search_fields = ['registration_number', 'user__username', 'user__first_name', 'user__last_name']
     list_filter = ['year_of_study', 'academic_year', 'created_at']
+    list_select_related = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         ('User Information', {
             'fields': ('user',)
@@ -20,4 +25,30 @@ class StudentAdmin(admin.ModelAdmin):
         }),
     )
     readonly_fields = ['created_at', 'updated_at']
+    
+    def get_queryset(self, request):
+        """Load users with students; autocomplete results render __str__ per row."""
+        return super().get_queryset(request).select_related('user')
 
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'to', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['to', 'subject']
+    # Bodies hold live verification and password-reset links
+    exclude = ['body', 'html_body']
+    readonly_fields = ['created_at', 'sent_at', 'attempts', 'last_error']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['retry_now']
+    
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutgoingEmail.STATUS_SENT).update(
+            status=OutgoingEmail.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} emails queued for retry.')
@@ -0,0 +1,42 @@
+"""
+Authentication backend that loads a user and their student profile together.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_KEY = 'auth:user:{}'
+
+
+def invalidate_cached_user(user_id):
+    """Drop a user's cached copy so the next request reloads it."""
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+class CachedStudentBackend(ModelBackend):
+    """
+    ModelBackend whose get_user() fetches User and Student in one
+    select_related query and caches the pair for AUTH_USER_CACHE_SECONDS.
+
+    Called on every authenticated request, so with a cached session this
+    leaves request.user and request.user.student costing no queries. The
+    cached copy is invalidated whenever the User or Student is saved or
+    deleted and on logout (accounts/signals.py); queryset.update()
+    bypasses that. With AUTH_USER_CACHE_SECONDS = 0 nothing is cached.
+    """
+
+    def get_user(self, user_id):
+        seconds = settings.AUTH_USER_CACHE_SECONDS
+        key = USER_CACHE_KEY.format(user_id)
+        user = cache.get(key) if seconds > 0 else None
+        if user is None:
+            UserModel = get_user_model()
+            try:
+                user = UserModel._default_manager.select_related('student').get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            if seconds > 0:
+                cache.set(key, user, seconds)
+        return user if self.user_can_authenticate(user) else None
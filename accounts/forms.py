@@ -2,7 +2,8 @@ from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, PasswordResetForm, SetPasswordForm
 from django.core.validators import MinLengthValidator, RegexValidator
-from .models import Student
+from django.template.loader import render_to_string
+from .models import OutgoingEmail, Student
 
 
 class LoginForm(forms.Form):
@@ -134,6 +135,14 @@ class CustomPasswordResetForm(PasswordResetForm):
         }),
         help_text='Enter the email associated with your account.'
     )
+    
+    def send_mail(self, subject_template_name, email_template_name, context,
+                  from_email, to_email, html_email_template_name=None):
+        """Queue the reset email in the outbox instead of sending it inline."""
+        subject = ''.join(render_to_string(subject_template_name, context).splitlines())
+        body = render_to_string(email_template_name, context)
+        html_body = render_to_string(html_email_template_name, context) if html_email_template_name else ''
+        OutgoingEmail.objects.queue(subject, body, to_email, from_email=from_email, html_body=html_body)
 
 
 class CustomSetPasswordForm(SetPasswordForm):
@@ -0,0 +1,128 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = (
+        'Send queued emails (registration, password reset) over one reused mail '
+        'connection per batch, retrying failures with backoff. Run from cron, or '
+        'with --loop as a long-running worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails claimed and sent per connection')
+        parser.add_argument(
+            '--max-attempts', type=int, default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            help='Give up on an email after this many failed attempts'
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new email until interrupted')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = self.drain(options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(self.style.SUCCESS(f'✓ Sent {sent} emails, {failed} failed'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size, max_attempts):
+        """Send batches until nothing is due; returns (sent, failed) counts."""
+        sent = failed = 0
+        while True:
+            batch_sent, batch_failed, claimed = self.send_batch(batch_size, max_attempts)
+            sent += batch_sent
+            failed += batch_failed
+            if claimed < batch_size:
+                return sent, failed
+
+    def send_batch(self, batch_size, max_attempts):
+        """
+        Claim up to batch_size due emails and send them over one connection.
+
+        Claiming, sending and recording are separate steps so no transaction
+        or row lock is held across SMTP: a short transaction leases the rows
+        by moving next_attempt_at past the time the batch can take, the
+        sends run outside it, and each outcome is saved on its own. If the
+        worker dies mid-batch, the unsent rows come due again once the lease
+        ends; the sent ones are already recorded.
+
+        Returns:
+            Tuple of (sent, failed, claimed)
+        """
+        emails = self.claim(batch_size)
+        if not emails:
+            return 0, 0, 0
+
+        sent = failed = 0
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            # Mail server unreachable: every claimed email waits and retries
+            for email in emails:
+                self.record_failure(email, e, max_attempts)
+            return 0, len(emails), len(emails)
+        try:
+            for email in emails:
+                try:
+                    email.to_message(connection).send()
+                except Exception as e:
+                    self.record_failure(email, e, max_attempts)
+                    failed += 1
+                else:
+                    self.record_sent(email)
+                    sent += 1
+        finally:
+            connection.close()
+        return sent, failed, len(emails)
+
+    def claim(self, batch_size):
+        """
+        Lease up to batch_size due emails to this worker.
+
+        Each row is claimed with an UPDATE conditional on the next_attempt_at
+        that was read, so when two workers pick the same row (SQLite ignores
+        SELECT ... FOR UPDATE) only one of them gets it.
+        """
+        lease = timezone.now() + timedelta(seconds=(batch_size + 1) * settings.EMAIL_TIMEOUT)
+        claimed = []
+        with transaction.atomic():
+            candidates = OutgoingEmail.objects.due().select_for_update(skip_locked=True)[:batch_size]
+            for email in candidates:
+                if OutgoingEmail.objects.filter(
+                    pk=email.pk,
+                    status=OutgoingEmail.STATUS_PENDING,
+                    next_attempt_at=email.next_attempt_at
+                ).update(next_attempt_at=lease):
+                    email.next_attempt_at = lease
+                    claimed.append(email)
+        return claimed
+
+    def record_sent(self, email):
+        """Mark a delivered email sent."""
+        email.attempts += 1
+        email.status = OutgoingEmail.STATUS_SENT
+        email.sent_at = timezone.now()
+        email.last_error = ''
+        email.save(update_fields=['status', 'attempts', 'last_error', 'sent_at'])
+
+    def record_failure(self, email, error, max_attempts):
+        """Schedule a retry with exponential backoff, or give up."""
+        email.attempts += 1
+        email.last_error = str(error)[:1000]
+        if email.attempts >= max_attempts:
+            email.status = OutgoingEmail.STATUS_FAILED
+        else:
+            # 1, 2, 4, 8... minutes, capped at an hour
+            email.next_attempt_at = timezone.now() + timedelta(minutes=min(60, 2 ** (email.attempts - 1)))
+        email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
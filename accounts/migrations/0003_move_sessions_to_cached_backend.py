@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import KEY_PREFIX
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import caches
+from django.db import migrations
+from django.utils import timezone
+
+OLD_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+NEW_BACKEND = 'accounts.backends.CachedStudentBackend'
+
+
+def move_sessions(apps, schema_editor):
+    """Point live sessions logged in through ModelBackend at CachedStudentBackend.
+
+    ModelBackend is no longer listed in AUTHENTICATION_BACKENDS, and Django
+    logs out any session whose stored backend isn't, so rewrite them instead.
+    The cached_db copies are dropped so the rewritten rows are read next.
+    Only database-backed sessions can be migrated: users of a cache-only
+    SESSION_ENGINE are logged out once.
+    """
+    Session = apps.get_model('sessions', 'Session')
+    store = SessionStore()
+    cache = caches[settings.SESSION_CACHE_ALIAS]
+    for session in Session.objects.filter(expire_date__gt=timezone.now()).iterator():
+        data = store.decode(session.session_data)
+        if data.get('_auth_user_backend') == OLD_BACKEND:
+            data['_auth_user_backend'] = NEW_BACKEND
+            session.session_data = store.encode(data)
+            session.save(update_fields=['session_data'])
+            cache.delete(KEY_PREFIX + session.session_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_outgoing_email'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_sessions, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.mail import EmailMultiAlternatives
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 
 class Student(models.Model):
@@ -44,3 +47,90 @@ class Student(models.Model):
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.registration_number})"
 
+
+
+class OutgoingEmailQuerySet(models.QuerySet):
+    """QuerySet for the email outbox."""
+    
+    def queue(self, subject, body, to, from_email=None, html_body=''):
+        """
+        Add an email to the outbox instead of sending it inline.
+        
+        Written on the caller's connection, so inside transaction.atomic()
+        the email is only queued if the surrounding writes commit.
+        
+        Args:
+            subject: Subject line
+            body: Plain text body
+            to: Recipient address
+            from_email: Sender, defaults to DEFAULT_FROM_EMAIL
+            html_body: Optional HTML alternative
+            
+        Returns:
+            The queued OutgoingEmail
+        """
+        return self.create(
+            subject=subject,
+            body=body,
+            to=to,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            html_body=html_body or ''
+        )
+    
+    def due(self):
+        """Pending emails whose next attempt time has passed, oldest first."""
+        return self.filter(
+            status=OutgoingEmail.STATUS_PENDING,
+            next_attempt_at__lte=timezone.now()
+        ).order_by('next_attempt_at', 'pk')
+
+
+class OutgoingEmail(models.Model):
+    """
+    Email waiting to be sent by `manage.py send_queued_mail`.
+    
+    Registration and password reset queue their emails here so requests
+    never wait on SMTP.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    to = models.EmailField()
+    from_email = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = OutgoingEmailQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = "Outgoing emails"
+        indexes = [
+            # The worker's due() scan
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} → {self.to} ({self.status})"
+    
+    def to_message(self, connection):
+        """Build the EmailMultiAlternatives to send over an open connection."""
+        message = EmailMultiAlternatives(
+            self.subject, self.body, self.from_email, [self.to], connection=connection
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body, 'text/html')
+        return message
@@ -0,0 +1,32 @@
+"""
+Signal handlers keeping the cached request user in sync with profile changes.
+"""
+
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidate_cached_user
+from .models import Student
+
+
+@receiver(post_save, sender=User, dispatch_uid='accounts.user_saved')
+@receiver(post_delete, sender=User, dispatch_uid='accounts.user_deleted')
+def user_changed(sender, instance, **kwargs):
+    """Reload the user (password, names, last_login) on their next request."""
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=Student, dispatch_uid='accounts.student_saved')
+@receiver(post_delete, sender=Student, dispatch_uid='accounts.student_deleted')
+def student_changed(sender, instance, **kwargs):
+    """Reload the user with their updated student profile on their next request."""
+    invalidate_cached_user(instance.user_id)
+
+
+@receiver(user_logged_out, dispatch_uid='accounts.user_logged_out')
+def user_logged_out_handler(sender, request, user, **kwargs):
+    """Drop the cached user so nothing keeps serving it after logout."""
+    if user is not None:
+        invalidate_cached_user(user.pk)
@@ -1,3 +1,246 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .backends import CachedStudentBackend
+from .models import OutgoingEmail, OutgoingEmailQuerySet, Student
+from .throttling import client_ip, hash_semaphore, password_check_slot, take_token
+
+
+@override_settings(AUTH_USER_CACHE_SECONDS=300)
+class CachedStudentBackendTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username='cached', password='pass123', first_name='Cache', last_name='Student')
+		self.student = Student.objects.create(user=self.user, registration_number='CSB-0001', course='Computer Science')
+		self.backend = CachedStudentBackend()
+
+	def test_user_and_student_load_in_one_query(self):
+		with self.assertNumQueries(1):
+			user = self.backend.get_user(self.user.pk)
+			self.assertEqual(user.student.registration_number, 'CSB-0001')
+
+	def test_second_lookup_is_cached(self):
+		self.backend.get_user(self.user.pk)
+		with self.assertNumQueries(0):
+			user = self.backend.get_user(self.user.pk)
+			self.assertEqual(user.student.course, 'Computer Science')
+
+	def test_student_save_invalidates_cache(self):
+		self.backend.get_user(self.user.pk)
+		self.student.course = 'Mathematics'
+		self.student.save()
+		self.assertEqual(self.backend.get_user(self.user.pk).student.course, 'Mathematics')
+
+	def test_password_change_invalidates_cache(self):
+		old_hash = self.backend.get_user(self.user.pk).get_session_auth_hash()
+		self.user.set_password('newpass456')
+		self.user.save()
+		self.assertNotEqual(self.backend.get_user(self.user.pk).get_session_auth_hash(), old_hash)
+
+	def test_inactive_and_missing_users(self):
+		self.user.is_active = False
+		self.user.save()
+		self.assertIsNone(self.backend.get_user(self.user.pk))
+		self.assertIsNone(self.backend.get_user(999999))
+
+	def test_user_without_student_profile(self):
+		staff = User.objects.create_user(username='staffonly', password='pass123')
+		user = self.backend.get_user(staff.pk)
+		with self.assertNumQueries(0):
+			self.assertFalse(hasattr(user, 'student'))
+
+	def test_logout_invalidates_cache(self):
+		self.client.login(username='cached', password='pass123')
+		self.backend.get_user(self.user.pk)
+		self.client.get(reverse('accounts:logout'))
+		with self.assertNumQueries(1):
+			self.backend.get_user(self.user.pk)
+
+	@override_settings(AUTH_USER_CACHE_SECONDS=0)
+	def test_cache_disabled(self):
+		self.backend.get_user(self.user.pk)
+		with self.assertNumQueries(1):
+			self.backend.get_user(self.user.pk)
+
+	def test_wrong_password_is_checked_once(self):
+		with patch('django.contrib.auth.hashers.PBKDF2PasswordHasher.verify', return_value=False) as verify:
+			self.assertFalse(self.client.login(username='cached', password='wrong'))
+		self.assertEqual(verify.call_count, 1)
+
+
+@override_settings(
+	LOGIN_RATE_PER_IP=5, LOGIN_RATE_PER_ACCOUNT=3,
+	LOGIN_MAX_CONCURRENT_HASHES=1, LOGIN_HASH_WAIT_SECONDS=0.01, LOGIN_RETRY_AFTER_SECONDS=2,
+)
+class LoginAdmissionTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username='surge', password='pass123')
+		Student.objects.create(user=self.user, registration_number='SRG-0001')
+
+	def login(self, registration_number='SRG-0001', password='wrong', ip='10.0.0.1'):
+		return self.client.post(
+			reverse('accounts:login'),
+			{'registration_number': registration_number, 'password': password},
+			REMOTE_ADDR=ip,
+		)
+
+	def test_bucket_refills_over_time(self):
+		with patch('accounts.throttling.time.time', return_value=1000.0):
+			self.assertEqual([take_token('test', 'a', 2) for _ in range(3)], [0, 0, 30])
+		with patch('accounts.throttling.time.time', return_value=1030.0):
+			self.assertEqual(take_token('test', 'a', 2), 0)
+
+	def test_account_limit_returns_429_without_hashing(self):
+		for _ in range(3):
+			self.assertEqual(self.login().status_code, 200)
+		with patch('accounts.views.authenticate') as authenticate:
+			response = self.login(ip='10.0.0.2')
+		self.assertEqual(response.status_code, 429)
+		self.assertGreater(int(response['Retry-After']), 0)
+		self.assertFalse(authenticate.called)
+		# Other accounts from other addresses are unaffected
+		self.assertNotEqual(self.login('SRG-0002', ip='10.0.0.3').status_code, 429)
+
+	def test_ip_limit(self):
+		statuses = [self.login(f'SRG-{i:04d}').status_code for i in range(6)]
+		self.assertEqual(statuses[:5], [200] * 5)
+		self.assertEqual(statuses[5], 429)
+
+	@override_settings(LOGIN_TRUSTED_PROXIES=1)
+	def test_ip_bucket_follows_trusted_proxy(self):
+		# The proxy appends the real address; the client's own entry is ignored
+		request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.9', HTTP_X_FORWARDED_FOR='1.2.3.4, 196.201.1.7')
+		self.assertEqual(client_ip(request), '196.201.1.7')
+		self.assertEqual(client_ip(RequestFactory().post('/', REMOTE_ADDR='10.0.0.9')), '10.0.0.9')
+		with override_settings(LOGIN_TRUSTED_PROXIES=0):
+			self.assertEqual(client_ip(request), '10.0.0.9')
+
+	def test_busy_password_checks_are_turned_away(self):
+		semaphore = hash_semaphore()
+		semaphore.acquire()
+		try:
+			response = self.login(password='pass123')
+		finally:
+			semaphore.release()
+		self.assertEqual(response.status_code, 429)
+		self.assertEqual(response['Retry-After'], '2')
+
+		# Once the slot is free the same attempt succeeds
+		self.assertRedirects(self.login(password='pass123'), reverse('academics:dashboard'), fetch_redirect_response=False)
+
+	def test_slot_is_released_on_error(self):
+		with self.assertRaises(ValueError):
+			with password_check_slot():
+				raise ValueError
+		acquired = hash_semaphore().acquire(blocking=False)
+		self.assertTrue(acquired)
+		hash_semaphore().release()
+
+
+class OutgoingEmailTests(TestCase):
+	def run_worker(self, **options):
+		call_command('send_queued_mail', stdout=StringIO(), **options)
+
+	def test_registration_queues_email_without_sending(self):
+		response = self.client.post(reverse('accounts:register'), {
+			'first_name': 'Queue', 'last_name': 'Student', 'email': 'queue@students.jkuat.ac.ke',
+			'username': 'queued', 'password1': 'Sup3r-secret-pw', 'password2': 'Sup3r-secret-pw',
+		})
+		self.assertRedirects(response, reverse('accounts:login'), fetch_redirect_response=False)
+		self.assertEqual(len(mail.outbox), 0)
+		self.assertFalse(User.objects.get(username='queued').is_active)
+
+		email = OutgoingEmail.objects.get()
+		self.assertEqual(email.to, 'queue@students.jkuat.ac.ke')
+		self.assertIn('/accounts/verify-email/', email.body)
+
+		self.run_worker()
+		self.assertEqual(len(mail.outbox), 1)
+		self.assertEqual(mail.outbox[0].to, ['queue@students.jkuat.ac.ke'])
+		email.refresh_from_db()
+		self.assertEqual((email.status, email.attempts), (OutgoingEmail.STATUS_SENT, 1))
+
+	def test_password_reset_is_queued(self):
+		User.objects.create_user(username='forgot', email='forgot@students.jkuat.ac.ke', password='pass123')
+		response = self.client.post(reverse('accounts:password_reset'), {'email': 'forgot@students.jkuat.ac.ke'})
+		self.assertRedirects(response, reverse('accounts:password_reset_done'), fetch_redirect_response=False)
+		self.assertEqual(len(mail.outbox), 0)
+		self.assertIn('password-reset-confirm', OutgoingEmail.objects.get().body)
+
+	@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+	def test_admin_hides_reset_links(self):
+		User.objects.create_user(username='forgot', email='forgot@students.jkuat.ac.ke', password='pass123')
+		self.client.post(reverse('accounts:password_reset'), {'email': 'forgot@students.jkuat.ac.ke'})
+		email = OutgoingEmail.objects.get()
+		User.objects.create_superuser(username='mailadmin', password='pass123')
+		self.client.login(username='mailadmin', password='pass123')
+		response = self.client.get(reverse('admin:accounts_outgoingemail_change', args=[email.pk]))
+		self.assertEqual(response.status_code, 200)
+		self.assertNotContains(response, 'password-reset-confirm')
+
+	def test_batch_shares_one_connection(self):
+		for i in range(5):
+			OutgoingEmail.objects.queue('Subject', 'Body', f'student{i}@students.jkuat.ac.ke')
+		with patch('django.core.mail.backends.locmem.EmailBackend.open') as open_connection:
+			self.run_worker(batch_size=3)
+		self.assertEqual(len(mail.outbox), 5)
+		# Two batches, one connection each
+		self.assertEqual(open_connection.call_count, 2)
+
+	def test_sent_emails_are_recorded_before_a_crash(self):
+		first = OutgoingEmail.objects.queue('Subject', 'Body', 'first@students.jkuat.ac.ke')
+		second = OutgoingEmail.objects.queue('Subject', 'Body', 'second@students.jkuat.ac.ke')
+		sends = iter([1, KeyboardInterrupt()])
+
+		def send_messages(messages):
+			outcome = next(sends)
+			if isinstance(outcome, BaseException):
+				raise outcome
+			return outcome
+
+		with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+			with self.assertRaises(KeyboardInterrupt):
+				self.run_worker()
+		first.refresh_from_db()
+		second.refresh_from_db()
+		self.assertEqual(first.status, OutgoingEmail.STATUS_SENT)
+		# Still leased, so it comes due again only after the batch could have finished
+		self.assertEqual(second.status, OutgoingEmail.STATUS_PENDING)
+		self.assertGreater(second.next_attempt_at, timezone.now())
+
+	def test_rows_claimed_by_another_worker_are_skipped(self):
+		OutgoingEmail.objects.queue('Subject', 'Body', 'race@students.jkuat.ac.ke')
+		stale = list(OutgoingEmail.objects.due())
+		# Another worker leased the row after this one read it
+		OutgoingEmail.objects.update(next_attempt_at=timezone.now() + timedelta(minutes=5))
+		with patch.object(OutgoingEmailQuerySet, 'select_for_update', return_value=stale):
+			self.run_worker()
+		self.assertEqual(len(mail.outbox), 0)
+
+	def test_failures_back_off_then_give_up(self):
+		email = OutgoingEmail.objects.queue('Subject', 'Body', 'down@students.jkuat.ac.ke')
+		with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP down')):
+			self.run_worker(max_attempts=2)
+			email.refresh_from_db()
+			self.assertEqual((email.status, email.attempts, email.last_error), (OutgoingEmail.STATUS_PENDING, 1, 'SMTP down'))
+			self.assertGreater(email.next_attempt_at, timezone.now())
+
+			# Not due yet, so a second run leaves it alone
+			self.run_worker(max_attempts=2)
+			email.refresh_from_db()
+			self.assertEqual(email.attempts, 1)
+
+			OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+			self.run_worker(max_attempts=2)
+		email.refresh_from_db()
+		self.assertEqual((email.status, email.attempts), (OutgoingEmail.STATUS_FAILED, 2))
@@ -0,0 +1,123 @@
+"""
+Admission control for the login view.
+
+Two layers keep a results-day login surge from starving everyone else:
+
+- Token buckets in the cache, one per client IP and one per registration
+  number, refilled at LOGIN_RATE_PER_IP / LOGIN_RATE_PER_ACCOUNT attempts
+  per minute. The cache must be shared between workers (e.g. Redis) for
+  the limits to hold across processes; updates are not atomic, so
+  concurrent attempts on one key may occasionally let an extra one in.
+- A per-process semaphore allowing LOGIN_MAX_CONCURRENT_HASHES password
+  checks at a time. A request that can't get a slot within
+  LOGIN_HASH_WAIT_SECONDS is turned away instead of queueing, so worker
+  threads stay free for already-authenticated requests.
+
+Rejected attempts get a 429 with Retry-After from LoginView.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+BUCKET_KEY = 'login_bucket:{}:{}'
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+
+class LoginThrottled(Exception):
+    """Raised when a login attempt is not admitted; carries the suggested wait."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Login throttled, retry after {retry_after}s')
+        self.retry_after = retry_after
+
+
+def take_token(scope, identifier, per_minute):
+    """
+    Take one token from a cache-backed bucket holding up to per_minute tokens.
+
+    Args:
+        scope: Bucket family, e.g. 'ip' or 'account'
+        identifier: Client IP, registration number, ...
+        per_minute: Refill rate and capacity
+
+    Returns:
+        0 if a token was taken, otherwise seconds until one is available
+    """
+    key = BUCKET_KEY.format(scope, identifier)
+    now = time.time()
+    tokens, updated = cache.get(key, (per_minute, now))
+
+    # Refill for the time since the last attempt, up to capacity
+    tokens = min(per_minute, tokens + (now - updated) * per_minute / 60)
+    if tokens < 1:
+        return math.ceil((1 - tokens) * 60 / per_minute)
+
+    # Expire once the bucket would be full again anyway
+    cache.set(key, (tokens - 1, now), 60)
+    return 0
+
+
+def hash_semaphore():
+    """This process's semaphore bounding concurrent password checks."""
+    size = settings.LOGIN_MAX_CONCURRENT_HASHES
+    with _semaphores_lock:
+        if size not in _semaphores:
+            _semaphores[size] = threading.BoundedSemaphore(size)
+        return _semaphores[size]
+
+
+def client_ip(request):
+    """
+    Address used for the per-IP bucket.
+
+    REMOTE_ADDR, unless LOGIN_TRUSTED_PROXIES reverse proxies sit in front
+    of the app (e.g. 1 on Render or Heroku): then the address the outermost
+    of them saw, counted from the right of X-Forwarded-For, since anything
+    further left is whatever the client chose to send.
+    """
+    proxies = settings.LOGIN_TRUSTED_PROXIES
+    if proxies > 0:
+        forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+def check_login_rate(request, registration_number):
+    """
+    Take a token from the client's IP bucket and the account's bucket.
+
+    Raises:
+        LoginThrottled: If either bucket is empty
+    """
+    retry_after = take_token('ip', client_ip(request), settings.LOGIN_RATE_PER_IP)
+    if not retry_after:
+        retry_after = take_token(
+            'account', registration_number.strip().upper(), settings.LOGIN_RATE_PER_ACCOUNT
+        )
+    if retry_after:
+        raise LoginThrottled(retry_after)
+
+
+@contextmanager
+def password_check_slot():
+    """
+    Hold one of this process's password-check slots for the block.
+
+    Raises:
+        LoginThrottled: If no slot frees up within LOGIN_HASH_WAIT_SECONDS
+    """
+    semaphore = hash_semaphore()
+    if not semaphore.acquire(timeout=settings.LOGIN_HASH_WAIT_SECONDS):
+        raise LoginThrottled(settings.LOGIN_RETRY_AFTER_SECONDS)
+    try:
+        yield
+    finally:
+        semaphore.release()
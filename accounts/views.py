@@ -7,13 +7,14 @@ from django.contrib.auth.views import PasswordResetView, PasswordResetConfirmVie
 from django.contrib import messages
 from django.http import JsonResponse
 from django.urls import reverse_lazy
-from django.core.mail import send_mail
+from django.db import transaction
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.models import User
-from .models import Student
-from .forms import LoginForm, RegisterForm, StudentProfileForm
+from .models import OutgoingEmail, Student
+from .forms import LoginForm, RegisterForm, StudentProfileForm, CustomPasswordResetForm
+from .throttling import LoginThrottled, check_login_rate, password_check_slot
 
 
 class LoginView(View):
@@ -35,12 +36,15 @@ class LoginView(View):
         password = form.cleaned_data.get('password')
         
         try:
-            student = Student.objects.get(registration_number=registration_number)
-            user = authenticate(
-                request,
-                username=student.user.username,
-                password=password
-            )
+            # Admission control before any database or hashing work
+            check_login_rate(request, registration_number)
+            student = Student.objects.select_related('user').get(registration_number=registration_number)
+            with password_check_slot():
+                user = authenticate(
+                    request,
+                    username=student.user.username,
+                    password=password
+                )
             if user is not None:
                 if not user.is_active:
                     messages.error(request, 'Your account has been disabled. Please contact the administrator.')
@@ -54,12 +58,21 @@ class LoginView(View):
                 return redirect(next_page)
             else:
                 form.add_error(None, 'Invalid registration number or password.')
+        except LoginThrottled as e:
+            return self.throttled(request, form, e.retry_after)
         except Student.DoesNotExist:
             form.add_error('registration_number', 'Student with this registration number not found.')
         except Exception as e:
             form.add_error(None, f'An error occurred. Please try again later.')
         
         return render(request, self.template_name, {'form': form})
+    
+    def throttled(self, request, form, retry_after):
+        """Fast 429 asking the client to retry shortly."""
+        error = f'Too many login attempts right now. Please try again in {retry_after} seconds.'
+        response = render(request, self.template_name, {'form': form, 'error': error}, status=429)
+        response['Retry-After'] = str(retry_after)
+        return response
 
 
 class LogoutView(LoginRequiredMixin, View):
@@ -84,32 +97,23 @@ class RegisterView(FormView):
         return super().get(request)
     
     def form_valid(self, form):
-        user = form.save(commit=False)
-        user.is_active = False  # Require email verification
-        user.save()
-        
-        # Send verification email
-        token = default_token_generator.make_token(user)
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        
-        verification_url = self.request.build_absolute_uri(
-            reverse_lazy('accounts:verify-email', kwargs={'uidb64': uid, 'token': token})
-        )
-        
-        try:
-            send_mail(
+        # The user and their verification email commit together; the email
+        # is sent later by `manage.py send_queued_mail`
+        with transaction.atomic():
+            user = form.save()  # Inactive until the email is verified
+            
+            token = default_token_generator.make_token(user)
+            uid = urlsafe_base64_encode(force_bytes(user.pk))
+            verification_url = self.request.build_absolute_uri(
+                reverse_lazy('accounts:verify-email', kwargs={'uidb64': uid, 'token': token})
+            )
+            OutgoingEmail.objects.queue(
                 'Verify your JKUAT GPA Calculator account',
                 f'Click the link below to verify your email:\n\n{verification_url}\n\nThis link expires in 24 hours.',
-                'noreply@jkuat-gpa-calculator.com',
-                [user.email],
-                fail_silently=False,
+                user.email,
             )
-            messages.success(request, 'Registration successful! Check your email to verify your account.')
-        except Exception as e:
-            user.delete()
-            messages.error(request, f'Error sending verification email. Please try again.')
-            return self.form_invalid(form)
         
+        messages.success(self.request, 'Registration successful! Check your email to verify your account.')
         return super().form_valid(form)
     
     def form_invalid(self, form):
@@ -142,7 +146,8 @@ class CustomPasswordResetView(PasswordResetView):
     template_name = 'accounts/password_reset.html'
     email_template_name = 'accounts/password_reset_email.html'
     subject_template_name = 'accounts/password_reset_subject.txt'
-    success_url = reverse_lazy('accounts:password-reset-done')
+    form_class = CustomPasswordResetForm
+    success_url = reverse_lazy('accounts:password_reset_done')
     
     def form_valid(self, form):
         messages.info(self.request, 'If an account exists with that email, you will receive password reset instructions.')
@@ -152,13 +157,13 @@ class CustomPasswordResetView(PasswordResetView):
 class CustomPasswordResetConfirmView(PasswordResetConfirmView):
     """Handle password reset confirmation."""
     template_name = 'accounts/password_reset_confirm.html'
-    success_url = reverse_lazy('accounts:password-reset-complete')
+    success_url = reverse_lazy('accounts:password_reset_complete')
 
 
 class CustomPasswordChangeView(LoginRequiredMixin, PasswordChangeView):
     """Handle password changes for authenticated users."""
     template_name = 'accounts/password_change.html'
-    success_url = reverse_lazy('accounts:password-change-done')
+    success_url = reverse_lazy('accounts:password_change_done')
     login_url = 'accounts:login'
     
     def form_valid(self, form):
@@ -0,0 +1,114 @@
+"""
+Read-replica routing for read-only academic views.
+
+Reads are sent to the replica alias only inside a use_replica() block,
+which ReplicaReadMixin opens around the dashboard, transcript, units,
+projection and analytics views. Everything else, and every write, goes
+to the primary ('default').
+
+Read-your-writes: after a student's results change (by the student or
+an admin), that student is pinned to the primary for REPLICA_PIN_SECONDS,
+and any write inside a request pins the rest of that request. Pins live
+in the default cache, which must be shared between workers (e.g. Redis)
+for cross-process stickiness.
+
+Local testing with two SQLite files:
+    cp db.sqlite3 replica.sqlite3
+    DATABASE_REPLICA_URL=sqlite:///replica.sqlite3 python manage.py runserver
+or with two local PostgreSQL databases via DATABASE_REPLICA_URL=postgres://...
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_pinned = ContextVar('replica_pinned', default=False)
+
+PIN_KEY = 'replica_pin:student:{}'
+
+
+def replica_alias():
+    """Return the configured replica alias, or None when no replica is set up."""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def use_replica():
+    """Route reads inside the block to the replica unless pinned to the primary."""
+    reads_token = _replica_reads.set(True)
+    pinned_token = _pinned.set(False)
+    try:
+        yield
+    finally:
+        _pinned.reset(pinned_token)
+        _replica_reads.reset(reads_token)
+
+
+def pin_students(student_ids):
+    """Send reads for these students to the primary for REPLICA_PIN_SECONDS."""
+    if replica_alias() is None:
+        return
+    cache.set_many(
+        {PIN_KEY.format(student_id): True for student_id in student_ids},
+        settings.REPLICA_PIN_SECONDS
+    )
+
+
+def is_student_pinned(student_id):
+    """Return True if the student's results changed within the pin window."""
+    return bool(cache.get(PIN_KEY.format(student_id)))
+
+
+class ReplicaRouter:
+    """Database router sending opted-in reads to the replica and writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias and _replica_reads.get() and not _pinned.get():
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Reads after a write in the same request must see it
+        if _replica_reads.get():
+            _pinned.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary; never migrate it directly
+        if db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    View mixin serving the view's reads from the replica.
+
+    The response is rendered inside the replica block so that lazy
+    querysets evaluated by the template are routed too.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if replica_alias() is None or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        student = getattr(request.user, 'student', None)
+        if student is not None and is_student_pinned(student.pk):
+            return super().dispatch(request, *args, **kwargs)
+
+        with use_replica():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+        return response
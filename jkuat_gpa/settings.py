@@ -11,6 +11,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 from decouple import config, Csv
 
@@ -43,15 +44,21 @@ INSTALLED_APPS = [
     # Local apps
     'accounts.apps.AccountsConfig',
     'academics.apps.AcademicsConfig',
+    'monitoring.apps.MonitoringConfig',
 ]
 
 MIDDLEWARE = [
+    'monitoring.timing.ServerTimingMiddleware',  # Only active when SERVER_TIMING or SERVER_TIMING_LOG is on
+    'monitoring.metrics.MetricsMiddleware',  # Only active when METRICS_ENABLED is on
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise for static files
+    'monitoring.nplusone.NPlusOneMiddleware',  # Only active when NPLUSONE_DETECTION is on
+    'monitoring.slow_queries.SlowQueryMiddleware',  # Only active when SLOW_QUERY_MS is set
+    'jkuat_gpa.middleware.WhiteNoiseMiddleware',  # WhiteNoise for static files (async-capable)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'monitoring.profiling.ProfilingMiddleware',  # Staff-only ?_profile=1 capture when PROFILING_ENABLED is on
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,6 +97,44 @@ DATABASES = {
     )
 }
 
+# SQLite has no SSL; dj_database_url adds sslmode for every engine
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].get('OPTIONS', {}).pop('sslmode', None)
+
+# Optional read replica for read-only academic views (see jkuat_gpa/db_router.py)
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        conn_health_checks=True,
+        ssl_require=not DEBUG and not DATABASE_REPLICA_URL.startswith('sqlite')
+    )
+    # Tests run against the primary's test database
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['jkuat_gpa.db_router.ReplicaRouter']
+REPLICA_DATABASE_ALIAS = 'replica'
+# Seconds a student's reads stay on the primary after their results change
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=30, cast=int)
+
+# Async views (/dashboard/async/, /analytics/async/) run independent
+# calculations in parallel threads, each with its own DB connection.
+# Turn off to run them sequentially on the request's connection.
+ASYNC_VIEW_CONCURRENCY = config('ASYNC_VIEW_CONCURRENCY', default=True, cast=bool)
+
+# Tuned SQLite profile for single-node deployments (see jkuat_gpa/sqlite.py).
+# Applied to every new SQLite connection when SQLITE_TUNING=True.
+SQLITE_TUNING = config('SQLITE_TUNING', default=False, cast=bool)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',          # readers don't block the writer
+    'synchronous': 'NORMAL',        # safe with WAL, fsync at checkpoints only
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),  # ms
+    'mmap_size': 268435456,         # 256 MiB memory-mapped I/O
+    'cache_size': -65536,           # 64 MiB page cache (negative = KiB)
+    'temp_store': 'MEMORY',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -173,6 +218,13 @@ DEFAULT_FROM_EMAIL = config(
     default='noreply@jkuat-gpa-calculator.com'
 )
 
+# Registration and password reset emails are queued in accounts.OutgoingEmail
+# and sent by `manage.py send_queued_mail` (cron, or --loop as a worker)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=6, cast=int)
+# Sent emails older than this are removed by `manage.py prune_stale_data`
+EMAIL_OUTBOX_RETENTION_DAYS = config('EMAIL_OUTBOX_RETENTION_DAYS', default=30, cast=int)
+
 # ============================================================================
 # PASSWORD & SECURITY SETTINGS
 # ============================================================================
@@ -195,13 +247,79 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# ============================================================================
+# CACHE & AUTHENTICATION
+# ============================================================================
+# Use a shared cache (e.g. django.core.cache.backends.redis.RedisCache)
+# when running more than one worker process
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+# LocMem and dummy caches are private to each worker process, so anything
+# that must be invalidated across workers (sessions, the request user)
+# is only cached when this is True
+SHARED_CACHE = CACHE_BACKEND not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='jkuat-gpa'),
+    },
+    # {% cache %} fragments (transcript table, grade distribution), keyed by
+    # the student's results version so result writes invalidate them. Kept in
+    # its own location (e.g. another Redis database) so clearing it never
+    # drops sessions, throttle buckets or replica pins
+    'template_fragments': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('FRAGMENT_CACHE_LOCATION', default='jkuat-gpa-fragments'),
+        'KEY_PREFIX': 'fragments',
+    },
+}
+
+# Loads User and Student in one query and caches them (see accounts/backends.py).
+# It is a ModelBackend, so listing ModelBackend as well would check every
+# wrong password twice; sessions stored under ModelBackend were moved over
+# by accounts/migrations/0003_move_sessions_to_cached_backend.py
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.CachedStudentBackend',
+]
+# 0 disables the user cache; off unless the cache is shared, since a logout
+# or deactivation in one worker can't invalidate another worker's copy
+AUTH_USER_CACHE_SECONDS = config('AUTH_USER_CACHE_SECONDS', default=300 if SHARED_CACHE else 0, cast=int)
+
+# Login admission control (see accounts/throttling.py). Attempts per minute
+# per client IP and per registration number, and password checks allowed
+# to run at once in each worker process.
+# Size LOGIN_RATE_PER_IP for the busiest single address, which is usually
+# the campus NAT on results day: e.g. 6,000 students behind it logging in
+# over ~15 minutes is ~400/min, so the default leaves some headroom.
+# Per-account buckets and the hash semaphore still bound guessing and CPU.
+LOGIN_RATE_PER_IP = config('LOGIN_RATE_PER_IP', default=600, cast=int)
+# Reverse proxies in front of the app that append to X-Forwarded-For (1 on
+# Render/Heroku). 0 keys the IP bucket on REMOTE_ADDR, which behind a proxy
+# puts every client in one bucket
+LOGIN_TRUSTED_PROXIES = config('LOGIN_TRUSTED_PROXIES', default=0, cast=int)
+LOGIN_RATE_PER_ACCOUNT = config('LOGIN_RATE_PER_ACCOUNT', default=10, cast=int)
+LOGIN_MAX_CONCURRENT_HASHES = config('LOGIN_MAX_CONCURRENT_HASHES', default=4, cast=int)
+# How long a login waits for a password-check slot before getting a 429
+LOGIN_HASH_WAIT_SECONDS = config('LOGIN_HASH_WAIT_SECONDS', default=0.5, cast=float)
+LOGIN_RETRY_AFTER_SECONDS = config('LOGIN_RETRY_AFTER_SECONDS', default=2, cast=int)
+
 # Session settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# With a shared cache, sessions are read from it and written through to the
+# database; a per-process cache would keep serving logged-out sessions
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.cached_db' if SHARED_CACHE
+    else 'django.contrib.sessions.backends.db'
+)
 SESSION_COOKIE_AGE = 1209600  # 2 weeks
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SECURE = not DEBUG  # Only HTTPS in production
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
+# Read grade alerts older than this are removed by `manage.py prune_stale_data`
+GRADE_ALERT_RETENTION_DAYS = config('GRADE_ALERT_RETENTION_DAYS', default=180, cast=int)
+
 # Security headers (production)
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -237,3 +355,97 @@ PASSWORD_RESET_TIMEOUT = 3600  # 1 hour
 # Disable dark mode theme toggle to fix rendering issue
 ADMIN_URL_PREFIX = 'admin/'
 
+
+# ============================================================================
+# STARTUP
+# ============================================================================
+# Load the URLconf, templates and WARMUP_IMPORTS when a worker boots instead
+# of on its first request (see jkuat_gpa/warmup.py)
+WARMUP_ON_BOOT = config('WARMUP_ON_BOOT', default=False, cast=bool)
+WARMUP_TEMPLATES = [
+    'base.html',
+    'accounts/login.html',
+    'academics/dashboard.html',
+    'academics/transcript.html',
+    'academics/analytics.html',
+]
+# Modules loaded lazily on first use, e.g. reportlab.platypus for PDF exports
+WARMUP_IMPORTS = config('WARMUP_IMPORTS', default='', cast=Csv())
+
+
+# ============================================================================
+# QUERY MONITORING
+# ============================================================================
+# Repeated-query (N+1) detection per request (see monitoring/nplusone.py)
+NPLUSONE_DETECTION = config('NPLUSONE_DETECTION', default=DEBUG, cast=bool)
+# Executions of one statement shape allowed per request before reporting
+NPLUSONE_THRESHOLD = config('NPLUSONE_THRESHOLD', default=5, cast=int)
+# Raise RepeatedQueryError instead of logging a warning
+NPLUSONE_RAISE = config('NPLUSONE_RAISE', default=False, cast=bool)
+
+# Per-request db/calc/tpl breakdown (see monitoring/timing.py). The header
+# reveals query counts, so it is off by default in production
+SERVER_TIMING = config('SERVER_TIMING', default=DEBUG, cast=bool)
+# Log the same breakdown as one JSON line per request on 'monitoring.timing'
+SERVER_TIMING_LOG = config('SERVER_TIMING_LOG', default=False, cast=bool)
+
+# Prometheus metrics at /metrics (see monitoring/metrics.py). Workers on one
+# host aggregate through the METRICS_DB SQLite file. MetricsMiddleware is
+# sync-only and would run the async views in a thread under ASGI, so it is off
+# by default
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_DB = config('METRICS_DB', default=str(Path(tempfile.gettempdir()) / 'jkuat_gpa_metrics.sqlite3'))
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=5, cast=float)
+# Bearer token for scrapers without a staff session; empty disables token access
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Staff can profile a single request with ?_profile=1 or an X-Profile
+# header; traces are kept as ProfileCapture rows (see monitoring/profiling.py).
+# Off by default since ProfilingMiddleware is sync-only (see METRICS_ENABLED)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_TOP_FUNCTIONS = config('PROFILING_TOP_FUNCTIONS', default=40, cast=int)
+PROFILE_RETENTION_DAYS = config('PROFILE_RETENTION_DAYS', default=14, cast=int)
+
+# Statements taking at least SLOW_QUERY_MS are logged with their URL name and
+# calling frame (see monitoring/slow_queries.py); 0 disables the log. Off by
+# default since SlowQueryMiddleware is sync-only (see METRICS_ENABLED)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=0, cast=float)
+SLOW_QUERY_MAX_SQL = config('SLOW_QUERY_MAX_SQL', default=2000, cast=int)
+SLOW_QUERY_LOG_FILE = config('SLOW_QUERY_LOG_FILE', default=str(Path(tempfile.gettempdir()) / 'jkuat_gpa_slow_queries.log'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        # SERVER_TIMING_LOG lines, one JSON object each, for the log drain
+        'timing': {
+            'class': 'logging.StreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': 'message',
+        },
+        # One file per worker process (SLOW_QUERY_LOG_FILE.<pid>), so
+        # rotation in one worker can't swallow another's entries
+        'slow_queries': {
+            'class': 'monitoring.log_handlers.PerProcessRotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'monitoring.timing': {
+            'handlers': ['timing'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'monitoring.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,39 @@
+"""
+Opt-in SQLite tuning for single-node deployments.
+
+Enabled with SQLITE_TUNING=True. Every new SQLite connection gets the
+PRAGMAs in settings.SQLITE_PRAGMAS applied through the connection_created
+signal: WAL lets dashboard reads proceed while a result write is in
+progress, and busy_timeout makes writers wait for the lock instead of
+failing with "database is locked".
+"""
+
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(connection, pragmas):
+    """
+    Apply PRAGMAs to an open SQLite connection.
+    
+    Args:
+        connection: Django DatabaseWrapper for an SQLite database
+        pragmas: Mapping of PRAGMA name to value
+        
+    Returns:
+        Dictionary of the values SQLite reports after applying them
+    """
+    applied = {}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            applied[name] = row[0] if row else None
+    return applied
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """connection_created receiver applying the tuned SQLite profile."""
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNING', False):
+        return
+    apply_sqlite_pragmas(connection, settings.SQLITE_PRAGMAS)
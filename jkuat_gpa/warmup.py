@@ -0,0 +1,64 @@
+"""
+Optional warm-up run when a worker boots (WARMUP_ON_BOOT).
+
+Django defers the URLconf, every view module and template compilation to
+the first request, which on a freshly started instance costs many times
+a warm one. warm_up() does that work at boot instead:
+
+- resolves the URLconf, importing all views and forms
+- compiles WARMUP_TEMPLATES into the cached template loader and loads
+  the context processors
+- imports the session serializer, message storage and WARMUP_IMPORTS, e.g. 'reportlab.platypus' so the first PDF
+  export doesn't pay for the library that is otherwise loaded lazily
+
+It doesn't touch the database, so it is safe under `gunicorn --preload`,
+where it runs once in the master and every forked worker inherits the
+result.
+"""
+
+import importlib
+import logging
+import time
+
+from django.conf import settings
+from django.template import engines
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('jkuat_gpa.warmup')
+
+
+def warm_up():
+    """
+    Prime the URLconf, templates and modules the first requests need.
+
+    Returns:
+        Dictionary of milliseconds spent per step
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    get_resolver().url_patterns
+    # Builds the reverse lookup tables as well
+    reverse(settings.LOGIN_URL)
+    timings['urls'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for name in settings.WARMUP_TEMPLATES:
+        get_template(name)
+    for backend in engines.all():
+        # DjangoTemplates imports its context processors on first render
+        if hasattr(backend, 'engine'):
+            backend.engine.template_context_processors
+    timings['templates'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    import_string(settings.SESSION_SERIALIZER)
+    import_string(settings.MESSAGE_STORAGE)
+    for module in settings.WARMUP_IMPORTS:
+        importlib.import_module(module)
+    timings['imports'] = (time.perf_counter() - start) * 1000
+
+    logger.info('Warm-up done: %s', ', '.join(f'{step} {ms:.0f}ms' for step, ms in timings.items()))
+    return timings
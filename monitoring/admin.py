@@ -0,0 +1,60 @@
+from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from academics.pagination import EstimatedCountPaginator
+from .models import ProfileCapture
+
+
+@admin.register(ProfileCapture)
+class ProfileCaptureAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'method', 'path', 'view_name', 'status_code', 'duration_ms', 'query_count', 'user', 'download']
+    list_filter = ['view_name', 'created_at']
+    search_fields = ['path', 'view_name']
+    list_select_related = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # The raw stats are only offered as a download
+    exclude = ['data']
+    readonly_fields = [
+        'created_at', 'user', 'method', 'path', 'view_name', 'status_code',
+        'duration_ms', 'query_count', 'download', 'top_functions'
+    ]
+
+    def get_queryset(self, request):
+        # Don't load every trace's stats to list them
+        return super().get_queryset(request).defer('data', 'summary')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='monitoring_profilecapture_download'
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        capture = get_object_or_404(ProfileCapture, pk=pk)
+        response = HttpResponse(bytes(capture.data), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="{capture.filename}"'
+        return response
+
+    @admin.display(description='.prof')
+    def download(self, obj):
+        url = reverse('admin:monitoring_profilecapture_download', args=[obj.pk])
+        return format_html('<a href="{}">Download</a>', url)
+
+    @admin.display(description='Top functions by cumulative time')
+    def top_functions(self, obj):
+        return format_html('<pre style="font-size: 11px">{}</pre>', obj.summary)
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+
+    def ready(self):
+        from django.conf import settings
+        from .metrics import instrument_caches
+        from .timing import instrument_templates
+        instrument_templates()
+        if settings.METRICS_ENABLED:
+            instrument_caches()
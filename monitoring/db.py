@@ -0,0 +1,22 @@
+"""
+Helpers for observing the SQL executed by the ORM.
+"""
+
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+@contextmanager
+def wrap_all_connections(wrapper):
+    """
+    Install an execute wrapper on every configured database connection.
+
+    Args:
+        wrapper: Callable with connection.execute_wrapper's signature
+            (execute, sql, params, many, context)
+    """
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
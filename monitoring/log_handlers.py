@@ -0,0 +1,40 @@
+"""
+Logging handlers safe to share between worker processes.
+
+Imported by the LOGGING setting, before apps are loaded, so this module
+must not touch models or settings.
+"""
+
+import os
+from logging.handlers import RotatingFileHandler
+
+
+class PerProcessRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler writing to `<filename>.<pid>`, one file per process.
+
+    Gunicorn workers sharing one RotatingFileHandler file lose entries: when
+    one worker rotates, the rest keep writing to the renamed backup. Here each
+    process rotates only its own file. The pid is read at emit time, so
+    workers forked after logging is configured (gunicorn --preload) still get
+    a file of their own. Readers glob `<filename>.*`.
+    """
+
+    def __init__(self, filename, *args, **kwargs):
+        self.base_filename = os.path.abspath(filename)
+        self.pid = os.getpid()
+        super().__init__(f'{self.base_filename}.{self.pid}', *args, **kwargs)
+
+    def emit(self, record):
+        pid = os.getpid()
+        if pid != self.pid:
+            # Forked: drop the parent's stream and open this process's file
+            self.acquire()
+            try:
+                if self.stream:
+                    self.stream.close()
+                    self.stream = None
+                self.pid = pid
+                self.baseFilename = f'{self.base_filename}.{pid}'
+            finally:
+                self.release()
+        super().emit(record)
@@ -0,0 +1,75 @@
+import glob
+import json
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.benchmarking import summarize
+
+_TABLE = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+"?(\w+)"?', re.IGNORECASE)
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarize the slow query log (every worker\'s SLOW_QUERY_LOG_FILE.<pid> '
+        'and its rotated backups) by statement shape: count, latency percentiles, tables, '
+        'and the views and calling frames that run it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=settings.SLOW_QUERY_LOG_FILE,
+            help='Log file base name; <file>.<pid> per worker and their backups are read too'
+        )
+        parser.add_argument('--table', default='', help='Only statements touching this table, e.g. academics_result')
+        parser.add_argument('--top', type=int, default=10, help='Statement shapes to show')
+        parser.add_argument('--sort', choices=['total', 'count', 'p95', 'max'], default='total')
+
+    def handle(self, *args, **options):
+        # Per-process files (<file>.<pid>) and their backups (<file>.<pid>.<n>),
+        # oldest backup of each process first
+        paths = sorted(glob.glob(options['file'] + '.*'), reverse=True) + glob.glob(options['file'])
+        if not paths:
+            raise CommandError(f'No slow query log at {options["file"]}')
+
+        groups = {}
+        skipped = 0
+        for path in paths:
+            with open(path, encoding='utf-8') as log:
+                for line in log:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    tables = sorted(set(_TABLE.findall(entry['fingerprint'])))
+                    if options['table'] and options['table'] not in tables:
+                        continue
+                    group = groups.setdefault(entry['fingerprint'], {'durations': [], 'tables': tables, 'views': {}, 'callers': {}})
+                    group['durations'].append(entry['duration_ms'])
+                    for key, value in (('views', entry['view']), ('callers', entry['caller'])):
+                        group[key][value] = group[key].get(value, 0) + 1
+
+        rows = []
+        for shape, group in groups.items():
+            stats = summarize(group['durations'])
+            stats['total'] = sum(group['durations'])
+            rows.append((shape, group, stats))
+        rows.sort(key=lambda row: row[2][options['sort']], reverse=True)
+
+        total = sum(len(group['durations']) for group in groups.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {total} slow queries in {len(groups)} shapes from {len(paths)} files'
+            + (f' ({skipped} unreadable lines)' if skipped else '')
+        ))
+        for shape, group, stats in rows[:options['top']]:
+            self.stdout.write('')
+            self.stdout.write(
+                f"{stats['count']}x  total={stats['total']:.0f}ms p50={stats['p50']:.1f}ms "
+                f"p95={stats['p95']:.1f}ms max={stats['max']:.1f}ms  tables: {', '.join(group['tables'])}"
+            )
+            self.stdout.write(f'  {shape[:300]}')
+            for key in ('views', 'callers'):
+                for name, count in sorted(group[key].items(), key=lambda item: -item[1])[:3]:
+                    self.stdout.write(f'    {count:>5}  {name or "-"}')
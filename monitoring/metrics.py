@@ -0,0 +1,248 @@
+"""
+Process-shared application metrics in Prometheus text format.
+
+Every metric is stored as additive counters (histograms as cumulative
+bucket, _sum and _count counters), so each worker process buffers its
+increments in memory and periodically adds them to one SQLite file at
+METRICS_DB with an upsert. Any worker can then answer /metrics for all
+of them; figures from other workers lag by up to METRICS_FLUSH_SECONDS.
+
+Recorded:
+    http_request_duration_seconds  histogram per URL name (MetricsMiddleware)
+    db_queries_per_request         histogram per URL name (MetricsMiddleware)
+    pdf_render_seconds             histogram per document (observe_time)
+    calculator_calls_total         counter per calculator method (@timed_calculator)
+    cache_requests_total           hit/miss counter per cache (instrument_caches)
+
+Scrape with a staff session, or with `Authorization: Bearer <METRICS_TOKEN>`.
+"""
+
+import atexit
+import functools
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.module_loading import import_string
+
+from .db import wrap_all_connections
+
+logger = logging.getLogger('monitoring.metrics')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# name: (type, help, buckets)
+METRICS = {
+    'http_request_duration_seconds': ('histogram', 'Request latency by URL name', LATENCY_BUCKETS),
+    'db_queries_per_request': ('histogram', 'SQL queries per request by URL name', QUERY_BUCKETS),
+    'pdf_render_seconds': ('histogram', 'PDF export render time by document', LATENCY_BUCKETS),
+    'calculator_calls_total': ('counter', 'Calculator method calls', None),
+    'cache_requests_total': ('counter', 'Cache reads by cache and result', None),
+}
+
+_SCHEMA = 'CREATE TABLE IF NOT EXISTS samples (name TEXT, labels TEXT, value REAL, PRIMARY KEY (name, labels))'
+_UPSERT = (
+    'INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) '
+    'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value'
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    """Canonical Prometheus label string for a dict, e.g. 'le="0.5",view="x"'."""
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+
+
+class MetricsStore:
+    """In-process buffer of counter increments, flushed to the shared SQLite file."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+    def inc(self, name, value=1, **labels):
+        """Add to a counter."""
+        if not settings.METRICS_ENABLED:
+            return
+        key = (name, format_labels(labels))
+        with self.lock:
+            self.pending[key] = self.pending.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Record a histogram observation."""
+        if not settings.METRICS_ENABLED:
+            return
+        buckets = METRICS[name][2]
+        with self.lock:
+            # Every bucket gets a sample, zero or not, so the series is complete
+            for le in buckets + ('+Inf',):
+                key = (f'{name}_bucket', format_labels(dict(labels, le=le)))
+                self.pending[key] = self.pending.get(key, 0) + (le == '+Inf' or value <= le)
+            for suffix, amount in (('_sum', value), ('_count', 1)):
+                key = (name + suffix, format_labels(labels))
+                self.pending[key] = self.pending.get(key, 0) + amount
+
+    def connect(self):
+        connection = sqlite3.connect(settings.METRICS_DB, timeout=5)
+        connection.execute(_SCHEMA)
+        return connection
+
+    def flush(self, force=False):
+        """Add buffered increments to the shared file every METRICS_FLUSH_SECONDS (or now)."""
+        with self.lock:
+            if not self.pending or (not force and time.monotonic() - self.last_flush < settings.METRICS_FLUSH_SECONDS):
+                return
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        try:
+            connection = self.connect()
+            try:
+                with connection:
+                    connection.executemany(_UPSERT, [(name, labels, value) for (name, labels), value in pending.items()])
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            # Keep the increments for the next flush rather than lose them
+            logger.warning('Could not write metrics to %s: %s', settings.METRICS_DB, e)
+            with self.lock:
+                for key, value in pending.items():
+                    self.pending[key] = self.pending.get(key, 0) + value
+
+    def samples(self):
+        """All workers' flushed samples as {(name, labels): value}."""
+        connection = self.connect()
+        try:
+            return {(name, labels): value for name, labels, value in connection.execute('SELECT name, labels, value FROM samples')}
+        finally:
+            connection.close()
+
+    def render(self):
+        """Prometheus text exposition of every metric."""
+        self.flush(force=True)
+        samples = self.samples()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            suffixes = ['_bucket', '_sum', '_count'] if kind == 'histogram' else ['']
+            series = [
+                (sample_name, labels, value)
+                for (sample_name, labels), value in samples.items()
+                if sample_name.startswith(name) and sample_name[len(name):] in suffixes
+            ]
+            # Group each label set's buckets (in le order), sum and count together
+            series.sort(key=lambda row: (
+                _without_le(row[1]), suffixes.index(row[0][len(name):]), _le_value(row[1])
+            ))
+            for sample_name, labels, value in series:
+                value = _format_value(value)
+                lines.append(f'{sample_name}{{{labels}}} {value}' if labels else f'{sample_name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_value(value):
+    # Full precision: counters past a million must not round, or rate() breaks
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _without_le(labels):
+    return ','.join(part for part in labels.split(',') if not part.startswith('le='))
+
+
+def _le_value(labels):
+    for part in labels.split(','):
+        if part.startswith('le='):
+            value = part[4:-1]
+            return float('inf') if value == '+Inf' else float(value)
+    return 0.0
+
+
+store = MetricsStore()
+atexit.register(lambda: settings.METRICS_ENABLED and store.flush(force=True))
+
+
+def count_calls(label):
+    """Decorator counting calls in calculator_calls_total{method=label}."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store.inc('calculator_calls_total', method=label)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def observe_time(name, **labels):
+    """Record the block's duration in seconds in a histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        store.observe(name, time.perf_counter() - start, **labels)
+
+
+_MISSING = object()
+
+
+def _counted_get(get):
+    @functools.wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        value = get(self, key, _MISSING, version=version)
+        cache_name = getattr(self, 'key_prefix', '') or 'default'
+        store.inc('cache_requests_total', cache=cache_name, result='miss' if value is _MISSING else 'hit')
+        return default if value is _MISSING else value
+    wrapper._metrics = True
+    return wrapper
+
+
+def instrument_caches():
+    """
+    Count hits and misses of cache.get() for every configured backend.
+
+    Caches are labelled by KEY_PREFIX ('default' when empty), which tells
+    apart aliases sharing one backend such as 'default' and 'template_fragments'.
+    """
+    for config in settings.CACHES.values():
+        backend = import_string(config['BACKEND'])
+        if not getattr(backend.get, '_metrics', False):
+            backend.get = _counted_get(backend.get)
+
+
+class MetricsMiddleware:
+    """Record request latency and query count per URL name when METRICS_ENABLED."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with wrap_all_connections(count):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        # Unmatched paths share one label so scanners can't create series
+        view = match.view_name if match else 'unmatched'
+        store.observe('http_request_duration_seconds', elapsed, view=view)
+        store.observe('db_queries_per_request', queries[0], view=view)
+        store.flush()
+        return response
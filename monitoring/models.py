@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import models
+
+
+class ProfileCapture(models.Model):
+    """
+    cProfile trace of one request, captured on demand by a staff user.
+
+    See monitoring.profiling. `data` holds the raw stats in the .prof
+    format read by pstats, snakeviz and friends; `summary` is the
+    pstats listing of the top functions by cumulative time.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    summary = models.TextField()
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f}ms)"
+
+    @property
+    def filename(self):
+        return f"profile_{self.pk}_{self.created_at:%Y%m%d_%H%M%S}.prof"
@@ -0,0 +1,156 @@
+"""
+Repeated-query (N+1) detection for development and tests.
+
+Every statement executed inside a detect_repeated_queries() block is
+reduced to a fingerprint with literals and parameters replaced by '?'.
+When the same fingerprint runs more than the threshold, the block logs
+a warning (or raises RepeatedQueryError) naming the statement and the
+application stack of its first repeat, which is where the loop lives.
+
+Enable per request with NPLUSONE_DETECTION=True, which installs
+NPlusOneMiddleware (on by default when DEBUG is set). In tests:
+
+    with detect_repeated_queries(threshold=3):
+        self.client.get(reverse('academics:dashboard'))
+"""
+
+import logging
+import os
+import re
+import traceback
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .db import wrap_all_connections
+
+logger = logging.getLogger('monitoring.nplusone')
+
+# Frames from the detector itself are left out of reports
+_OWN_FILES = {__file__, os.path.join(os.path.dirname(__file__), 'db.py')}
+
+_STRING = re.compile(r"'(?:''|[^'])*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+# Transaction bookkeeping repeats legitimately
+IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class RepeatedQueryError(Exception):
+    """Raised when a statement shape repeats more than the allowed threshold."""
+
+
+def fingerprint(sql):
+    """
+    Normalize SQL so that statements differing only in literals compare equal.
+
+    Args:
+        sql: SQL string as passed to the cursor
+
+    Returns:
+        Normalized statement shape
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def application_stack():
+    """Return the formatted stack frames that belong to this project's code."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and frame.filename not in _OWN_FILES
+    ]
+    return ''.join(traceback.format_list(frames))
+
+
+class RepeatedQueryDetector:
+    """
+    Execute wrapper counting statement fingerprints.
+
+    Use through detect_repeated_queries(); after the block, `offenders`
+    maps each fingerprint over the threshold to its count and the stack
+    of its first repeat.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = {}
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        key = fingerprint(sql)
+        if not key.upper().startswith(IGNORED_PREFIXES):
+            count = self.counts.get(key, 0) + 1
+            self.counts[key] = count
+            if count == 2:
+                self.stacks[key] = application_stack()
+        return execute(sql, params, many, context)
+
+    @property
+    def offenders(self):
+        return {
+            key: {'count': count, 'stack': self.stacks.get(key, '')}
+            for key, count in self.counts.items()
+            if count > self.threshold
+        }
+
+    def report(self, label=''):
+        """Return a readable description of every offending statement."""
+        lines = [f'Repeated queries{f" in {label}" if label else ""}:']
+        for key, info in self.offenders.items():
+            lines.append(f'{info["count"]}x {key}')
+            lines.append(f'First repeat at:\n{info["stack"]}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def detect_repeated_queries(threshold=None, raise_error=None, label=''):
+    """
+    Watch every database connection for repeated statement shapes.
+
+    Args:
+        threshold: Executions of one fingerprint allowed before reporting,
+            defaults to NPLUSONE_THRESHOLD
+        raise_error: Raise RepeatedQueryError instead of logging a warning,
+            defaults to NPLUSONE_RAISE
+        label: Included in the report, e.g. the request path
+
+    Yields:
+        RepeatedQueryDetector
+    """
+    if threshold is None:
+        threshold = settings.NPLUSONE_THRESHOLD
+    if raise_error is None:
+        raise_error = settings.NPLUSONE_RAISE
+
+    detector = RepeatedQueryDetector(threshold)
+    with wrap_all_connections(detector):
+        yield detector
+
+    if detector.offenders:
+        if raise_error:
+            raise RepeatedQueryError(detector.report(label))
+        logger.warning(detector.report(label))
+
+
+class NPlusOneMiddleware:
+    """Run each request inside detect_repeated_queries() when NPLUSONE_DETECTION is on."""
+
+    def __init__(self, get_response):
+        if not settings.NPLUSONE_DETECTION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with detect_repeated_queries(label=request.path):
+            return self.get_response(request)
@@ -0,0 +1,106 @@
+"""
+On-demand cProfile capture of a single request, for staff.
+
+Add `?_profile=1` to any URL (or send an `X-Profile: 1` header) while
+logged in as staff and the request runs under cProfile. The trace is
+saved as a ProfileCapture, listed in the admin with its top functions by
+cumulative time and downloadable as a .prof file:
+
+    python -m pstats profile_12_20260101_120000.prof
+    snakeviz profile_12_20260101_120000.prof
+
+Everything after AuthenticationMiddleware is profiled: the remaining
+middleware, the view and template rendering. Async views run on the
+event loop thread and are not seen. The response carries the capture's
+id in X-Profile-Id.
+"""
+
+import io
+import marshal
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .db import wrap_all_connections
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
+
+
+def wants_profile(request):
+    """True if a staff user asked for this request to be profiled."""
+    if not (request.GET.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER)):
+        return False
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_staff)
+
+
+def summarize(profiler, limit):
+    """pstats listing of the top `limit` functions by cumulative time."""
+    import pstats
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """Profile staff requests flagged with ?_profile=1 or X-Profile when PROFILING_ENABLED."""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not wants_profile(request):
+            return self.get_response(request)
+
+        # Loaded on first use; most processes never profile a request
+        import cProfile
+
+        profiler = cProfile.Profile()
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active (Python 3.12+ allows only one)
+            return self.get_response(request)
+        start = time.perf_counter()
+        try:
+            with wrap_all_connections(count):
+                response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        capture = self.save(request, response, profiler, duration_ms, queries[0])
+        response['X-Profile-Id'] = str(capture.pk)
+        return response
+
+    def save(self, request, response, profiler, duration_ms, query_count):
+        from .models import ProfileCapture
+
+        profiler.create_stats()
+        # Same format as Profile.dump_stats(); taken first since pstats.Stats
+        # empties profiler.stats when it loads them
+        data = marshal.dumps(profiler.stats)
+        match = getattr(request, 'resolver_match', None)
+        return ProfileCapture.objects.create(
+            user=request.user,
+            method=request.method,
+            path=request.get_full_path()[:500],
+            view_name=match.view_name if match else '',
+            status_code=response.status_code,
+            duration_ms=duration_ms,
+            query_count=query_count,
+            summary=summarize(profiler, settings.PROFILING_TOP_FUNCTIONS),
+            data=data,
+        )
@@ -0,0 +1,144 @@
+"""
+Slow query log with view attribution.
+
+Every statement run during a request (SlowQueryMiddleware) or inside a
+log_slow_queries() block that takes at least SLOW_QUERY_MS is logged as
+one JSON line on the 'monitoring.slow_queries' logger, which settings
+send to a rotating file per process, SLOW_QUERY_LOG_FILE.<pid>:
+
+    {"duration_ms": 412.7, "view": "academics:transcript", "path": "/academics/transcript/",
+     "caller": "academics/utils.py:142 in calculate_wma", "database": "default",
+     "fingerprint": "SELECT ... FROM academics_result WHERE student_id = ?",
+     "sql": "...", "params": "(int, str)", "many": false}
+
+Parameters are logged by shape only (types and lengths), never values,
+since they include registration numbers and password hashes.
+`manage.py slow_query_report` groups the log by fingerprint, which shows
+which statements get slower as tables grow.
+
+In management commands or shells:
+
+    with log_slow_queries(label='recalculate_analytics'):
+        ...
+"""
+
+import json
+import logging
+import os
+import time
+import traceback
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .db import wrap_all_connections
+from .nplusone import fingerprint
+
+logger = logging.getLogger('monitoring.slow_queries')
+
+_MONITORING_DIR = os.path.dirname(__file__)
+
+# Files named after the layers whose queries we want to attribute, in order of preference
+CALLER_FILES = ('utils.py', 'views.py')
+
+
+def calling_frame():
+    """
+    The project frame responsible for the query, as 'path:line in function'.
+
+    Prefers the innermost frame in a utils.py or views.py module, so
+    queries are blamed on the calculator or view that ran them rather
+    than on a model method or template tag; falls back to the innermost
+    project frame.
+    """
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.startswith(_MONITORING_DIR)
+    ]
+    if not frames:
+        return ''
+    preferred = [frame for frame in frames if os.path.basename(frame.filename) in CALLER_FILES]
+    frame = (preferred or frames)[-1]
+    return f'{os.path.relpath(frame.filename, base_dir)}:{frame.lineno} in {frame.name}'
+
+
+def params_shape(params, many=False):
+    """
+    Describe query parameters without their values.
+
+    e.g. (int, str, list[3]) for one row, or '250 x (int, int)' for executemany.
+    """
+    if params is None:
+        return ''
+    if many:
+        rows = list(params)
+        return f'{len(rows)} x {params_shape(rows[0])}' if rows else '0 rows'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{key}: {_type_name(value)}' for key, value in params.items()) + '}'
+    return '(' + ', '.join(_type_name(value) for value in params) + ')'
+
+
+def _type_name(value):
+    if isinstance(value, (list, tuple)):
+        return f'{type(value).__name__}[{len(value)}]'
+    return type(value).__name__
+
+
+class SlowQueryLogger:
+    """Execute wrapper logging statements slower than SLOW_QUERY_MS."""
+
+    def __init__(self, request=None, label=''):
+        self.request = request
+        self.label = label
+
+    def __call__(self, execute, sql, params, many, context):
+        if many:
+            # Materialize generators so the shape can be taken after execution
+            params = list(params)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= settings.SLOW_QUERY_MS:
+                self.log(sql, params, many, context, duration_ms)
+
+    def log(self, sql, params, many, context, duration_ms):
+        # resolver_match is only set once URL resolution has run
+        match = getattr(self.request, 'resolver_match', None)
+        entry = {
+            'duration_ms': round(duration_ms, 2),
+            'view': match.view_name if match else self.label,
+            'path': self.request.path if self.request else '',
+            'caller': calling_frame(),
+            'database': context['connection'].alias,
+            'fingerprint': fingerprint(sql),
+            'sql': sql[:settings.SLOW_QUERY_MAX_SQL],
+            'params': params_shape(params, many),
+            'many': many,
+        }
+        logger.warning(json.dumps(entry))
+
+
+@contextmanager
+def log_slow_queries(request=None, label=''):
+    """Log slow statements run on any connection inside the block."""
+    with wrap_all_connections(SlowQueryLogger(request, label)):
+        yield
+
+
+class SlowQueryMiddleware:
+    """Log each request's slow queries with its URL name when SLOW_QUERY_MS is set."""
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_MS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with log_slow_queries(request):
+            return self.get_response(request)
@@ -0,0 +1,494 @@
+import io
+import json
+import logging
+import marshal
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.http import HttpResponse
+
+from accounts.models import Student
+from academics.models import AcademicYear, Unit, Result
+from monitoring.log_handlers import PerProcessRotatingFileHandler
+from monitoring.nplusone import (
+    NPlusOneMiddleware, RepeatedQueryError, detect_repeated_queries, fingerprint
+)
+from monitoring.models import ProfileCapture
+from monitoring.metrics import MetricsStore, instrument_caches, store
+from monitoring.slow_queries import log_slow_queries, params_shape
+from monitoring.timing import RequestTimings, ServerTimingMiddleware, _current, timed
+
+
+class FingerprintTest(TestCase):
+    """Tests for SQL normalization."""
+
+    def test_literals_and_parameters_are_normalized(self):
+        """Statements differing only in values share a fingerprint."""
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" = 12 AND "name" = \'it\'\'s\''),
+            fingerprint('SELECT  *  FROM "t" WHERE "id" = %s AND "name" = %s'),
+        )
+
+    def test_in_lists_collapse(self):
+        """IN lists of any length share a fingerprint."""
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT 1 FROM "t" WHERE "id" IN (%s)'),
+        )
+
+    def test_identifiers_are_kept(self):
+        """Digits inside identifiers are not treated as literals."""
+        self.assertNotEqual(
+            fingerprint('SELECT "t1"."id" FROM "t1"'),
+            fingerprint('SELECT "t2"."id" FROM "t2"'),
+        )
+
+
+class RepeatedQueryDetectorTest(TestCase):
+    """Tests for the N+1 detector."""
+
+    @classmethod
+    def setUpTestData(cls):
+        year = AcademicYear.objects.create(year=2024, semester=1)
+        Unit.objects.bulk_create([
+            Unit(code=f'NPO{i:02d}', name=f'Unit {i}', credit_units=3, academic_year=year)
+            for i in range(8)
+        ])
+        user = User.objects.create_user(username='nplusone', password='pass123', first_name='N', last_name='One')
+        cls.user = User.objects.create_superuser(username='npadmin', password='pass123')
+        cls.student = Student.objects.create(user=user, registration_number='NPO-0001')
+        Result.objects.bulk_record(
+            Result(student=cls.student, unit=unit, score=70)
+            for unit in Unit.objects.filter(code__startswith='NPO')
+        )
+
+    def test_loop_over_relation_raises_with_stack(self):
+        """Touching an unselected relation in a loop is reported with the caller's frame."""
+        with self.assertRaises(RepeatedQueryError) as ctx:
+            with detect_repeated_queries(threshold=3, raise_error=True):
+                for result in Result.objects.filter(student=self.student):
+                    result.unit.code
+        message = str(ctx.exception)
+        self.assertIn('8x', message)
+        self.assertIn('academics_unit', message)
+        self.assertIn('monitoring/tests.py', message)
+
+    def test_select_related_is_clean(self):
+        """The same loop with select_related runs one query."""
+        with detect_repeated_queries(threshold=3, raise_error=True) as detector:
+            for result in Result.objects.filter(student=self.student).select_related('unit'):
+                result.unit.code
+        self.assertEqual(detector.offenders, {})
+
+    def test_logs_by_default(self):
+        """Without raise_error the report is logged as a warning."""
+        with self.assertLogs('monitoring.nplusone', level='WARNING'):
+            with detect_repeated_queries(threshold=3, raise_error=False):
+                for result in Result.objects.filter(student=self.student):
+                    result.unit.code
+
+    @override_settings(NPLUSONE_DETECTION=True, NPLUSONE_THRESHOLD=2, NPLUSONE_RAISE=True)
+    def test_middleware_reports_request(self):
+        """The middleware checks the queries run while handling a request."""
+        def view(request):
+            for result in Result.objects.filter(student=self.student):
+                result.unit.code
+            return HttpResponse()
+
+        middleware = NPlusOneMiddleware(view)
+        with self.assertRaisesRegex(RepeatedQueryError, '/dashboard/'):
+            middleware(RequestFactory().get('/dashboard/'))
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_result_admin_changelist_has_no_repeats(self):
+        """Result.__str__ and list columns don't query per row."""
+        self.client.force_login(self.user)
+        with detect_repeated_queries(threshold=2, raise_error=True):
+            response = self.client.get(reverse('admin:academics_result_changelist'))
+        self.assertEqual(response.status_code, 200)
+
+
+def parse_server_timing(header):
+    """Turn a Server-Timing header into {name: {'dur': float, 'desc': str}}."""
+    metrics = {}
+    for entry in header.split(','):
+        name, *params = [part.strip() for part in entry.split(';')]
+        metrics[name] = {}
+        for param in params:
+            key, _, value = param.partition('=')
+            metrics[name][key] = float(value) if key == 'dur' else value.strip('"')
+    return metrics
+
+
+@override_settings(
+    SERVER_TIMING=True,
+    SERVER_TIMING_LOG=False,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class ServerTimingTest(TestCase):
+    """Tests for the Server-Timing breakdown."""
+
+    @classmethod
+    def setUpTestData(cls):
+        year = AcademicYear.objects.create(year=2024, semester=1)
+        Unit.objects.bulk_create([
+            Unit(code=f'SVT{i:02d}', name=f'Unit {i}', credit_units=3, academic_year=year)
+            for i in range(5)
+        ])
+        cls.user = User.objects.create_user(username='timing', password='pass123')
+        cls.student = Student.objects.create(user=cls.user, registration_number='SVT-0001')
+        Result.objects.bulk_record(
+            Result(student=cls.student, unit=unit, score=65)
+            for unit in Unit.objects.filter(code__startswith='SVT')
+        )
+
+    def test_dashboard_breakdown(self):
+        """The header splits the request into db, calc, tpl and app time."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('academics:transcript'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse('academics:transcript'))
+
+        metrics = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(set(metrics), {'db', 'calc', 'tpl', 'app', 'total'})
+        self.assertEqual(metrics['db']['desc'], f'{len(ctx.captured_queries)} queries')
+        parts = sum(metrics[name]['dur'] for name in ('db', 'calc', 'tpl', 'app'))
+        self.assertAlmostEqual(parts, metrics['total']['dur'], delta=0.5)
+
+    def test_nested_sections_count_once_without_db_time(self):
+        """Inner sections and SQL inside a section are not double counted."""
+        timings = RequestTimings()
+
+        @timed('calc')
+        def inner():
+            # Stands in for a query run by the calculator
+            timings(lambda *args: time.sleep(0.02), 'SELECT 1', None, False, {})
+
+        @timed('calc')
+        def outer():
+            inner()
+            time.sleep(0.01)
+
+        token = _current.set(timings)
+        try:
+            outer()
+        finally:
+            _current.reset(token)
+        self.assertEqual(timings.queries, 1)
+        self.assertGreaterEqual(timings.db_ms, 20)
+        self.assertGreaterEqual(timings.sections['calc'], 10)
+        self.assertLess(timings.sections['calc'], 20)
+
+    @override_settings(SERVER_TIMING=False, SERVER_TIMING_LOG=True)
+    def test_log_only(self):
+        """With only SERVER_TIMING_LOG, one JSON line is logged and no header is sent."""
+        client = Client()
+        client.force_login(self.user)
+        with self.assertLogs('monitoring.timing', level='INFO') as logs:
+            response = client.get(reverse('academics:dashboard'))
+        self.assertNotIn('Server-Timing', response)
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['view'], 'academics:dashboard')
+        self.assertEqual(entry['status'], 200)
+        self.assertGreater(entry['queries'], 0)
+
+    @override_settings(SERVER_TIMING=False, SERVER_TIMING_LOG=True)
+    def test_log_reaches_configured_handler(self):
+        """The LOGGING setting actually emits the INFO line, not just assertLogs."""
+        logger = logging.getLogger('monitoring.timing')
+        self.assertTrue(logger.isEnabledFor(logging.INFO))
+        handler = logger.handlers[0]
+        stream = io.StringIO()
+        previous = handler.setStream(stream)
+        try:
+            client = Client()
+            client.force_login(self.user)
+            client.get(reverse('academics:dashboard'))
+        finally:
+            handler.setStream(previous)
+        entry = json.loads(stream.getvalue().splitlines()[-1])
+        self.assertEqual(entry['view'], 'academics:dashboard')
+
+    @override_settings(SERVER_TIMING=False, SERVER_TIMING_LOG=False)
+    def test_disabled(self):
+        """The middleware removes itself when both settings are off."""
+        with self.assertRaises(MiddlewareNotUsed):
+            ServerTimingMiddleware(lambda request: HttpResponse())
+
+
+class MetricsTest(TestCase):
+    """Tests for the shared metrics store and the /metrics endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        year = AcademicYear.objects.create(year=2024, semester=1)
+        unit = Unit.objects.create(code='MET01', name='Unit', credit_units=3, academic_year=year)
+        cls.user = User.objects.create_user(username='metrics', password='pass123')
+        cls.student = Student.objects.create(user=cls.user, registration_number='MET-0001')
+        Result.objects.bulk_record([Result(student=cls.student, unit=unit, score=70)])
+        cls.staff = User.objects.create_user(username='metrics_staff', password='pass123', is_staff=True)
+
+    def setUp(self):
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        settings_override = override_settings(
+            METRICS_ENABLED=True, METRICS_DB=path, METRICS_FLUSH_SECONDS=0, METRICS_TOKEN='s3cret'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Only done at startup when METRICS_ENABLED is set there
+        instrument_caches()
+        store.pending.clear()
+
+    def scrape(self, **headers):
+        client = Client()
+        client.force_login(self.staff)
+        return client.get(reverse('metrics'), **headers).content.decode()
+
+    def test_request_histograms(self):
+        """Requests show up as latency and query-count histograms per URL name."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('academics:transcript'))
+        body = self.scrape()
+
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_duration_seconds_bucket{le="+Inf",view="academics:transcript"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{view="academics:transcript"} 1', body)
+        self.assertIn('db_queries_per_request_count{view="academics:transcript"} 1', body)
+        self.assertIn('calculator_calls_total{method="GradeCalculator.calculate_wma"}', body)
+
+    def test_pdf_render_time(self):
+        """PDF exports record their render time by document."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('academics:transcript_export'))
+        self.assertIn('pdf_render_seconds_count{document="transcript"} 1', self.scrape())
+
+    def test_workers_aggregate_in_shared_file(self):
+        """Separate stores, as in separate worker processes, add up."""
+        first, second = MetricsStore(), MetricsStore()
+        first.inc('calculator_calls_total', method='A.b')
+        second.inc('calculator_calls_total', 2, method='A.b')
+        first.observe('pdf_render_seconds', 0.3, document='transcript')
+        second.observe('pdf_render_seconds', 3, document='transcript')
+        first.flush(force=True)
+        second.flush(force=True)
+
+        body = first.render()
+        self.assertIn('calculator_calls_total{method="A.b"} 3', body)
+        self.assertIn('pdf_render_seconds_bucket{document="transcript",le="0.25"} 0', body)
+        self.assertIn('pdf_render_seconds_bucket{document="transcript",le="0.5"} 1', body)
+        self.assertIn('pdf_render_seconds_bucket{document="transcript",le="+Inf"} 2', body)
+        self.assertIn('pdf_render_seconds_sum{document="transcript"} 3.3', body)
+
+    def test_large_values_keep_full_precision(self):
+        """Counters and sums past a million are exposed exactly, not rounded."""
+        metrics = MetricsStore()
+        metrics.inc('calculator_calls_total', 1234567, method='A.b')
+        metrics.observe('pdf_render_seconds', 1234567.125, document='transcript')
+        metrics.flush(force=True)
+
+        body = metrics.render()
+        self.assertIn('calculator_calls_total{method="A.b"} 1234567\n', body)
+        self.assertIn('pdf_render_seconds_sum{document="transcript"} 1234567.125\n', body)
+
+    def test_cache_hits_and_misses(self):
+        """cache.get() is counted as a hit or miss per cache."""
+        cache = caches['default']
+        cache.set('metrics-test', 1)
+        cache.get('metrics-test')
+        cache.get('metrics-test-absent')
+        self.assertEqual(cache.get('metrics-test-absent', 'fallback'), 'fallback')
+
+        body = store.render()
+        self.assertIn('cache_requests_total{cache="default",result="hit"} 1', body)
+        self.assertIn('cache_requests_total{cache="default",result="miss"} 2', body)
+
+    def test_staff_only(self):
+        """Students are refused; anonymous users go to the login page."""
+        client = Client()
+        self.assertRedirects(client.get(reverse('metrics')), f"{reverse('accounts:login')}?next=/metrics",
+                             fetch_redirect_response=False)
+        client.force_login(self.user)
+        self.assertEqual(client.get(reverse('metrics')).status_code, 403)
+
+    def test_bearer_token(self):
+        """Scrapers without a session authenticate with METRICS_TOKEN."""
+        client = Client()
+        response = client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        response = client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(
+    PROFILING_ENABLED=True,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+class ProfilingTest(TestCase):
+    """Tests for on-demand request profiling."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='profiler', password='pass123', is_staff=True, is_superuser=True)
+        cls.user = User.objects.create_user(username='profiled', password='pass123')
+        Student.objects.create(user=cls.user, registration_number='PRF-0001')
+
+    def test_staff_request_is_captured(self):
+        """?_profile=1 stores the trace with a cumulative-time summary."""
+        client = Client()
+        client.force_login(self.staff)
+        response = client.get(reverse('admin:index'), {'_profile': '1'})
+
+        capture = ProfileCapture.objects.get()
+        self.assertEqual(response['X-Profile-Id'], str(capture.pk))
+        self.assertEqual(capture.user, self.staff)
+        self.assertEqual(capture.view_name, 'admin:index')
+        self.assertEqual(capture.status_code, 200)
+        self.assertGreater(capture.query_count, 0)
+        self.assertIn('cumulative', capture.summary)
+        self.assertTrue(marshal.loads(bytes(capture.data)))
+
+    def test_header_trigger(self):
+        """The X-Profile header works like the query flag."""
+        client = Client()
+        client.force_login(self.staff)
+        client.get(reverse('admin:index'), HTTP_X_PROFILE='1')
+        self.assertEqual(ProfileCapture.objects.count(), 1)
+
+    def test_students_are_not_profiled(self):
+        """The flag is ignored for non-staff users."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('academics:dashboard'), {'_profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(ProfileCapture.objects.exists())
+
+    def test_admin_list_and_download(self):
+        """Captures are listed in the admin and download as .prof files."""
+        client = Client()
+        client.force_login(self.staff)
+        client.get(reverse('admin:index'), {'_profile': '1'})
+        capture = ProfileCapture.objects.get()
+
+        response = client.get(reverse('admin:monitoring_profilecapture_changelist'))
+        self.assertContains(response, reverse('admin:monitoring_profilecapture_download', args=[capture.pk]))
+        response = client.get(reverse('admin:monitoring_profilecapture_change', args=[capture.pk]))
+        self.assertContains(response, 'Top functions by cumulative time')
+
+        response = client.get(reverse('admin:monitoring_profilecapture_download', args=[capture.pk]))
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{capture.filename}"')
+        self.assertEqual(marshal.loads(response.content), marshal.loads(bytes(capture.data)))
+
+
+@override_settings(SLOW_QUERY_MS=0.001)
+class SlowQueryLogTest(TestCase):
+    """Tests for the slow query log."""
+
+    @classmethod
+    def setUpTestData(cls):
+        year = AcademicYear.objects.create(year=2024, semester=1)
+        unit = Unit.objects.create(code='SLQ01', name='Unit', credit_units=3, academic_year=year)
+        cls.user = User.objects.create_user(username='slowq', password='pass123')
+        cls.student = Student.objects.create(user=cls.user, registration_number='SLQ-0001')
+        Result.objects.bulk_record([Result(student=cls.student, unit=unit, score=70)])
+
+    def test_request_queries_are_attributed(self):
+        """Entries carry the URL name and the calculator or view frame that ran them."""
+        client = Client()
+        client.force_login(self.user)
+        with self.assertLogs('monitoring.slow_queries', level='WARNING') as logs:
+            client.get(reverse('academics:transcript'))
+
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        results = [entry for entry in entries if 'FROM "academics_result"' in entry['fingerprint']]
+        self.assertTrue(results)
+        for entry in results:
+            self.assertEqual(entry['view'], 'academics:transcript')
+            self.assertEqual(entry['path'], reverse('academics:transcript'))
+            self.assertRegex(entry['caller'], r'^academics/(utils|views)\.py:\d+ in \w+$')
+            self.assertEqual(entry['database'], 'default')
+        # Values never reach the log
+        self.assertNotIn('SLQ-0001', json.dumps(entries))
+
+    @override_settings(SLOW_QUERY_MS=10_000)
+    def test_fast_queries_are_not_logged(self):
+        """Statements under the threshold are left out."""
+        with self.assertNoLogs('monitoring.slow_queries'):
+            with log_slow_queries(label='test'):
+                list(Result.objects.filter(student=self.student))
+
+    def test_params_shape(self):
+        """Parameters are described by type and length only."""
+        self.assertEqual(params_shape((1, 'x', [1, 2, 3])), '(int, str, list[3])')
+        self.assertEqual(params_shape({'a': 1}), '{a: int}')
+        self.assertEqual(params_shape([(1, 2), (3, 4)], many=True), '2 x (int, int)')
+        self.assertEqual(params_shape(None), '')
+
+    def test_report_groups_by_shape(self):
+        """slow_query_report aggregates entries per fingerprint and table."""
+        handle, path = tempfile.mkstemp(suffix='.log')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        with override_settings(SLOW_QUERY_LOG_FILE=path):
+            with open(path, 'w') as log:
+                for duration in (300, 500, 700):
+                    log.write(json.dumps({
+                        'duration_ms': duration, 'view': 'academics:transcript',
+                        'caller': 'academics/utils.py:10 in calculate_wma',
+                        'fingerprint': 'SELECT * FROM "academics_result" WHERE student_id = ?',
+                    }) + '\n')
+                log.write(json.dumps({
+                    'duration_ms': 250, 'view': 'academics:dashboard',
+                    'caller': 'academics/views.py:5 in get',
+                    'fingerprint': 'SELECT * FROM "academics_gradealert" WHERE student_id = ?',
+                }) + '\n')
+
+            out = io.StringIO()
+            call_command('slow_query_report', '--table=academics_result', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('3 slow queries in 1 shapes', output)
+        self.assertIn('3x  total=1500ms', output)
+        self.assertIn('academics/utils.py:10 in calculate_wma', output)
+        self.assertNotIn('academics_gradealert', output)
+
+    def test_each_process_writes_its_own_file(self):
+        """Workers log to <file>.<pid>, and the report reads all of them."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'slow.log')
+        handler = PerProcessRotatingFileHandler(path, delay=True)
+        self.addCleanup(handler.close)
+        entry = {
+            'duration_ms': 300, 'view': 'academics:transcript',
+            'caller': 'academics/utils.py:10 in calculate_wma',
+            'fingerprint': 'SELECT * FROM "academics_result" WHERE student_id = ?',
+        }
+        record = logging.makeLogRecord({'msg': json.dumps(entry)})
+        handler.emit(record)
+        with patch('monitoring.log_handlers.os.getpid', return_value=os.getpid() + 1):
+            handler.emit(record)
+
+        self.assertEqual(sorted(os.listdir(directory)), sorted([
+            f'slow.log.{os.getpid()}', f'slow.log.{os.getpid() + 1}',
+        ]))
+        out = io.StringIO()
+        call_command('slow_query_report', f'--file={path}', stdout=out)
+        self.assertIn('2 slow queries in 1 shapes from 2 files', out.getvalue())
@@ -0,0 +1,163 @@
+"""
+Per-request time breakdown, reported as a Server-Timing header.
+
+ServerTimingMiddleware times each request and splits it into:
+
+    db     SQL execution (all connections used by the request thread)
+    calc   GradeCalculator / AnalyticsCalculator / PDFGenerator work,
+           excluding the SQL they run
+    tpl    Template rendering, excluding SQL run by lazy querysets
+    app    Everything else (middleware, view code, serialization)
+
+e.g. `Server-Timing: db;dur=14.2;desc="9 queries", calc;dur=3.1, tpl;dur=22.8, app;dur=4.0, total;dur=44.1`,
+which browser dev tools show under the request's Timing tab. With
+SERVER_TIMING_LOG the same figures are logged as one JSON line on the
+'monitoring.timing' logger.
+
+Calculator classes opt in with the @timed_calculator class decorator;
+template rendering is timed by wrapping the Django backend's
+Template.render (installed by MonitoringConfig.ready). SQL run from
+other threads, e.g. async views with ASYNC_VIEW_CONCURRENCY, is not seen.
+"""
+
+import functools
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .db import wrap_all_connections
+from .metrics import count_calls
+
+logger = logging.getLogger('monitoring.timing')
+
+_current = ContextVar('server_timing', default=None)
+
+
+class RequestTimings:
+    """
+    Time spent per category during one request.
+
+    Also an execute wrapper, so DB time is counted by installing it on
+    the request's connections. Sections nest: only the outermost
+    calculator or template section counts, and DB time inside a section
+    is subtracted from it so the categories don't overlap.
+    """
+
+    def __init__(self):
+        self.db_ms = 0.0
+        self.queries = 0
+        self.sections = {}
+        self._open = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - start) * 1000
+            self.queries += 1
+
+    def section(self, name, func, *args, **kwargs):
+        """Call func, adding its duration (less DB time) to the named section."""
+        if name in self._open:
+            return func(*args, **kwargs)
+        self._open.add(name)
+        db_before = self.db_ms
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000 - (self.db_ms - db_before)
+            self.sections[name] = self.sections.get(name, 0.0) + max(0.0, elapsed)
+            self._open.discard(name)
+
+    def as_dict(self, total_ms):
+        """Breakdown in milliseconds, with 'app' as the unaccounted remainder."""
+        data = {'db': self.db_ms, 'queries': self.queries}
+        data.update(self.sections)
+        accounted = self.db_ms + sum(self.sections.values())
+        data['app'] = max(0.0, total_ms - accounted)
+        data['total'] = total_ms
+        return data
+
+    def header(self, total_ms):
+        """Server-Timing header value."""
+        data = self.as_dict(total_ms)
+        entries = [f'db;dur={data.pop("db"):.1f};desc="{data.pop("queries")} queries"']
+        entries.extend(f'{name};dur={ms:.1f}' for name, ms in data.items())
+        return ', '.join(entries)
+
+
+def timed(name):
+    """Decorator adding the function's time to the current request's named section."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            return timings.section(name, func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_calculator(cls):
+    """
+    Class decorator timing every public static and class method as 'calc'.
+
+    Methods calling each other are timed once, by the outermost call.
+    Every call is also counted in monitoring.metrics.
+    """
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') or not isinstance(value, (staticmethod, classmethod)):
+            continue
+        func = count_calls(f'{cls.__name__}.{attr}')(timed('calc')(value.__func__))
+        setattr(cls, attr, type(value)(func))
+    return cls
+
+
+def instrument_templates():
+    """Time Django template rendering as 'tpl'. Safe to call more than once."""
+    from django.template.backends.django import Template
+
+    if not getattr(Template.render, '_server_timing', False):
+        Template.render = timed('tpl')(Template.render)
+        Template.render._server_timing = True
+
+
+class ServerTimingMiddleware:
+    """Add a Server-Timing header (SERVER_TIMING) and/or log line (SERVER_TIMING_LOG) per request."""
+
+    def __init__(self, get_response):
+        if not (settings.SERVER_TIMING or settings.SERVER_TIMING_LOG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with wrap_all_connections(timings):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = timings.header(total_ms)
+        if settings.SERVER_TIMING_LOG:
+            match = getattr(request, 'resolver_match', None)
+            entry = {
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+            }
+            entry.update({key: round(value, 2) for key, value in timings.as_dict(total_ms).items()})
+            logger.info(json.dumps(entry))
+        return response
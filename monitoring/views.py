@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from .metrics import store
+
+
+class MetricsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Prometheus scrape endpoint aggregating every worker's metrics.
+
+    Open to staff sessions, and to `Authorization: Bearer <METRICS_TOKEN>`
+    when a token is configured, for scrapers that can't log in.
+    """
+    login_url = 'accounts:login'
+
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.METRICS_ENABLED:
+            raise Http404('Metrics are disabled')
+        if self.has_valid_token(request):
+            return self.get(request)
+        return super().dispatch(request, *args, **kwargs)
+
+    def has_valid_token(self, request):
+        token = settings.METRICS_TOKEN
+        header = request.headers.get('Authorization', '')
+        return bool(token) and constant_time_compare(header, f'Bearer {token}')
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        return HttpResponse(store.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -122,15 +122,19 @@ for student_data in sample_students:
     print(f"   Name: {student.user.get_full_name()}")
     print(f"   Course: {student.course}")
     
-    # Add grades
-    for i, score in enumerate(student_data['scores']):
-        result, result_created = Result.objects.get_or_create(
-            student=student,
-            unit=units[i],
-            defaults={'score': score}
-        )
-        if result_created:
-            print(f"   • {units[i].code}: {score}% → Grade {result.grade}")
+    # Add missing grades in one insert (grade and points are computed by
+    # bulk_record). Existing results are left alone: bulk_record would
+    # overwrite their scores, and re-running the seed must not do that
+    existing = set(Result.objects.filter(student=student).values_list('unit_id', flat=True))
+    results = Result.objects.bulk_record(
+        Result(student=student, unit=units[i], score=score)
+        for i, score in enumerate(student_data['scores'])
+        if units[i].pk not in existing
+    )
+    for result in results:
+        print(f"   • {result.unit.code}: {result.score}% → Grade {result.grade}")
+    if existing:
+        print(f"   ⏭️  {len(existing)} results already exist")
 
 print("\n" + "="*50)
 print("✨ Database seeding complete!")